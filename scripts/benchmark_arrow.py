@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Compare the per-row cost of the ORM and Arrow-native result paths.
+
+Both paths read the same vloerplan rows and turn them into table rows for the
+UI:
+
+- ORM: driver pandas conversion, SQLAlchemy rows, SQLModel instances and
+  `format_row`
+- Arrow: Flight record batches, vectorized coercion and `format_record`
+
+By default the rows are served by a local Flight server, so the benchmark
+measures client-side cost only. Pass --connection (or set
+VINEAPP_DB_CONNECTION and pass --live) to run against Dremio.
+
+Usage:
+    python scripts/benchmark_arrow.py --rows 20000 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+import pyarrow as pa
+from pyarrow import flight
+from sqlalchemy import create_engine
+from sqlmodel import Session, select
+
+from production_control.vloerplan.models import Vloerplan19cm
+from production_control.vloerplan.repositories import Vloerplan19cmRepository
+from production_control.web.components.table_utils import format_record, format_row
+
+
+class StaticFlightServer(flight.FlightServerBase):
+    """Local Flight server answering every query with the same table."""
+
+    def __init__(self, table: pa.Table):
+        super().__init__("grpc+tcp://127.0.0.1:0")
+        self.table = table
+
+    def get_flight_info(self, context, descriptor):
+        endpoint = flight.FlightEndpoint(descriptor.command, [])
+        return flight.FlightInfo(self.table.schema, descriptor, [endpoint], self.table.num_rows, -1)
+
+    def do_get(self, context, ticket):
+        return flight.RecordBatchStream(self.table)
+
+
+def synthetic_table(rows: int) -> pa.Table:
+    """Vloerplan rows typed the way Dremio returns them, with some NULLs."""
+    start = datetime(2025, 1, 6, 8, 0)
+    return pa.table(
+        {
+            "id": pa.array(range(rows), pa.int64()),
+            "product_naam": [f"Lilium {i % 97}" for i in range(rows)],
+            "productgroep_naam": [None if i % 11 == 0 else "Oriental" for i in range(rows)],
+            "klant_code": [f"K{i % 13}" for i in range(rows)],
+            "tuin_nr_plan": pa.array(
+                [None if i % 7 == 0 else float(i % 40) for i in range(rows)], pa.float64()
+            ),
+            "tuin_nr_olsthoorn": pa.array([float(i % 40) for i in range(rows)], pa.float64()),
+            "datum_oppot_plan": pa.array(
+                [start + timedelta(hours=i % 2000) for i in range(rows)], pa.timestamp("ms")
+            ),
+            "datum_uit_cel_plan_opm": pa.array(
+                [None if i % 3 else start + timedelta(days=i % 60) for i in range(rows)],
+                pa.timestamp("ms"),
+            ),
+            "opmerking": [None if i % 5 else "spoed" for i in range(rows)],
+        }
+    )
+
+
+def orm_rows(repository: Vloerplan19cmRepository, statement) -> List[dict]:
+    with Session(repository.engine) as session:
+        return [format_row(item) for item in session.exec(statement)]
+
+
+def arrow_rows(repository: Vloerplan19cmRepository, statement) -> List[dict]:
+    return [format_record(Vloerplan19cm, record) for record in repository.fetch_records(statement)]
+
+
+def measure(label: str, run: Callable[[], List[dict]], repeat: int) -> float:
+    """Run `repeat` times and print the median cost per row; returns it in microseconds."""
+    timings = []
+    count = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = len(run())
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    per_row = median / max(count, 1) * 1e6
+    print(f"{label:<6} {count:>8} rows  {median * 1000:>9.1f} ms  {per_row:>7.2f} us/row")
+    return per_row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000, help="Rows to read")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per path")
+    parser.add_argument("--connection", help="Dremio connection string to benchmark against")
+    parser.add_argument(
+        "--live", action="store_true", help="Use VINEAPP_DB_CONNECTION instead of a local server"
+    )
+    args = parser.parse_args()
+
+    server = None
+    connection = args.connection or (os.getenv("VINEAPP_DB_CONNECTION") if args.live else None)
+    if connection is None:
+        server = StaticFlightServer(synthetic_table(args.rows))
+        connection = f"dremio+flight://127.0.0.1:{server.port}/dremio?UseEncryption=false&Token=x"
+
+    try:
+        repository = Vloerplan19cmRepository(create_engine(connection))
+        statement = select(Vloerplan19cm).limit(args.rows)
+        orm = measure("orm", lambda: orm_rows(repository, statement), args.repeat)
+        fast = measure("arrow", lambda: arrow_rows(repository, statement), args.repeat)
+        print(f"arrow path is {orm / fast:.1f}x faster per row")
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
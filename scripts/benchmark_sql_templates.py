@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Compare compiling list page queries with rendering them from SQL templates.
+
+Builds the page query a vloerplan list page sends to Dremio (search filter,
+keyset seek predicate, total count column, limit) for a series of requests
+that differ in search text, cursor and page size, the way operators page
+through and search a list, and turns each into SQL text:
+
+- compile: a full compile of the statement per request, as the Dremio
+  dialect does without SQLAlchemy's statement cache
+- template: `SqlTemplateCache.render`, compiling each statement structure once
+
+No connection is made; only the cost of producing the SQL is measured.
+
+Usage:
+    python scripts/benchmark_sql_templates.py --requests 2000 --repeat 5
+"""
+
+import argparse
+import statistics
+import time
+import warnings
+from typing import Callable, List
+
+from sqlalchemy import Integer, bindparam, create_engine, func
+from sqlmodel import select
+
+from production_control.data import keyset
+from production_control.data.arrow import compile_sql
+from production_control.data.sql_template import SqlTemplateCache
+from production_control.vloerplan.models import Vloerplan19cm
+from production_control.vloerplan.repositories import Vloerplan19cmRepository
+
+SEARCHES = [None, "lil", "lilium", "K3", "spoed", "O'Hara"]
+PAGE_SIZES = [10, 25, 50]
+
+
+def page_statements(repository: Vloerplan19cmRepository, count: int) -> List[tuple]:
+    """(statement, params) pairs for `count` list page requests."""
+    sort_key = repository._keyset_sort_key("product_naam", False)
+    statements = []
+    for i in range(count):
+        search = SEARCHES[i % len(SEARCHES)]
+        query = select(Vloerplan19cm)
+        count_stmt = select(func.count(Vloerplan19cm.id))
+        if search:
+            query = repository._apply_text_filter(query, search, repository.search_fields)
+            count_stmt = repository._apply_text_filter(count_stmt, search, repository.search_fields)
+        if i % 3:
+            query = query.where(keyset.after(sort_key, [f"Lilium {i % 97}", i]))
+            total = count_stmt.scalar_subquery()
+        else:
+            total = func.count().over()
+        query = query.order_by(*keyset.order_by(sort_key)).add_columns(total.label("total_rows"))
+        query = query.limit(bindparam("limit", type_=Integer, literal_execute=True))
+        statements.append((query, {"limit": PAGE_SIZES[i % len(PAGE_SIZES)]}))
+    return statements
+
+
+def measure(label: str, run: Callable[[], int], repeat: int) -> float:
+    """Run `repeat` times and print the median cost per request; returns it in microseconds."""
+    timings = []
+    count = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = run()
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    per_request = median / max(count, 1) * 1e6
+    print(
+        f"{label:<9} {count:>6} requests  {median * 1000:>8.1f} ms  {per_request:>7.1f} us/request"
+    )
+    return per_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="Page requests per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per approach")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        # The Dremio dialect warns that it doesn't support the statement cache
+        warnings.simplefilter("ignore")
+        engine = create_engine("dremio+flight://localhost:32010/dremio?UseEncryption=false")
+    repository = Vloerplan19cmRepository(engine)
+    statements = page_statements(repository, args.requests)
+
+    def compile_all() -> int:
+        for statement, params in statements:
+            compile_sql(engine, statement.params(params))
+        return len(statements)
+
+    def render_all() -> int:
+        templates = SqlTemplateCache()
+        for statement, params in statements:
+            templates.render(engine, statement, params)
+        return len(statements)
+
+    for statement, params in statements[:12]:
+        rendered = SqlTemplateCache().render(engine, statement, params)
+        assert rendered == compile_sql(engine, statement.params(params))
+
+    compiled = measure("compile", compile_all, args.repeat)
+    rendered = measure("template", render_all, args.repeat)
+    print(f"templates are {compiled / rendered:.1f}x faster per request")
+
+
+if __name__ == "__main__":
+    main()
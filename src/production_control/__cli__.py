@@ -7,7 +7,7 @@ from rich.logging import RichHandler
 from rich.table import Table
 from . import __version__
 from .products.models import ProductRepository
-from .data import backup
+from .data import backup, snapshot
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +20,7 @@ console = Console()
 
 # Add sub-commands
 app.add_typer(backup.app, name="backup", help="Dremio backup commands")
+app.add_typer(snapshot.app, name="snapshot", help="Local snapshots of Dremio views")
 
 
 @app.callback()
@@ -9,8 +9,10 @@ from __future__ import annotations
 import os
 from typing import Any, List, Optional, Tuple
 
-from sqlalchemy import Engine, create_engine, text
+from sqlalchemy import Engine, text
 
+from production_control.data.engine import shared_engine
+from production_control.data.singleflight import single_flight
 
 MAX_ROWS_IN_REPLY = 50
 MAX_CELL_CHARS = 120
@@ -20,12 +22,22 @@ def _engine() -> Engine:
     conn = os.getenv("VINEAPP_DB_CONNECTION", "")
     if not conn:
         raise RuntimeError("VINEAPP_DB_CONNECTION is not set")
-    return create_engine(conn)
+    # Questions may need any query; the deadline for page loads does not apply
+    return shared_engine(conn).execution_options(query_deadline=0)
 
 
 def execute(sql: str, engine: Optional[Engine] = None) -> Tuple[List[str], List[List[Any]]]:
-    """Execute SQL and return (columns, rows). `engine` is injectable for tests."""
+    """Execute SQL and return (columns, rows). `engine` is injectable for tests.
+
+    Identical SQL already running on the same engine (e.g. several people
+    asking the bot the same question) is not sent again; its result is shared.
+    """
     eng = engine or _engine()
+    cols, rows = single_flight.do("bot", (id(eng), sql), lambda: _query(eng, sql))
+    return list(cols), [list(r) for r in rows]
+
+
+def _query(eng: Engine, sql: str) -> Tuple[List[str], List[List[Any]]]:
     with eng.connect() as conn:
         result = conn.execute(text(sql))
         cols = list(result.keys())
@@ -13,6 +13,9 @@ from .models import BulbPickList
 class BulbPickListRepository(DremioRepository[BulbPickList]):
     """Read-only repository for bulb picklist data access."""
 
+    # Fetch list pages and their total count in one Dremio query
+    count_in_page_query = True
+
     # Fields to search when filtering bulb picklist records
     search_fields = ["id", "bollen_code", "ras", "locatie", "oppot_week"]
 
@@ -38,6 +41,7 @@ class BulbPickListRepository(DremioRepository[BulbPickList]):
         descending: bool = False,
         filter_text: Optional[str] = None,
         pagination: Optional[Pagination] = None,
+        columns: Optional[List[str]] = None,
     ) -> Tuple[List[BulbPickList], int]:
         """Get paginated bulb picklist records from the data source."""
         page, items_per_page, sort_by, descending = self._validate_pagination(
@@ -60,10 +64,15 @@ class BulbPickListRepository(DremioRepository[BulbPickList]):
                 self.search_fields,
                 sort_by,
                 descending,
+                pagination=pagination,
+                columns=columns,
             )
 
     def get_by_id(self, id: int) -> Optional[BulbPickList]:
         """Get a bulb picklist record by its id."""
-        with Session(self.engine) as session:
+        engine = self.engine
+        with Session(engine) as session, self._measure("by_id", engine=engine) as query:
             # Using text() since Dremio Flight doesn't support parameterized queries
-            return session.exec(select(BulbPickList).where(text(f"id = {id}"))).first()
+            record = session.exec(select(BulbPickList).where(text(f"id = {id}"))).first()
+            query.rows = int(record is not None)
+            return record
@@ -0,0 +1,30 @@
+"""FastAPI endpoints exposing how Dremio queries perform."""
+
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from .cache import result_cache
+from .circuit import circuit_breakers
+from .query_metrics import query_metrics
+from .singleflight import single_flight
+from .sql_template import sql_templates
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/queries")
+async def query_stats() -> Dict[str, Any]:
+    """Query duration percentiles per model, kind and cache outcome.
+
+    Returns:
+        Query metrics with the result cache, single-flight and SQL template
+        counters, and the state of the circuit per Dremio server
+    """
+    return {
+        **query_metrics.snapshot(),
+        "cache": result_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "sql_templates": sql_templates.stats(),
+        "circuits": circuit_breakers.stats(),
+    }
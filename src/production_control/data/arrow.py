@@ -0,0 +1,215 @@
+"""Arrow-native query results.
+
+The Flight driver receives Arrow record batches from Dremio, but turns them
+into a pandas DataFrame, then a list of Python lists, which SQLAlchemy turns
+into rows and SQLModel into instances, calling the column types' result
+processors (e.g. `DateFromTimestamp`) once per cell on the way.
+
+`read_table` runs a statement and keeps the result as a `pyarrow.Table`.
+`coerce_table` then applies the model's type conversions to whole columns at
+once: column types that convert result values provide a vectorized
+`coerce_arrow(array)` next to their per-cell `process_result_value`. The
+coerced table converts straight to dictionaries keyed on model attribute
+names, ready to be formatted as table rows.
+
+`open_batches` streams a result as record batches instead, for results too
+large to hold at once (see `data.backup`).
+"""
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Type, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import flight
+from sqlalchemy import Date, DateTime, Engine, inspect as sa_inspect
+from sqlalchemy.sql import Executable
+from sqlalchemy.types import TypeDecorator
+
+from .engine import flight_call_options
+from .executor import current_cancel_token
+
+ArrowArray = Union[pa.Array, pa.ChunkedArray]
+
+
+def compile_sql(engine: Engine, statement: Executable) -> str:
+    """Render a statement as SQL text with all parameters inline.
+
+    Dremio Flight doesn't support parameterized queries, so values are always
+    rendered as literals. Schema names are translated as the engine would
+    (e.g. for snapshots, see `data.snapshot`).
+    """
+    translate = engine.get_execution_options().get("schema_translate_map")
+    compiled = statement.compile(
+        dialect=engine.dialect,
+        schema_translate_map=translate,
+        render_schema_translate=translate is not None,
+        compile_kwargs={"literal_binds": True},
+    )
+    return str(compiled)
+
+
+def read_table(engine: Engine, sql: str) -> pa.Table:
+    """Run a query on a pooled connection and return the result as an Arrow table.
+
+    On a Dremio Flight connection the record batches are read directly from
+    the Flight stream, without the driver's pandas conversion, within the
+    query deadline (see `engine.flight_call_options`). Other DBAPI
+    connections (e.g. SQLite in tests) are read through a cursor.
+
+    Raises:
+        QueryCancelledError: If the query was cancelled (see `executor.CancelToken`)
+            while its record batches were read
+    """
+    with engine.connect() as connection:
+        driver = connection.connection.driver_connection
+        client = getattr(driver, "flightclient", None)
+        if client is not None:
+            options = flight_call_options(driver.options, connection.get_execution_options())
+            descriptor = flight.FlightDescriptor.for_command(sql)
+            info = client.get_flight_info(descriptor, options)
+            return _read_stream(client.do_get(info.endpoints[0].ticket, options))
+
+        result = connection.exec_driver_sql(sql)
+        names = list(result.keys())
+        columns = list(zip(*result.fetchall())) or [()] * len(names)
+    return pa.table({name: pa.array(values) for name, values in zip(names, columns)})
+
+
+@contextmanager
+def open_batches(
+    engine: Engine, sql: str, batch_rows: int = 65_536
+) -> Iterator[pa.RecordBatchReader]:
+    """Run a query on a pooled connection and stream its result as record batches.
+
+    On a Dremio Flight connection the batches are passed on as Dremio sends
+    them, with the schema Dremio reports, so the whole result is never held
+    in memory. Other DBAPI connections (e.g. SQLite in tests) are read
+    `batch_rows` rows at a time; their column types are inferred from the
+    first batch.
+
+    Yields:
+        Reader of the record batches; the connection stays open until the block exits
+    """
+    with engine.connect() as connection:
+        driver = connection.connection.driver_connection
+        client = getattr(driver, "flightclient", None)
+        if client is not None:
+            options = flight_call_options(driver.options, connection.get_execution_options())
+            descriptor = flight.FlightDescriptor.for_command(sql)
+            info = client.get_flight_info(descriptor, options)
+            stream = client.do_get(info.endpoints[0].ticket, options)
+            yield pa.RecordBatchReader.from_batches(stream.schema, _stream_batches(stream))
+            return
+
+        result = connection.exec_driver_sql(sql)
+        names = list(result.keys())
+        first = _rows_to_batch(names, result.fetchmany(batch_rows))
+
+        def batches() -> Iterator[pa.RecordBatch]:
+            if first.num_rows:
+                yield first
+            while rows := result.fetchmany(batch_rows):
+                yield _rows_to_batch(names, rows, first.schema)
+
+        yield pa.RecordBatchReader.from_batches(first.schema, batches())
+
+
+def _rows_to_batch(
+    names: List[str], rows: List[Any], schema: Optional[pa.Schema] = None
+) -> pa.RecordBatch:
+    columns = list(zip(*rows)) or [()] * len(names)
+    if schema is None:
+        return pa.record_batch([pa.array(values) for values in columns], names=names)
+    arrays = [pa.array(values, type=field.type) for values, field in zip(columns, schema)]
+    return pa.record_batch(arrays, schema=schema)
+
+
+def _stream_batches(reader: flight.FlightStreamReader) -> Iterator[pa.RecordBatch]:
+    """Record batches of a Flight stream, stopping early when the query is cancelled.
+
+    The stream is cancelled between batches rather than while a batch is
+    awaited: cancelling a blocked read interrupts the main thread.
+    """
+    token = current_cancel_token()
+    while True:
+        if token is not None and token.cancelled:
+            reader.cancel()
+            token.raise_if_cancelled()
+        try:
+            yield reader.read_chunk().data
+        except StopIteration:
+            return
+
+
+def _read_stream(reader: flight.FlightStreamReader) -> pa.Table:
+    """Read all record batches of a Flight stream (see `_stream_batches`)."""
+    if current_cancel_token() is None:
+        return reader.read_all()
+    return pa.Table.from_batches(list(_stream_batches(reader)), schema=reader.schema)
+
+
+def nan_to_null(array: ArrowArray) -> ArrowArray:
+    """Replace NaN in a floating point array with null."""
+    if not pa.types.is_floating(array.type):
+        return array
+    return pc.if_else(pc.is_nan(array), pa.scalar(None, array.type), array)
+
+
+def coerce_table(table: pa.Table, model: Type) -> pa.Table:
+    """Apply a model's column type conversions to an Arrow table, column by column.
+
+    Columns named after a mapped column are renamed to the model attribute
+    and converted with the column type's `coerce_arrow`, if it has one.
+    Other columns (e.g. labels added to the query) are kept as they are.
+    Dates and timestamps read as text, as SQLite stores them in snapshots
+    (see `data.snapshot`), are parsed first.
+
+    Raises:
+        TypeError: If a column's type converts values per cell but has no
+            vectorized `coerce_arrow` equivalent
+    """
+    mapper = sa_inspect(model)
+    by_name = {column.name: column for column in mapper.columns}
+    names = []
+    arrays = []
+    for name, array in zip(table.column_names, table.columns):
+        column = by_name.get(name)
+        if column is None:
+            names.append(name)
+            arrays.append(array)
+            continue
+        column_type = column.type
+        if (
+            isinstance(column_type, TypeDecorator)
+            and type(column_type).process_result_value is not TypeDecorator.process_result_value
+            and not hasattr(column_type, "coerce_arrow")
+        ):
+            raise TypeError(
+                f"{type(column_type).__name__} of {model.__name__}.{name} "
+                "has no vectorized coerce_arrow"
+            )
+        array = _parse_temporal(array, column_type)
+        coerce = getattr(column_type, "coerce_arrow", None)
+        names.append(mapper.get_property_by_column(column).key)
+        arrays.append(coerce(array) if coerce is not None else array)
+    return pa.table(arrays, names=names)
+
+
+def _parse_temporal(array: ArrowArray, column_type: Any) -> ArrowArray:
+    """A text or all-NULL column of a date or timestamp type, cast to that type."""
+    if not (pa.types.is_string(array.type) or pa.types.is_null(array.type)):
+        return array
+    impl = getattr(column_type, "impl_instance", column_type)
+    if isinstance(impl, DateTime):
+        return array.cast(pa.timestamp("us"))
+    if isinstance(impl, Date):
+        return array.cast(pa.date32())
+    return array
+
+
+def to_records(table: pa.Table, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Convert an Arrow table to a list of dictionaries, one per row."""
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pylist()
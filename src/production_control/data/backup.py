@@ -1,31 +1,89 @@
 """Dremio backup command implementation.
 
-This module provides commands for backing up Dremio query results to CSV files.
+This module provides commands for backing up Dremio query results to CSV,
+Parquet or Arrow IPC files.
 The backup command supports:
 - Custom naming of backup files with --name
 - Output directory configuration via DREMIO_BACKUP_DIR environment variable
 - Automatic chunking of large result sets
+- Typed, compressed Parquet and Arrow IPC files written straight from the
+  Flight record batches, without creating Python row objects
+- Parallel backups split into key or date ranges with --partition-by and --parallel
+- Incremental backups fetching only rows beyond a high-water mark with --incremental-by
+- Resuming a failed backup after the files it completed with --resume
+- Fetching the next chunk while the previous one is written (see `data.backup_pipeline`)
 """
 
 import csv
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any, Generator, Iterator, List, Optional, Sequence
 
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import sqlalchemy as sa
 import typer
 from sqlalchemy.engine import Engine
 from sqlmodel import Session
 
-from production_control.data.repository import DremioRepository
+from production_control.data import arrow, keyset
+from production_control.data.backup_journal import (
+    BackupJournal,
+    replace_atomically,
+    temporary_path,
+)
+from production_control.data.backup_manifest import BackupManifest
+from production_control.data.backup_pipeline import StageTimes, open_timed, run_pipeline
+from production_control.data.engine import shared_engine
 
 app = typer.Typer()
 
 
+class BackupFormat(str, Enum):
+    """File format of a backup."""
+
+    csv = "csv"
+    parquet = "parquet"
+    arrow = "arrow"
+
+
+class Compression(str, Enum):
+    """Compression codec of Parquet and Arrow IPC backups."""
+
+    zstd = "zstd"
+    snappy = "snappy"
+    none = "none"
+
+
 def get_engine() -> Engine:
-    """Get SQLAlchemy engine from repository configuration."""
-    # Create a dummy repository to get the engine
-    repo = DremioRepository(None)
-    return repo.engine
+    """Get the shared SQLAlchemy engine for VINEAPP_DB_CONNECTION.
+
+    Backups run as long as they need: the query deadline for page loads does not apply.
+    """
+    return shared_engine().execution_options(query_deadline=0)
+
+
+@dataclass
+class BackupPart:
+    """One output file of a backup and what was written to it."""
+
+    path: Path
+    rows: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    watermark: Any = None
+    # Completed by an earlier run of a resumed backup
+    resumed: bool = False
+    times: StageTimes = field(default_factory=StageTimes)
 
 
 @app.command(name="query")
@@ -47,10 +105,40 @@ def backup_query(
     ] = Path.cwd()
     / "backups",
     chunk_size: Annotated[
-        int, typer.Option(help="Rows per CSV file chunk (default: 100,000)")
+        int,
+        typer.Option(
+            min=1,
+            help="Rows per CSV file chunk, or per Parquet row group / Arrow record batch "
+            "(default: 100,000)",
+        ),
     ] = 100_000,
+    format: Annotated[
+        BackupFormat, typer.Option("--format", help="Output file format (default: csv)")
+    ] = BackupFormat.csv,
+    compression: Annotated[
+        Compression,
+        typer.Option(help="Compression of Parquet and Arrow files (default: zstd)"),
+    ] = Compression.zstd,
+    partition_by: Annotated[
+        Optional[str],
+        typer.Option(help="Numeric or date column to split the query into ranges of"),
+    ] = None,
+    parallel: Annotated[
+        int,
+        typer.Option(min=1, help="Ranges to split into and run at once with --partition-by"),
+    ] = 1,
+    incremental_by: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Column whose high-water mark is kept in a manifest; only fetch rows beyond it"
+        ),
+    ] = None,
+    resume: Annotated[
+        bool,
+        typer.Option(help="Continue a backup that failed after the files it completed"),
+    ] = False,
 ):
-    """Execute a Dremio query and save results as CSV files.
+    """Execute a Dremio query and save results as CSV, Parquet or Arrow IPC files.
 
     The command executes the provided SQL query against Dremio and saves the results
     in one or more CSV files. Large result sets are automatically split into multiple
@@ -60,36 +148,455 @@ def backup_query(
     where {name} is either the provided name or 'backup' by default,
     and {number} is a 3-digit sequence starting at 001.
 
+    With --format parquet or --format arrow, the result is written to a single
+    {name}.parquet or {name}.arrow file instead, streamed from Dremio's record
+    batches with the column types Dremio reports. Parquet row groups and Arrow
+    record batches hold chunk_size rows. Arrow IPC files support zstd only.
+
+    With --partition-by, the query is split into --parallel ranges of the
+    given column, between its minimum and maximum, and the ranges run at once
+    on separate connections (at most VINEAPP_DB_POOL_SIZE +
+    VINEAPP_DB_MAX_OVERFLOW). Each range is written to its own file,
+    {name}_part{number}.{format}; rows without a value go into the first.
+
+    With --incremental-by, the largest value of the given column backed up so
+    far is kept in {name}.manifest.json, with the row count, size and SHA-256
+    checksum of every file. The next run only fetches rows beyond it and
+    adds files named {name}_{run}.{format} (or {name}_{run}_part{number}).
+
+    Files are written under a temporary name and renamed once complete, then
+    recorded in {name}.journal.jsonl. With --resume, a backup that failed
+    continues after the files it completed: CSV chunks continue at the first
+    row not saved yet (with OFFSET, so the query needs an ORDER BY on a
+    unique key), and completed parts of a partitioned backup are skipped.
+
+    The next chunk is fetched while the previous one is written, holding at
+    most VINEAPP_BACKUP_QUEUE_CHUNKS chunks and VINEAPP_BACKUP_QUEUE_MB
+    megabytes in between. The time spent fetching, encoding and writing to
+    disk is reported, to show which of them the backup waits for.
+
     Examples:
         pc backup query "SELECT * FROM bestelling WHERE ar > 0" --name afroep_opdrachten
         pc backup query "SELECT * FROM bestelling" --output-dir /path/to/dir
         DREMIO_BACKUP_DIR=/backup/path pc backup query "SELECT * FROM bestelling"
+        pc backup query "SELECT * FROM bestelling" --format parquet --compression snappy
+        pc backup query "SELECT * FROM bestelling" --format parquet --partition-by id --parallel 4
+        pc backup query "SELECT * FROM bestelling" --format parquet --incremental-by gewijzigd
+        pc backup query "SELECT * FROM bestelling ORDER BY id" --name bestelling --resume
     """
+    if format == BackupFormat.arrow and compression == Compression.snappy:
+        raise typer.BadParameter(
+            "Arrow IPC files support zstd compression or none", param_hint="--compression"
+        )
+    if resume and incremental_by:
+        raise typer.BadParameter(
+            "incremental backups resume by running them again", param_hint="--resume"
+        )
     try:
         output_dir.mkdir(parents=True, exist_ok=True)
+        prefix = name or "backup"
 
-        with Session(get_engine()) as session:
-            result = session.exec(sa.text(query))
+        manifest = None
+        if incremental_by:
+            try:
+                manifest = BackupManifest.load(
+                    output_dir / f"{prefix}.manifest.json", prefix, incremental_by, format.value
+                )
+            except ValueError as e:
+                raise typer.BadParameter(str(e), param_hint="--incremental-by")
+            query = manifest.filter_query(get_engine(), query)
+            prefix = f"{prefix}_{manifest.runs + 1:03d}"
 
-            file_counter = 1
-            while True:
-                chunk = result.fetchmany(chunk_size)
-                if not chunk:
-                    break
+        journal = BackupJournal(output_dir / f"{name or 'backup'}.journal.jsonl")
+        settings = {
+            "query": query,
+            "format": format.value,
+            "chunk_size": chunk_size,
+            "compression": compression.value,
+            "partition_by": partition_by,
+            "parallel": parallel,
+        }
+        try:
+            journal.start(settings, resume)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--resume")
 
-                filename = output_dir / f"{name or 'backup'}_{file_counter:03d}.csv"
-                with open(filename, "w", newline="") as f:
-                    writer = csv.writer(f)
-                    writer.writerow(result.keys())  # Write header
-                    writer.writerows(chunk)
+        if partition_by or format != BackupFormat.csv or manifest is not None:
+            if partition_by:
+                engine = get_engine()
+                try:
+                    queries = partition_queries(engine, query, partition_by, parallel)
+                except TypeError as e:
+                    raise typer.BadParameter(str(e), param_hint="--partition-by")
+                started = time.perf_counter()
+                parts = backup_parts(
+                    engine,
+                    queries,
+                    output_dir,
+                    prefix,
+                    format,
+                    chunk_size,
+                    compression,
+                    parallel,
+                    incremental_by,
+                    journal,
+                )
+                report_parts(parts, output_dir, time.perf_counter() - started)
+            else:
+                path = output_dir / f"{prefix}.{format.value}"
+                parts = [
+                    write_batches(
+                        get_engine(), query, path, format, chunk_size, compression, incremental_by
+                    )
+                ]
+                typer.echo(f"Success: Saved {parts[0].rows} row(s) to {path}")
+                typer.echo(f"Stage times: {parts[0].times.summary()}")
 
-                file_counter += 1
+            if manifest is not None:
+                if not record_parts(manifest, parts):
+                    typer.echo("No rows beyond the high-water mark; no files added")
+                typer.echo(f"High-water mark of {manifest.column}: {manifest.watermark}")
+            journal.finish()
+            return
 
-        typer.echo(f"Success: Saved {file_counter - 1} file(s) to {output_dir}")
+        if journal.rows:
+            typer.echo(f"Resuming after {journal.rows} row(s) in {len(journal.completed)} file(s)")
+        times = StageTimes()
+        files = write_csv_chunks(
+            get_engine(), query, output_dir, prefix, chunk_size, journal, times
+        )
+        journal.finish()
+        typer.echo(f"Success: Saved {files} file(s) to {output_dir}")
+        typer.echo(f"Stage times: {times.summary()}")
 
-    except sa.exc.SQLAlchemyError as e:
+    except (sa.exc.SQLAlchemyError, pa.ArrowException) as e:
         typer.echo(f"Database error: {str(e)}", err=True)
         raise typer.Abort()
     except OSError as e:
         typer.echo(f"File system error: {str(e)}", err=True)
         raise typer.Exit(code=1)
+
+
+def write_csv_chunks(
+    engine: Engine,
+    query: str,
+    output_dir: Path,
+    name: str,
+    chunk_size: int,
+    journal: BackupJournal,
+    times: Optional[StageTimes] = None,
+) -> int:
+    """Write a query result to CSV files of chunk_size rows, {name}_{number}.csv.
+
+    Each file is recorded in the journal once complete. Chunks the journal
+    already lists are not fetched again: the query continues after their rows.
+    The next chunk is fetched while the previous one is written.
+
+    Returns:
+        The number of files of the backup, including those written before
+    """
+    times = times if times is not None else StageTimes()
+    file_counter = len(journal.completed) + 1
+
+    def fetch() -> Generator[tuple, None, None]:
+        with Session(engine) as session:
+            result = session.exec(sa.text(skip_rows(query, journal.rows)))
+            keys = list(result.keys())
+            while chunk := result.fetchmany(chunk_size):
+                yield keys, chunk
+
+    def write(item: tuple) -> None:
+        nonlocal file_counter
+        keys, chunk = item
+        started = time.perf_counter()
+        text = io.StringIO(newline="")
+        writer = csv.writer(text)
+        writer.writerow(keys)  # Write header
+        writer.writerows(chunk)
+        encoded = text.getvalue()
+        written = time.perf_counter()
+        times.encode += written - started
+
+        filename = output_dir / f"{name}_{file_counter:03d}.csv"
+        temporary = temporary_path(filename)
+        with open(temporary, "w", newline="") as f:
+            f.write(encoded)
+        replace_atomically(temporary, filename)
+        times.disk += time.perf_counter() - written
+        journal.record(filename.name, len(chunk))
+
+        file_counter += 1
+
+    run_pipeline(fetch(), write, lambda item: _rows_size(item[1]), times)
+    return file_counter - 1
+
+
+def write_batches(
+    engine: Engine,
+    query: str,
+    path: Path,
+    format: BackupFormat,
+    chunk_size: int,
+    compression: Compression = Compression.zstd,
+    watermark_column: Optional[str] = None,
+) -> BackupPart:
+    """Stream a query result into one Parquet, Arrow IPC or CSV file.
+
+    Record batches are collected until chunk_size rows are buffered and then
+    written as one row group (Parquet) or record batch (Arrow), while the
+    next chunk is fetched; at most a few chunks of the result are held in
+    memory (see `data.backup_pipeline`). CSV files are not compressed. The
+    file only appears under its name once it is complete.
+
+    Returns:
+        The file written, with its rows, the Arrow bytes read, the time taken, the
+        time per stage and the largest value of `watermark_column`, if given
+    """
+    started = time.perf_counter()
+    codec = None if compression == Compression.none else compression.value
+    part = BackupPart(path)
+    times = part.times
+    temporary = temporary_path(path)
+
+    def fetch() -> Generator[pa.Table, None, None]:
+        with arrow.open_batches(engine, query, batch_rows=chunk_size) as batches:
+            # An empty table first, so the file is created even without rows
+            yield batches.schema.empty_table()
+            yield from _rechunk(batches, chunk_size)
+
+    def write(table: pa.Table) -> None:
+        encoding = time.perf_counter()
+        disk = times.disk
+        writer.write(table)
+        part.rows += table.num_rows
+        part.bytes += table.nbytes
+        if watermark_column is not None and table.num_rows:
+            high = pc.max(table.column(watermark_column)).as_py()
+            if high is not None and (part.watermark is None or high > part.watermark):
+                part.watermark = high
+        # Time spent in the file's writes is disk time, the rest encoding
+        times.encode += time.perf_counter() - encoding - (times.disk - disk)
+
+    with open_timed(temporary, times) as sink:
+        writer = _TableWriter(sink, format, chunk_size, codec)
+        try:
+            run_pipeline(fetch(), write, lambda table: table.nbytes, times)
+        finally:
+            writer.close()
+    flushing = time.perf_counter()
+    replace_atomically(temporary, path)
+    times.disk += time.perf_counter() - flushing
+    part.seconds = time.perf_counter() - started
+    return part
+
+
+class _TableWriter:
+    """Writes tables to an open file in a backup format, created for the first table's schema."""
+
+    def __init__(self, sink: Any, format: BackupFormat, chunk_size: int, codec: Optional[str]):
+        self.sink = sink
+        self.format = format
+        self.chunk_size = chunk_size
+        self.codec = codec
+        self._writer: Any = None
+
+    def write(self, table: pa.Table) -> None:
+        if self._writer is None:
+            self._writer = self._open(table.schema)
+        if not table.num_rows:
+            return
+        if self.format == BackupFormat.parquet:
+            self._writer.write_table(table, row_group_size=self.chunk_size)
+        elif self.format == BackupFormat.arrow:
+            self._writer.write_table(table.combine_chunks(), max_chunksize=self.chunk_size)
+        else:
+            self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+    def _open(self, schema: pa.Schema) -> Any:
+        if self.format == BackupFormat.parquet:
+            return pq.ParquetWriter(self.sink, schema, compression=self.codec or "none")
+        if self.format == BackupFormat.arrow:
+            options = pa.ipc.IpcWriteOptions(compression=self.codec)
+            return pa.ipc.new_file(self.sink, schema, options=options)
+        return pa_csv.CSVWriter(self.sink, schema)
+
+
+def partition_queries(engine: Engine, query: str, column: str, parts: int) -> List[str]:
+    """Split a query into queries for `parts` ranges of a column.
+
+    The ranges divide the span between the column's minimum and maximum
+    evenly; rows where the column is NULL belong to the first range. Fewer
+    queries are returned when the span is too small to divide.
+
+    Raises:
+        TypeError: If the column is not numeric or a date
+    """
+    source = sa.text(query).columns(sa.column(column)).subquery("backup_source")
+    key = source.c[column]
+    bounds = arrow.read_table(
+        engine, arrow.compile_sql(engine, sa.select(sa.func.min(key), sa.func.max(key)))
+    )
+    low, high = bounds.column(0)[0].as_py(), bounds.column(1)[0].as_py()
+    if low is None:
+        return [query]
+    edges = split_range(low, high, parts)
+    if len(edges) == 1:
+        return [query]
+    # Typed literals, e.g. TIMESTAMP '...': Dremio won't compare a date with a string
+    bounds = [keyset.literal(edge) for edge in edges]
+    conditions = [sa.or_(key < bounds[1], key.is_(None))]
+    conditions += [sa.and_(key >= start, key < end) for start, end in zip(bounds[1:], bounds[2:])]
+    conditions.append(key >= bounds[-1])
+    return [
+        arrow.compile_sql(engine, sa.select(sa.text("*")).select_from(source).where(condition))
+        for condition in conditions
+    ]
+
+
+def split_range(low: Any, high: Any, parts: int) -> List[Any]:
+    """Start values of `parts` equal ranges from low to high, without duplicates.
+
+    Raises:
+        TypeError: If the values are not numbers, dates or timestamps
+    """
+    if isinstance(low, bool) or not isinstance(low, (int, float, Decimal, date)):
+        raise TypeError(f"cannot split a column of {type(low).__name__} values into ranges")
+    span = high - low
+    edges = [low]
+    for i in range(1, parts):
+        if isinstance(low, int):
+            # Both ends are included: low..high holds span + 1 values
+            edge = low + (span + 1) * i // parts
+        elif isinstance(low, datetime):
+            edge = low + span * i / parts
+        elif isinstance(low, date):
+            edge = low + timedelta(days=span.days * i // parts)
+        else:
+            edge = low + span * i / parts
+        if edge > edges[-1]:
+            edges.append(edge)
+    return edges
+
+
+def backup_parts(
+    engine: Engine,
+    queries: List[str],
+    output_dir: Path,
+    name: str,
+    format: BackupFormat,
+    chunk_size: int,
+    compression: Compression,
+    parallel: int,
+    watermark_column: Optional[str] = None,
+    journal: Optional[BackupJournal] = None,
+) -> List[BackupPart]:
+    """Write the result of each query to its own file, running `parallel` queries at once.
+
+    Parts the journal lists as completed for the same query are not run again;
+    other parts are recorded in it as they complete.
+    """
+
+    def write_part(query: str, path: Path) -> BackupPart:
+        completed = journal.completed.get(path.name) if journal is not None else None
+        if completed is not None and completed.get("query") == query and path.exists():
+            return BackupPart(path, rows=completed["rows"], resumed=True)
+        part = write_batches(engine, query, path, format, chunk_size, compression, watermark_column)
+        if journal is not None:
+            journal.record(path.name, part.rows, query=query)
+        return part
+
+    paths = [
+        output_dir / f"{name}_part{number:03d}.{format.value}"
+        for number in range(1, len(queries) + 1)
+    ]
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="backup") as pool:
+        futures = [pool.submit(write_part, query, path) for query, path in zip(queries, paths)]
+        return [future.result() for future in futures]
+
+
+def record_parts(manifest: BackupManifest, parts: List[BackupPart]) -> bool:
+    """Add the parts of an incremental run to its manifest and save it.
+
+    Parts without rows are deleted instead; a run without new rows leaves
+    the manifest as it was.
+
+    Returns:
+        Whether any part was added
+    """
+    written = [part for part in parts if part.rows]
+    for part in parts:
+        if not part.rows:
+            part.path.unlink(missing_ok=True)
+    if not written:
+        return False
+    manifest.runs += 1
+    for part in written:
+        manifest.add(part.path, part.rows, part.watermark)
+    manifest.save()
+    return True
+
+
+def report_parts(parts: List[BackupPart], output_dir: Path, seconds: float) -> None:
+    """Print the rows and time of each part and the throughput of the parts written."""
+    for part in parts:
+        typer.echo(
+            f"{part.path.name}: {part.rows} row(s) saved before"
+            if part.resumed
+            else f"{part.path.name}: {part.rows} row(s) in {part.seconds:.1f}s"
+        )
+    written = [part for part in parts if not part.resumed]
+    typer.echo(
+        f"Success: Saved {sum(part.rows for part in parts)} row(s) in {len(parts)} "
+        f"part(s) to {output_dir}; {throughput(written, seconds)}"
+    )
+    times = StageTimes()
+    for part in written:
+        times.add(part.times)
+    typer.echo(f"Stage times, summed over parts: {times.summary()}")
+
+
+def skip_rows(query: str, rows: int) -> str:
+    """The query continuing after its first `rows` rows, to resume a chunked backup."""
+    if not rows:
+        return query
+    return f"{query.rstrip().rstrip(';')}\nOFFSET {rows} ROWS"
+
+
+def throughput(parts: List[BackupPart], seconds: float) -> str:
+    """Rows and Arrow megabytes per second over all parts, for `seconds` wall-clock time."""
+    seconds = max(seconds, 1e-9)
+    rows = sum(part.rows for part in parts)
+    megabytes = sum(part.bytes for part in parts) / 1_000_000
+    return f"{rows / seconds:,.0f} rows/s, {megabytes / seconds:,.1f} MB/s in {seconds:.1f}s"
+
+
+def _rows_size(rows: Sequence[Sequence[Any]]) -> int:
+    """Estimated bytes of fetched rows, from the size of the first row's values."""
+    if not rows:
+        return 0
+    row = rows[0]
+    return len(rows) * (sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row))
+
+
+def _rechunk(batches: pa.RecordBatchReader, rows: int) -> Iterator[pa.Table]:
+    """Regroup record batches as Dremio sends them into tables of `rows` rows.
+
+    The last table holds the remaining rows.
+    """
+    buffered: List[pa.RecordBatch] = []
+    count = 0
+    for batch in batches:
+        while batch.num_rows:
+            take = batch.slice(0, rows - count)
+            buffered.append(take)
+            count += take.num_rows
+            batch = batch.slice(take.num_rows)
+            if count == rows:
+                yield pa.Table.from_batches(buffered, schema=batches.schema)
+                buffered, count = [], 0
+    if count:
+        yield pa.Table.from_batches(buffered, schema=batches.schema)
@@ -0,0 +1,106 @@
+"""Progress journal of a backup, for resuming it after a failure.
+
+While a backup runs, every file it completes is first written under a
+temporary name and renamed once complete, then recorded in
+`{name}.journal.jsonl`: one JSON line per file with its row count, after a
+first line with the settings of the backup. A backup that dies leaves only
+complete files and a journal of them.
+
+`pc backup query --resume` reads the journal back and continues after the
+files it lists. The journal is deleted when the backup completes.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+
+class BackupJournal:
+    """Files completed by a backup, appended to a JSON Lines file as they complete."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.completed: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def start(self, settings: Dict[str, Any], resume: bool) -> None:
+        """Start a new journal, or with `resume` continue the journal there is.
+
+        Args:
+            settings: What identifies the backup, e.g. its query and format
+            resume: Read back the files completed before instead of starting over
+
+        Raises:
+            ValueError: If the journal to resume is of a backup with other settings
+        """
+        if not (resume and self.path.exists()):
+            self._write(settings, [])
+            return
+        lines = self.path.read_text(encoding="utf-8").splitlines()
+        header = json.loads(lines[0])
+        if header != settings:
+            changed = sorted(
+                key
+                for key in settings.keys() | header.keys()
+                if header.get(key) != settings.get(key)
+            )
+            raise ValueError(f"cannot resume a backup with other {', '.join(changed)}")
+        entries = []
+        for line in lines[1:]:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                # The last line of a journal written when the backup died may be cut off
+                break
+        self.completed = {entry["file"]: entry for entry in entries}
+        # Drop a cut-off line, so entries appended from now on can be read back
+        self._write(header, entries)
+
+    def __contains__(self, file: str) -> bool:
+        return file in self.completed
+
+    @property
+    def rows(self) -> int:
+        """Rows in the files completed so far."""
+        return sum(entry["rows"] for entry in self.completed.values())
+
+    def record(self, file: str, rows: int, **details: Any) -> None:
+        """Record a completed file, on disk before returning.
+
+        Args:
+            file: Name of the file
+            rows: Rows in the file
+            details: Anything else to check on resuming, e.g. the query of a part
+        """
+        entry = {"file": file, "rows": rows, **details}
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as journal:
+                journal.write(json.dumps(entry) + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+            self.completed[file] = entry
+
+    def finish(self) -> None:
+        """Delete the journal of a completed backup."""
+        self.path.unlink(missing_ok=True)
+
+    def _write(self, header: Dict[str, Any], entries: list) -> None:
+        temporary = temporary_path(self.path)
+        with open(temporary, "w", encoding="utf-8") as journal:
+            for line in [header, *entries]:
+                journal.write(json.dumps(line) + "\n")
+        os.replace(temporary, self.path)
+
+
+def replace_atomically(temporary: Path, path: Path) -> None:
+    """Move a completely written file to its final name, flushed to disk first."""
+    with open(temporary, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def temporary_path(path: Path) -> Path:
+    """Name a file is written under until it is complete."""
+    return path.with_name(path.name + ".tmp")
@@ -0,0 +1,154 @@
+"""Manifest of an incremental backup.
+
+An incremental backup (`pc backup query --incremental-by <column>`) keeps a
+JSON manifest next to its files, `{name}.manifest.json`. It records the
+high-water mark: the largest value of the column backed up so far. The next
+run only fetches rows beyond it and appends new part files.
+
+For every part file the manifest lists its row count, size in bytes, SHA-256
+checksum and the high-water mark after it, so a restore can check the files
+are complete and unchanged.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Engine
+
+from . import arrow, keyset
+
+
+@dataclass
+class ManifestPart:
+    """One file written by an incremental backup run."""
+
+    file: str
+    rows: int
+    bytes: int
+    sha256: str
+    created: str
+    watermark: Any = None
+
+
+@dataclass
+class BackupManifest:
+    """High-water mark and part files of a named incremental backup."""
+
+    path: Path
+    name: str
+    column: str
+    format: str
+    watermark: Any = None
+    runs: int = 0
+    parts: List[ManifestPart] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: Path, name: str, column: str, format: str) -> "BackupManifest":
+        """Read the manifest at `path`, or start a new one when there is none.
+
+        Raises:
+            ValueError: If the manifest was written for another column or format
+        """
+        if not path.exists():
+            return cls(path, name, column, format)
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if (data["column"], data["format"]) != (column, format):
+            raise ValueError(
+                f"{path.name} is an incremental backup by {data['column']} as {data['format']}"
+            )
+        return cls(
+            path,
+            data["name"],
+            data["column"],
+            data["format"],
+            watermark=decode_value(data["watermark"]),
+            runs=data["runs"],
+            parts=[
+                ManifestPart(**{**part, "watermark": decode_value(part["watermark"])})
+                for part in data["parts"]
+            ],
+        )
+
+    def filter_query(self, engine: Engine, query: str) -> str:
+        """The query limited to rows beyond the high-water mark, if there is one."""
+        if self.watermark is None:
+            return query
+        source = sa.text(query).columns(sa.column(self.column)).subquery("backup_source")
+        statement = (
+            sa.select(sa.text("*"))
+            .select_from(source)
+            .where(source.c[self.column] > keyset.literal(self.watermark))
+        )
+        return arrow.compile_sql(engine, statement)
+
+    def add(self, path: Path, rows: int, watermark: Any) -> ManifestPart:
+        """Record a written part file and raise the high-water mark to its maximum."""
+        part = ManifestPart(
+            file=path.name,
+            rows=rows,
+            bytes=path.stat().st_size,
+            sha256=file_sha256(path),
+            created=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            watermark=watermark,
+        )
+        self.parts.append(part)
+        if watermark is not None and (self.watermark is None or watermark > self.watermark):
+            self.watermark = watermark
+        return part
+
+    def save(self) -> None:
+        """Write the manifest, replacing the previous one only once it is complete."""
+        data = {
+            "name": self.name,
+            "column": self.column,
+            "format": self.format,
+            "watermark": encode_value(self.watermark),
+            "runs": self.runs,
+            "parts": [
+                {**asdict(part), "watermark": encode_value(part.watermark)} for part in self.parts
+            ],
+        }
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        temporary.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        os.replace(temporary, self.path)
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 checksum of a file's content, as hex digits."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def encode_value(value: Any) -> Optional[Dict[str, Any]]:
+    """A watermark as JSON, tagged with its type so it reads back the same."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return {"type": "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {"type": "date", "value": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"type": "decimal", "value": str(value)}
+    return {"type": type(value).__name__, "value": value}
+
+
+def decode_value(data: Optional[Dict[str, Any]]) -> Any:
+    """A watermark written by `encode_value`."""
+    if data is None:
+        return None
+    decoders = {
+        "datetime": datetime.fromisoformat,
+        "date": date.fromisoformat,
+        "decimal": Decimal,
+    }
+    return decoders.get(data["type"], lambda value: value)(data["value"])
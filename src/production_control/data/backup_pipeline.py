@@ -0,0 +1,237 @@
+"""Overlapped fetching and writing of backups.
+
+A backup used to alternate between fetching a chunk from Dremio and writing
+it to disk, so the network and the disk were never busy at the same time.
+
+`run_pipeline` fetches in a thread of its own while the calling thread
+encodes and writes; fetched chunks wait in a `ChunkQueue` in between. When
+writing falls behind, the queue fills up and the fetch thread waits for room
+(back-pressure), so at most `max_chunks` chunks and about `max_bytes` bytes
+are held at once. A single chunk larger than that is still let through, on
+its own.
+
+`StageTimes` records where the time went: fetching from Dremio, encoding
+and compressing, and writing to disk, and how long each side waited for the
+other. The stage taking the most time is the bottleneck.
+
+Settings can be tuned with environment variables:
+- VINEAPP_BACKUP_QUEUE_CHUNKS: chunks fetched ahead of the writer (default: 4)
+- VINEAPP_BACKUP_QUEUE_MB: megabytes fetched ahead of the writer (default: 256)
+"""
+
+import contextvars
+import io
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Generator, Optional, Tuple, TypeVar
+
+from .engine import _env_int
+
+DEFAULT_QUEUE_CHUNKS = 4
+DEFAULT_QUEUE_MB = 256
+
+T = TypeVar("T")
+
+
+@dataclass
+class StageTimes:
+    """Seconds spent per stage of a backup, and waiting between them."""
+
+    # Waiting for Dremio's rows and assembling them into chunks
+    fetch: float = 0.0
+    # Converting chunks to the file format and compressing them
+    encode: float = 0.0
+    # Writing encoded bytes to disk and flushing them
+    disk: float = 0.0
+    # Fetch thread waiting for room in the queue (back-pressure)
+    fetch_waited: float = 0.0
+    # Writer waiting for the next chunk
+    write_waited: float = 0.0
+    peak_bytes: int = 0
+
+    @property
+    def bottleneck(self) -> str:
+        """Name of the stage that took the most time."""
+        stages = {"fetch": self.fetch, "encode": self.encode, "disk": self.disk}
+        return max(stages, key=stages.get)
+
+    def add(self, other: "StageTimes") -> None:
+        """Add the times of another file of the same backup."""
+        self.fetch += other.fetch
+        self.encode += other.encode
+        self.disk += other.disk
+        self.fetch_waited += other.fetch_waited
+        self.write_waited += other.write_waited
+        self.peak_bytes = max(self.peak_bytes, other.peak_bytes)
+
+    def summary(self) -> str:
+        return (
+            f"fetch {self.fetch:.1f}s, encode {self.encode:.1f}s, disk {self.disk:.1f}s "
+            f"(bottleneck: {self.bottleneck}); fetching waited {self.fetch_waited:.1f}s "
+            f"for the writer, writing {self.write_waited:.1f}s for Dremio; "
+            f"at most {self.peak_bytes / 1_000_000:,.1f} MB queued"
+        )
+
+
+class ChunkQueue:
+    """Queue of fetched chunks, bounded in number and in bytes."""
+
+    def __init__(
+        self,
+        max_chunks: int = DEFAULT_QUEUE_CHUNKS,
+        max_bytes: int = DEFAULT_QUEUE_MB * 1_000_000,
+    ):
+        """Initialize an empty queue.
+
+        Args:
+            max_chunks: Chunks held before `put` waits
+            max_bytes: Bytes held before `put` waits, unless the queue is empty
+        """
+        self.max_chunks = max(1, max_chunks)
+        self.max_bytes = max(0, max_bytes)
+        self.peak_bytes = 0
+        self._items: Deque[Tuple[Any, int]] = deque()
+        self._bytes = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_env(cls) -> "ChunkQueue":
+        """Create a queue configured through VINEAPP_BACKUP_QUEUE_* environment variables."""
+        return cls(
+            max_chunks=_env_int("VINEAPP_BACKUP_QUEUE_CHUNKS", DEFAULT_QUEUE_CHUNKS),
+            max_bytes=_env_int("VINEAPP_BACKUP_QUEUE_MB", DEFAULT_QUEUE_MB) * 1_000_000,
+        )
+
+    def put(self, item: Any, size: int) -> bool:
+        """Add an item of `size` bytes, waiting until there is room for it.
+
+        Returns:
+            False if the queue was closed instead, so the item is not wanted anymore
+        """
+        with self._condition:
+            while not self._closed and self._items and not self._fits(size):
+                self._condition.wait()
+            if self._closed:
+                return False
+            self._items.append((item, size))
+            self._bytes += size
+            self.peak_bytes = max(self.peak_bytes, self._bytes)
+            self._condition.notify_all()
+            return True
+
+    def get(self) -> Any:
+        """Remove and return the oldest item, waiting for one if the queue is empty."""
+        with self._condition:
+            while not self._items:
+                self._condition.wait()
+            item, size = self._items.popleft()
+            self._bytes -= size
+            self._condition.notify_all()
+            return item
+
+    def close(self) -> None:
+        """Stop accepting items and wake a `put` that is waiting."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _fits(self, size: int) -> bool:
+        return len(self._items) < self.max_chunks and self._bytes + size <= self.max_bytes
+
+
+class _Done:
+    pass
+
+
+@dataclass
+class _Failed:
+    error: BaseException
+
+
+def run_pipeline(
+    chunks: Generator[T, None, None],
+    write: Callable[[T], None],
+    size: Callable[[T], int],
+    times: StageTimes,
+    queue: Optional[ChunkQueue] = None,
+) -> None:
+    """Fetch chunks in a thread of their own while writing each of them in this thread.
+
+    The generator runs in the fetch thread from start to end, so a
+    connection it opens is only used by that thread. It sees the context
+    variables of the caller, e.g. the query's cancel token.
+
+    Args:
+        chunks: Generator fetching the chunks
+        write: Called with each chunk, in order
+        size: Bytes a chunk holds in memory, to bound the queue by
+        times: Stage times to add the fetch and wait times to
+        queue: Queue between fetching and writing (default: configured from the environment)
+
+    Raises:
+        Exception: Whatever fetching or writing raised. When writing fails,
+            fetching stops after the chunk it is fetching.
+    """
+    queue = queue if queue is not None else ChunkQueue.from_env()
+
+    def fetch() -> None:
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    break
+                fetched = time.perf_counter()
+                times.fetch += fetched - started
+                if not queue.put(chunk, size(chunk)):
+                    return
+                times.fetch_waited += time.perf_counter() - fetched
+            queue.put(_Done(), 0)
+        except BaseException as e:
+            queue.put(_Failed(e), 0)
+        finally:
+            # Close the connection of a generator stopped early in this thread
+            chunks.close()
+
+    context = contextvars.copy_context()
+    thread = threading.Thread(target=context.run, args=(fetch,), name="backup-fetch")
+    thread.start()
+    try:
+        while True:
+            started = time.perf_counter()
+            item = queue.get()
+            times.write_waited += time.perf_counter() - started
+            if isinstance(item, _Done):
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            write(item)
+    finally:
+        queue.close()
+        thread.join()
+        times.peak_bytes = max(times.peak_bytes, queue.peak_bytes)
+
+
+class TimedFile(io.FileIO):
+    """File opened for writing that adds the time spent writing to `times.disk`."""
+
+    def __init__(self, path: Path, times: StageTimes):
+        super().__init__(path, "w")
+        self.times = times
+
+    def write(self, data: Any) -> int:
+        started = time.perf_counter()
+        try:
+            return super().write(data)
+        finally:
+            self.times.disk += time.perf_counter() - started
+
+
+def open_timed(path: Path, times: StageTimes, buffer_size: int = 1 << 20) -> io.BufferedWriter:
+    """Open a file for buffered binary writing, timing the writes to disk."""
+    return io.BufferedWriter(TimedFile(path, times), buffer_size)
@@ -0,0 +1,291 @@
+"""Read-through result cache for Dremio queries.
+
+Every list page interaction goes back to Dremio, even when several operators
+look at the same first page within seconds of each other. Query results are
+kept in a process-wide cache keyed on (model, compiled SQL, parameters):
+entries expire after a per-model TTL and the least recently used entry is
+evicted when the cache is full.
+
+Expired entries are kept for a while longer, so a list page can show the
+previous result at once while it is reloaded (stale-while-revalidate, see
+`DremioRepository.stale`).
+
+Code that writes to the systems behind the Dremio views (the Firebird
+endpoints, OpTech corrections) calls `invalidate` for the affected models, so
+the next read goes back to Dremio.
+
+Settings can be tuned with environment variables:
+- VINEAPP_CACHE_TTL: default seconds a result stays fresh; 0 disables caching (default: 30)
+- VINEAPP_CACHE_MAX_ENTRIES: results kept before the oldest is evicted (default: 256)
+- VINEAPP_CACHE_COUNT_TTL: seconds a total row count per filter stays fresh (default: 10)
+- VINEAPP_CACHE_MAX_STALE: seconds an expired result may still be shown while reloading
+  (default: 300)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30.0
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_COUNT_TTL = 10.0
+DEFAULT_MAX_STALE = 300.0
+
+V = TypeVar("V")
+ModelRef = Union[Type, str]
+
+
+def _model_name(model: ModelRef) -> str:
+    return model if isinstance(model, str) else model.__name__
+
+
+def _env_number(name: str, default: float, kind: Callable[[str], Any]) -> Any:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return kind(raw)
+    except ValueError:
+        logger.warning("invalid %s %r; using %s", name, raw, default)
+        return default
+
+
+@dataclass
+class CacheStats:
+    """Counters for one model, or for the cache as a whole."""
+
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+@dataclass(frozen=True)
+class CachedValue:
+    """A value found in the cache, with how old it is."""
+
+    value: Any
+    age: float
+    fresh: bool
+
+
+class ResultCache:
+    """Size-bounded LRU cache whose entries expire after a per-model TTL.
+
+    Values are stored as-is and shared between callers; cache immutable
+    values (tuples) or copy them on the way out.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        default_ttl: float = DEFAULT_TTL,
+        max_stale: float = DEFAULT_MAX_STALE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: Number of entries kept before the least recently used is evicted
+            default_ttl: Seconds an entry stays fresh unless its model has its own TTL
+            max_stale: Seconds an expired entry is kept for `lookup` with `max_stale`
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale
+        self._clock = clock
+        # (model, key) -> (expires at, stored at, value)
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, float, Any]]" = OrderedDict()
+        self._ttls: Dict[str, float] = {}
+        self._stats: Dict[str, CacheStats] = {}
+        self._listeners: list = []
+        # Incremented by every invalidation, so copies kept elsewhere can tell they may be outdated
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """Create a cache configured through VINEAPP_CACHE_* environment variables."""
+        return cls(
+            max_entries=_env_number("VINEAPP_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES, int),
+            default_ttl=_env_number("VINEAPP_CACHE_TTL", DEFAULT_TTL, float),
+            max_stale=_env_number("VINEAPP_CACHE_MAX_STALE", DEFAULT_MAX_STALE, float),
+        )
+
+    def set_ttl(self, model: ModelRef, ttl: Optional[float]) -> None:
+        """Set the TTL for a model's results; None restores the default."""
+        with self._lock:
+            if ttl is None:
+                self._ttls.pop(_model_name(model), None)
+            else:
+                self._ttls[_model_name(model)] = ttl
+
+    def ttl_for(self, model: ModelRef) -> float:
+        """Seconds a result for `model` stays fresh."""
+        return self._ttls.get(_model_name(model), self.default_ttl)
+
+    def _model_stats(self, name: str) -> CacheStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = CacheStats()
+        return stats
+
+    def get(self, model: ModelRef, key: Hashable) -> Tuple[bool, Any]:
+        """Look up a fresh entry.
+
+        Returns:
+            Tuple of (hit, value); value is None on a miss
+        """
+        found = self.lookup(model, key)
+        return (True, found.value) if found is not None else (False, None)
+
+    def lookup(
+        self, model: ModelRef, key: Hashable, max_stale: float = 0.0
+    ) -> Optional[CachedValue]:
+        """Look up an entry that is fresh, or expired no more than `max_stale` seconds ago.
+
+        Returns:
+            The value and its age, or None on a miss
+        """
+        name = _model_name(model)
+        with self._lock:
+            stats = self._model_stats(name)
+            entry = self._entries.get((name, key))
+            now = self._clock()
+            if entry is not None:
+                expires_at, stored_at, value = entry
+                if expires_at > now or now - expires_at < min(max_stale, self.max_stale):
+                    self._entries.move_to_end((name, key))
+                    fresh = expires_at > now
+                    if fresh:
+                        stats.hits += 1
+                    else:
+                        stats.stale_hits += 1
+                    return CachedValue(value, now - stored_at, fresh)
+                if now - expires_at >= self.max_stale:
+                    del self._entries[(name, key)]
+            stats.misses += 1
+            return None
+
+    def put(self, model: ModelRef, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries when full.
+
+        Args:
+            model: Model the value was read for
+            key: Cache key within the model
+            value: Value to store
+            ttl: Seconds the value stays fresh; defaults to the model's TTL
+        """
+        name = _model_name(model)
+        if ttl is None:
+            ttl = self.ttl_for(name)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            now = self._clock()
+            self._entries[(name, key)] = (now + ttl, now, value)
+            self._entries.move_to_end((name, key))
+            while len(self._entries) > self.max_entries:
+                (evicted, _), _ = self._entries.popitem(last=False)
+                self._model_stats(evicted).evictions += 1
+
+    def get_or_load(
+        self,
+        model: ModelRef,
+        key: Hashable,
+        load: Callable[[], V],
+        ttl: Optional[float] = None,
+    ) -> V:
+        """Return the cached value for `key`, loading and storing it on a miss."""
+        hit, value = self.get(model, key)
+        if hit:
+            return value
+        value = load()
+        self.put(model, key, value, ttl)
+        return value
+
+    def add_invalidation_listener(self, listener: Callable[[Optional[str]], None]) -> None:
+        """Call `listener` with the model name (None for everything) on invalidation."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def invalidate(self, model: Optional[ModelRef] = None) -> int:
+        """Drop all entries for a model, or every entry when no model is given.
+
+        Returns:
+            Number of entries dropped
+        """
+        name = None if model is None else _model_name(model)
+        with self._lock:
+            if name is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [k for k in self._entries if k[0] == name]
+                for k in keys:
+                    del self._entries[k]
+                dropped = len(keys)
+                self._model_stats(name).invalidations += 1
+            self.generation += 1
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(name)
+        logger.debug("invalidated %d cached results for %s", dropped, name or "all models")
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters in total and per model, plus the current size."""
+        with self._lock:
+            total = CacheStats()
+            models = {}
+            for name, stats in self._stats.items():
+                models[name] = stats.to_dict()
+                total.hits += stats.hits
+                total.stale_hits += stats.stale_hits
+                total.misses += stats.misses
+                total.evictions += stats.evictions
+                total.invalidations += stats.invalidations
+            return {
+                **total.to_dict(),
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "models": models,
+            }
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+
+result_cache = ResultCache.from_env()
+
+COUNT_TTL = _env_number("VINEAPP_CACHE_COUNT_TTL", DEFAULT_COUNT_TTL, float)
+
+
+def invalidate(*models: ModelRef) -> None:
+    """Invalidate cached results for the given models in the shared cache.
+
+    Call this after writing to a source system so the next read of the
+    affected Dremio views is not served from the cache.
+    """
+    for model in models:
+        result_cache.invalidate(model)
@@ -0,0 +1,253 @@
+"""Circuit breaker for Dremio.
+
+While Dremio restarts or hangs, every query waits for its deadline before
+failing, so each page load and each scan takes that long. Repositories report
+the outcome of their live queries to a `CircuitBreaker` per engine: after
+`failure_threshold` consecutive outage errors (deadline exceeded, server
+unreachable, no free connection) the circuit opens. While it is open, queries
+are not sent at all; repositories serve the last good result they still hold
+or fail at once (see `DremioRepository._measure`).
+
+An open circuit is closed again by a background thread probing Dremio with a
+trivial query every `probe_interval` seconds, not by user requests, so no page
+waits for a deadline to find out Dremio is still down.
+
+Errors in the query itself (bad SQL, unknown column) do not count: Dremio
+answered. Neither do errors of queries on snapshots (see `data.snapshot`),
+which never reach Dremio.
+
+Settings can be tuned with environment variables:
+- VINEAPP_DB_CIRCUIT_FAILURES: consecutive outage errors opening the circuit; 0 disables it
+  (default: 3)
+- VINEAPP_DB_CIRCUIT_PROBE_INTERVAL: seconds between probes while the circuit is open (default: 10)
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from pyarrow import flight
+from sqlalchemy import Engine
+from sqlalchemy import exc as sa_exc
+
+from .engine import _env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_PROBE_INTERVAL = 10
+
+CLOSED = "closed"
+OPEN = "open"
+
+# Errors telling Dremio is unreachable or not answering, rather than that a query is wrong
+_OUTAGE_ERRORS = (
+    TimeoutError,
+    ConnectionError,
+    flight.FlightTimedOutError,
+    flight.FlightUnavailableError,
+    sa_exc.TimeoutError,
+    sa_exc.DisconnectionError,
+)
+
+
+def is_outage(error: BaseException) -> bool:
+    """Whether an error means Dremio is down or not answering in time.
+
+    Driver errors wrapped by SQLAlchemy count when the connection was lost
+    or the driver's own error is an outage error; a wrapped SQL error does not.
+    """
+    if isinstance(error, _OUTAGE_ERRORS):
+        return True
+    if isinstance(error, sa_exc.DBAPIError):
+        return error.connection_invalidated or isinstance(error.orig, _OUTAGE_ERRORS)
+    return False
+
+
+class CircuitBreaker:
+    """Tracks consecutive outage errors of one Dremio engine and probes it while open."""
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Any],
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        probe_interval: float = DEFAULT_PROBE_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize a closed circuit.
+
+        Args:
+            name: Name used in logs, e.g. the engine URL
+            probe: Trivial query; the circuit closes once it returns without raising
+            failure_threshold: Consecutive outage errors that open the circuit
+            probe_interval: Seconds between probes while the circuit is open
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self._clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.opened = 0
+        self.rejected = 0
+        self.probes = 0
+        self._prober: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def allow(self) -> bool:
+        """Whether a query may be sent; counts the queries turned away while open."""
+        with self._lock:
+            if self.state == OPEN:
+                self.rejected += 1
+                return False
+            return True
+
+    def record_success(self) -> None:
+        """Dremio answered; consecutive errors start counting from zero again."""
+        with self._lock:
+            self.failures = 0
+
+    def record_failure(self, error: BaseException) -> None:
+        """Count an outage error, opening the circuit when the threshold is reached."""
+        with self._lock:
+            self.failures += 1
+            if self.state == OPEN or self.failures < self.failure_threshold:
+                return
+            self.state = OPEN
+            self.opened_at = self._clock()
+            self.opened += 1
+        logger.warning(
+            "circuit for %s opened after %d failed queries: %r", self.name, self.failures, error
+        )
+        self._start_prober()
+
+    def probe_now(self) -> bool:
+        """Send the probe query once, closing the circuit when it succeeds."""
+        with self._lock:
+            self.probes += 1
+        try:
+            self.probe()
+        except Exception as e:
+            logger.debug("probe of %s failed: %r", self.name, e)
+            return False
+        with self._lock:
+            was_open = self.state == OPEN
+            self.state = CLOSED
+            self.failures = 0
+            opened_at, self.opened_at = self.opened_at, None
+        if was_open:
+            logger.warning(
+                "circuit for %s closed after %.0fs", self.name, self._clock() - opened_at
+            )
+        return True
+
+    def _start_prober(self) -> None:
+        with self._lock:
+            if self._prober is not None and self._prober.is_alive():
+                return
+            self._stop.clear()
+            self._prober = threading.Thread(
+                target=self._probe_until_closed, name="dremio-circuit-probe", daemon=True
+            )
+            self._prober.start()
+
+    def _probe_until_closed(self) -> None:
+        while not self._stop.wait(self.probe_interval):
+            if self.probe_now():
+                return
+
+    def stop(self) -> None:
+        """Stop probing, e.g. on shutdown."""
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """State and counters of the circuit."""
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "open_seconds": (
+                    round(self._clock() - self.opened_at, 1) if self.opened_at is not None else None
+                ),
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "probes": self.probes,
+            }
+
+
+def _ping(engine: Engine) -> None:
+    with engine.connect() as connection:
+        connection.exec_driver_sql("SELECT 1").fetchall()
+
+
+class CircuitBreakers:
+    """One circuit breaker per Dremio server, shared by all engines connecting to it."""
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        probe_interval: float = DEFAULT_PROBE_INTERVAL,
+    ):
+        """Initialize without breakers; they are created per engine on first use.
+
+        Args:
+            failure_threshold: Consecutive outage errors opening a circuit; 0 disables them
+            probe_interval: Seconds between probes while a circuit is open
+        """
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreakers":
+        """Create breakers configured through VINEAPP_DB_CIRCUIT_* environment variables."""
+        return cls(
+            failure_threshold=_env_int("VINEAPP_DB_CIRCUIT_FAILURES", DEFAULT_FAILURE_THRESHOLD),
+            probe_interval=_env_int("VINEAPP_DB_CIRCUIT_PROBE_INTERVAL", DEFAULT_PROBE_INTERVAL),
+        )
+
+    def for_engine(self, engine: Engine) -> Optional[CircuitBreaker]:
+        """The breaker for an engine's server, or None when breakers are disabled."""
+        if self.failure_threshold <= 0:
+            return None
+        name = engine.url.render_as_string(hide_password=True)
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(name)
+                if breaker is None:
+                    breaker = self._breakers[name] = CircuitBreaker(
+                        name,
+                        lambda: _ping(engine),
+                        failure_threshold=self.failure_threshold,
+                        probe_interval=self.probe_interval,
+                    )
+        return breaker
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """State and counters per server URL, with the password hidden."""
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {name: breaker.stats() for name, breaker in breakers}
+
+    def stop(self) -> None:
+        """Stop all probes and forget the breakers."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+            self._breakers.clear()
+        for breaker in breakers:
+            breaker.stop()
+
+
+circuit_breakers = CircuitBreakers.from_env()
@@ -0,0 +1,196 @@
+"""Process-wide registry of shared SQLAlchemy engines.
+
+Creating an engine per repository instance means every page request pays the
+Flight handshake and authentication again and leaves behind engines nobody
+disposes. Instead, engines are created lazily, once per connection string, and
+shared by all repositories, the bot and the backup command.
+
+Pool settings can be tuned with environment variables:
+- VINEAPP_DB_POOL_SIZE: connections kept open per engine (default: 5)
+- VINEAPP_DB_MAX_OVERFLOW: extra connections allowed under load (default: 5)
+- VINEAPP_DB_POOL_TIMEOUT: seconds to wait for a free connection (default: 30)
+- VINEAPP_DB_POOL_RECYCLE: seconds before an idle connection is replaced (default: 1800)
+
+Every Flight call gets a deadline, so a query on a hanging Dremio fails
+instead of holding its worker thread and pooled connection indefinitely:
+- VINEAPP_DB_QUERY_DEADLINE: seconds a Dremio query may take; 0 waits forever (default: 25)
+
+A repository can use a shorter deadline for its own queries through the
+`query_deadline` execution option, see `DremioRepository.with_deadline`.
+Work expected to run long sets it to 0: backups, snapshot refreshes and the
+bot's queries.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from pyarrow import flight
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 5
+DEFAULT_POOL_TIMEOUT = 30
+DEFAULT_POOL_RECYCLE = 1800
+# Below the executor's default timeout, so the worker is free again by the time the caller gives up
+DEFAULT_QUERY_DEADLINE = 25
+
+
+@dataclass
+class _PoolCounters:
+    """Connection lifecycle counters for one engine."""
+
+    connects: int = 0
+    checkouts: int = 0
+    checkins: int = 0
+    invalidations: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def increment(self, name: str) -> None:
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+_engines: Dict[str, Engine] = {}
+_counters: Dict[str, _PoolCounters] = {}
+_lock = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("invalid %s %r; using %d", name, raw, default)
+        return default
+
+
+def default_connection_string() -> str:
+    """Connection string configured through VINEAPP_DB_CONNECTION."""
+    return os.getenv("VINEAPP_DB_CONNECTION", "")
+
+
+def default_query_deadline() -> int:
+    """Seconds a Dremio query may take, from VINEAPP_DB_QUERY_DEADLINE."""
+    return _env_int("VINEAPP_DB_QUERY_DEADLINE", DEFAULT_QUERY_DEADLINE)
+
+
+def flight_call_options(
+    options: flight.FlightCallOptions, execution_options: Dict[str, Any]
+) -> flight.FlightCallOptions:
+    """A Flight connection's call options with the query deadline as timeout.
+
+    The deadline is the `query_deadline` execution option when set, otherwise
+    VINEAPP_DB_QUERY_DEADLINE; 0 or less leaves the options without a timeout.
+    """
+    deadline = execution_options.get("query_deadline")
+    if deadline is None:
+        deadline = default_query_deadline()
+    if deadline <= 0:
+        return flight.FlightCallOptions(headers=options.headers)
+    return flight.FlightCallOptions(headers=options.headers, timeout=deadline)
+
+
+def _set_default_deadline(dbapi_connection, connection_record) -> None:
+    # Also covers calls outside statement execution, like the pool's pre-ping
+    if getattr(dbapi_connection, "flightclient", None) is not None:
+        dbapi_connection.options = flight_call_options(dbapi_connection.options, {})
+
+
+def _apply_query_deadline(conn, cursor, statement, parameters, context, executemany) -> None:
+    # A `query_deadline` execution option replaces the connection's default deadline
+    execution_options = context.execution_options if context is not None else {}
+    if "query_deadline" in execution_options and getattr(cursor, "flightclient", None):
+        cursor.options = flight_call_options(cursor.options, execution_options)
+
+
+def _create_engine(connection_string: str) -> Engine:
+    # The Dremio dialect defaults to SingletonThreadPool, which opens one
+    # Flight connection per thread and never bounds or recycles them.
+    engine = create_engine(
+        connection_string,
+        poolclass=QueuePool,
+        pool_size=_env_int("VINEAPP_DB_POOL_SIZE", DEFAULT_POOL_SIZE),
+        max_overflow=_env_int("VINEAPP_DB_MAX_OVERFLOW", DEFAULT_MAX_OVERFLOW),
+        pool_timeout=_env_int("VINEAPP_DB_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT),
+        pool_recycle=_env_int("VINEAPP_DB_POOL_RECYCLE", DEFAULT_POOL_RECYCLE),
+        pool_pre_ping=True,
+    )
+
+    counters = _PoolCounters()
+    event.listen(engine, "connect", lambda *args: counters.increment("connects"))
+    event.listen(engine, "checkout", lambda *args: counters.increment("checkouts"))
+    event.listen(engine, "checkin", lambda *args: counters.increment("checkins"))
+    event.listen(engine, "invalidate", lambda *args: counters.increment("invalidations"))
+    event.listen(engine, "connect", _set_default_deadline)
+    event.listen(engine, "before_cursor_execute", _apply_query_deadline)
+    _counters[connection_string] = counters
+    return engine
+
+
+def shared_engine(connection_string: Optional[str] = None) -> Engine:
+    """Return the shared engine for a connection string, creating it on first use.
+
+    Args:
+        connection_string: SQLAlchemy URL; defaults to VINEAPP_DB_CONNECTION
+
+    Returns:
+        The engine shared by every caller using the same connection string
+    """
+    if connection_string is None:
+        connection_string = default_connection_string()
+
+    engine = _engines.get(connection_string)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        engine = _engines.get(connection_string)
+        if engine is None:
+            engine = _create_engine(connection_string)
+            _engines[connection_string] = engine
+            logger.info(
+                "created shared engine for %s", engine.url.render_as_string(hide_password=True)
+            )
+        return engine
+
+
+def pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """Pool state and connection counters per shared engine.
+
+    Keys are the connection URLs with the password hidden.
+    """
+    metrics = {}
+    with _lock:
+        items = list(_engines.items())
+    for connection_string, engine in items:
+        pool = engine.pool
+        counters = _counters[connection_string]
+        metrics[engine.url.render_as_string(hide_password=True)] = {
+            "pool_size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "connects": counters.connects,
+            "checkouts": counters.checkouts,
+            "checkins": counters.checkins,
+            "invalidations": counters.invalidations,
+        }
+    return metrics
+
+
+def dispose_engines() -> None:
+    """Dispose and forget all shared engines (e.g. on shutdown or in tests)."""
+    with _lock:
+        engines = list(_engines.values())
+        _engines.clear()
+        _counters.clear()
+    for engine in engines:
+        engine.dispose()
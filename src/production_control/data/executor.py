@@ -0,0 +1,173 @@
+"""Bounded thread pool for running Dremio queries off the event loop.
+
+The Flight driver is synchronous, so a query run directly in a NiceGUI
+handler blocks the event loop, and with it the UI of every connected tablet,
+until Dremio answers. `run_in_pool` runs blocking repository calls on a
+dedicated, bounded pool of worker threads instead and awaits the result with
+a timeout.
+
+Cancelling the awaiting task (or timing out) drops a query that is still
+queued. A query that already started is told through its `CancelToken`:
+results read from the Flight stream stop at the next record batch (see
+`arrow.read_table`). Other queries finish on their worker thread and their
+result is discarded.
+
+Settings can be tuned with environment variables:
+- VINEAPP_DB_WORKERS: worker threads (default: pool size + max overflow)
+- VINEAPP_DB_QUERY_TIMEOUT: seconds to wait for a query result (default: 30)
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional, TypeVar
+
+from .engine import DEFAULT_MAX_OVERFLOW, DEFAULT_POOL_SIZE, _env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_TIMEOUT = 30
+
+R = TypeVar("R")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+class QueryCancelledError(Exception):
+    """Raised on a worker thread when the caller stopped waiting for the query."""
+
+    pass
+
+
+class CancelToken:
+    """Tells a query running on a worker thread that its result is no longer wanted."""
+
+    def __init__(self):
+        self.cancelled = False
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def cancel(self) -> None:
+        """Mark the query cancelled and run the registered callbacks."""
+        with self._lock:
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def raise_if_cancelled(self) -> None:
+        """Raise QueryCancelledError when the query was cancelled."""
+        if self.cancelled:
+            raise QueryCancelledError("query cancelled; its caller stopped waiting")
+
+    @contextmanager
+    def on_cancel(self, callback: Callable[[], None]) -> Iterator[None]:
+        """Run `callback` if the query is cancelled while the block runs."""
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                registered = True
+            else:
+                registered = False
+        if not registered:
+            callback()
+        try:
+            yield
+        finally:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+
+_cancel_token: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+
+def current_cancel_token() -> Optional[CancelToken]:
+    """The token of the query running on this worker thread; None outside `run_in_pool`."""
+    return _cancel_token.get()
+
+
+def _run_with_token(token: CancelToken, fn: Callable[..., R], args: tuple, kwargs: dict) -> R:
+    reset = _cancel_token.set(token)
+    try:
+        token.raise_if_cancelled()
+        return fn(*args, **kwargs)
+    finally:
+        _cancel_token.reset(reset)
+
+
+def default_workers() -> int:
+    """One worker per connection the shared engine's pool can hand out."""
+    pool_size = _env_int("VINEAPP_DB_POOL_SIZE", DEFAULT_POOL_SIZE)
+    max_overflow = _env_int("VINEAPP_DB_MAX_OVERFLOW", DEFAULT_MAX_OVERFLOW)
+    return _env_int("VINEAPP_DB_WORKERS", max(1, pool_size + max_overflow))
+
+
+def default_timeout() -> float:
+    """Seconds to wait for a query result, from VINEAPP_DB_QUERY_TIMEOUT."""
+    return _env_int("VINEAPP_DB_QUERY_TIMEOUT", DEFAULT_QUERY_TIMEOUT)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the query thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=default_workers(), thread_name_prefix="dremio-query"
+                )
+    return _executor
+
+
+async def run_in_pool(
+    fn: Callable[..., R], *args: Any, timeout: Optional[float] = None, **kwargs: Any
+) -> R:
+    """Run a blocking call on the query thread pool and await its result.
+
+    When the awaiting task is cancelled or times out, the call's `CancelToken`
+    is cancelled, so a query it runs can stop early.
+
+    Args:
+        fn: Blocking callable, typically a repository method
+        *args: Positional arguments for `fn`
+        timeout: Seconds to wait; defaults to VINEAPP_DB_QUERY_TIMEOUT, 0 or less waits forever
+        **kwargs: Keyword arguments for `fn`
+
+    Returns:
+        The return value of `fn`
+
+    Raises:
+        TimeoutError: If the result is not available within the timeout
+    """
+    if timeout is None:
+        timeout = default_timeout()
+    loop = asyncio.get_running_loop()
+    token = CancelToken()
+    call = functools.partial(_run_with_token, token, fn, args, kwargs)
+    future = loop.run_in_executor(get_executor(), call)
+    try:
+        return await asyncio.wait_for(future, timeout if timeout > 0 else None)
+    except asyncio.TimeoutError:
+        token.cancel()
+        logger.warning(
+            "%s did not finish within %ss", getattr(fn, "__qualname__", repr(fn)), timeout
+        )
+        raise
+    except asyncio.CancelledError:
+        token.cancel()
+        raise
+
+
+def shutdown_executor(wait: bool = False) -> None:
+    """Shut down the query thread pool, dropping queued queries."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,247 @@
+"""Keyset (seek) pagination helpers.
+
+Paging with LIMIT/OFFSET makes Dremio scan and discard every row before the
+requested page, so deep pages get slower the further you go. Keyset pagination
+remembers the sort key of the first and last row of the page that was shown and
+asks for the rows directly after (or before) that key instead, so every page
+costs the same as the first one.
+
+NULL sorts as the highest value in both directions (NULLS LAST ascending,
+NULLS FIRST descending), which matches Dremio's default ordering. The order is
+made explicit so the seek predicates and the ORDER BY can never disagree.
+"""
+
+import base64
+import hashlib
+import json
+import math
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from numbers import Integral, Real
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Column, and_, bindparam, or_
+from sqlalchemy.sql.elements import BindParameter, ColumnElement
+from sqlalchemy.types import NullType, TypeDecorator
+
+# (column, descending) pairs; the last column must be unique (the primary key).
+SortKey = Sequence[Tuple[Column, bool]]
+
+
+def is_seekable(column: Column) -> bool:
+    """Whether values read from `column` can be compared back in SQL exactly.
+
+    Columns whose TypeDecorator converts result values (e.g. TIMESTAMPs read
+    as dates) lose precision on the way into Python, so a seek on them could
+    skip rows.
+    """
+    column_type = type(column.type)
+    if not issubclass(column_type, TypeDecorator):
+        return True
+    return column_type.process_result_value is TypeDecorator.process_result_value
+
+
+def normalize(value: Any) -> Any:
+    """Map driver values onto plain Python values; NaN (pandas' NULL) becomes None."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, Integral) and not isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def sql_literal(value: Any) -> str:
+    """Render a value as a Dremio SQL literal.
+
+    Dremio Flight doesn't support parameterized queries, so seek values are
+    rendered inline.
+
+    Raises:
+        TypeError: If the value has no literal representation
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (Integral, Decimal)):
+        return str(value)
+    if isinstance(value, Real):
+        return repr(float(value))
+    if isinstance(value, datetime):
+        return f"TIMESTAMP '{value.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}'"
+    if isinstance(value, date):
+        return f"DATE '{value.isoformat()}'"
+    if isinstance(value, str):
+        escaped = value.replace("'", "''")
+        return f"'{escaped}'"
+    raise TypeError(f"Cannot render {type(value).__name__} as a SQL literal")
+
+
+class InlineLiteral(TypeDecorator):
+    """Bind parameter type whose values are always rendered with `sql_literal`.
+
+    SQLite, which holds the snapshots (see `data.snapshot`), has no DATE or
+    TIMESTAMP literals; it stores dates and timestamps as ISO text, so they
+    are compared as text in that format there.
+    """
+
+    impl = NullType
+    cache_ok = True
+
+    def process_literal_param(self, value, dialect):
+        if dialect.name == "sqlite" and isinstance(value, date):
+            # The formats of SQLAlchemy's SQLite Date and DateTime types
+            if isinstance(value, datetime):
+                value = value.strftime("%Y-%m-%d %H:%M:%S.%f")
+            else:
+                value = value.isoformat()
+        return sql_literal(value)
+
+
+def literal(value: Any) -> BindParameter:
+    """A value rendered inline as a SQL literal; a list renders as an IN list.
+
+    Unlike `literal_column(sql_literal(value))` the value is a bind parameter,
+    so statements differing only in such values have the same structure and
+    share one compiled SQL template (see `data.sql_template`).
+    """
+    expanding = isinstance(value, (list, tuple))
+    return bindparam(
+        None,
+        list(value) if expanding else value,
+        type_=InlineLiteral(),
+        literal_execute=True,
+        expanding=expanding,
+    )
+
+
+def _encode_value(value: Any) -> List[Any]:
+    if value is None or isinstance(value, (bool, int, str)):
+        return ["v", value]
+    if isinstance(value, float):
+        return ["f", repr(value)]
+    if isinstance(value, Decimal):
+        return ["n", str(value)]
+    if isinstance(value, datetime):
+        return ["t", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def _decode_value(encoded: List[Any]) -> Any:
+    kind, raw = encoded
+    if kind == "v":
+        return raw
+    if kind == "f":
+        return float(raw)
+    if kind == "n":
+        return Decimal(raw)
+    if kind == "t":
+        return datetime.fromisoformat(raw)
+    if kind == "d":
+        return date.fromisoformat(raw)
+    raise ValueError(f"Unknown cursor value kind {kind!r}")
+
+
+@dataclass
+class Cursor:
+    """Sort key boundaries of the page that was last shown."""
+
+    signature: str
+    page: int
+    first: List[Any] = field(default_factory=list)
+    last: List[Any] = field(default_factory=list)
+
+    def encode(self) -> str:
+        """Encode as an opaque, URL-safe token."""
+        payload = {
+            "s": self.signature,
+            "p": self.page,
+            "f": [_encode_value(v) for v in self.first],
+            "l": [_encode_value(v) for v in self.last],
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    @classmethod
+    def decode(cls, token: Optional[str]) -> Optional["Cursor"]:
+        """Decode a token, returning None when it is missing or malformed."""
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            return cls(
+                signature=payload["s"],
+                page=int(payload["p"]),
+                first=[_decode_value(v) for v in payload["f"]],
+                last=[_decode_value(v) for v in payload["l"]],
+            )
+        except (ValueError, KeyError, TypeError):
+            return None
+
+
+def signature(*parts: Any) -> str:
+    """Short stable hash identifying the query shape a cursor belongs to."""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+
+def order_by(sort_key: SortKey, reverse: bool = False) -> List[ColumnElement]:
+    """ORDER BY clauses for a sort key, optionally in reverse."""
+    clauses = []
+    for column, descending in sort_key:
+        if descending != reverse:
+            clauses.append(column.desc().nulls_first())
+        else:
+            clauses.append(column.asc().nulls_last())
+    return clauses
+
+
+def _eq(column: Column, value: Any) -> ColumnElement:
+    if value is None:
+        return column.is_(None)
+    return column == literal(value)
+
+
+def _greater(column: Column, value: Any) -> Optional[ColumnElement]:
+    # NULL is the highest value: nothing is greater than it, and it is
+    # greater than every other value.
+    if value is None:
+        return None
+    return or_(column > literal(value), column.is_(None))
+
+
+def _less(column: Column, value: Any) -> Optional[ColumnElement]:
+    if value is None:
+        return column.is_not(None)
+    return column < literal(value)
+
+
+def _seek(sort_key: SortKey, values: Sequence[Any], forward: bool) -> ColumnElement:
+    """Rows strictly after (forward) or before the given key in sort order."""
+    disjuncts = []
+    for i, (column, descending) in enumerate(sort_key):
+        moves_up = forward != descending
+        step = _greater(column, values[i]) if moves_up else _less(column, values[i])
+        if step is None:
+            continue
+        prefix = [_eq(c, values[j]) for j, (c, _) in enumerate(sort_key[:i])]
+        disjuncts.append(and_(*prefix, step))
+    return or_(*disjuncts)
+
+
+def after(sort_key: SortKey, values: Sequence[Any]) -> ColumnElement:
+    """Predicate for rows that sort after `values`."""
+    return _seek(sort_key, values, forward=True)
+
+
+def before(sort_key: SortKey, values: Sequence[Any]) -> ColumnElement:
+    """Predicate for rows that sort before `values`."""
+    return _seek(sort_key, values, forward=False)
+
+
+def at_or_after(sort_key: SortKey, values: Sequence[Any]) -> ColumnElement:
+    """Predicate for the row with key `values` and every row after it."""
+    same = and_(*[_eq(column, values[i]) for i, (column, _) in enumerate(sort_key)])
+    return or_(same, after(sort_key, values))
@@ -10,6 +10,16 @@ class Pagination:
 
     This class represents pagination and sorting parameters for database queries.
     It also provides conversion methods for web UI integration with Quasar tables.
+
+    The cursor is an opaque keyset token set by the repository after each page
+    load; it lets the next or previous page be fetched by seeking past the
+    last seen sort key instead of using OFFSET. It is not part of the Quasar
+    table state.
+
+    The total signature identifies the filters `total_rows` was counted for.
+    The repository sets it with every load and reuses `total_rows` instead of
+    counting again while the filters are unchanged; clear it to force a
+    recount.
     """
 
     page: int = 1
@@ -17,6 +27,8 @@ class Pagination:
     total_rows: int = 0
     sort_by: Optional[str] = None
     descending: bool = False
+    cursor: Optional[str] = None
+    total_signature: Optional[str] = None
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Pagination":
@@ -0,0 +1,257 @@
+"""Timing of Dremio queries per model and query kind.
+
+Repositories record every query they run (and every page or count served
+from the result cache) with its model, kind (page, count, by_id, ...), row
+count, bytes read where known, cache outcome and duration. Durations go into
+histograms with fixed, exponentially growing buckets per (model, kind, cache
+outcome), so memory stays constant however many queries run, and
+percentiles can be read at any time, e.g. through `/api/metrics/queries`.
+
+Queries slower than a threshold are also written to a JSON Lines log, one
+object per query with its SQL where known, to find the queries that make
+pages slow.
+
+Queries abandoned because nobody waits for them anymore are counted as
+cancelled instead, and so are list loads superseded by a newer one (see
+`record_cancelled_load`).
+
+Settings can be tuned with environment variables:
+- VINEAPP_SLOW_QUERY_MS: queries taking at least this long are logged as slow (default: 1000)
+- VINEAPP_SLOW_QUERY_LOG: file the slow queries are appended to; unset only logs a warning
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from .engine import _env_int
+from .executor import QueryCancelledError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY_MS = 1000
+
+# Upper bounds of the histogram buckets in seconds: 0.5 ms up to about 2 minutes,
+# each bucket sqrt(2) wider than the previous one.
+BUCKETS: Tuple[float, ...] = tuple(0.0005 * 2 ** (i / 2) for i in range(37))
+
+PERCENTILES = (50, 90, 95, 99)
+
+ModelRef = Union[Type, str]
+
+
+def _model_name(model: ModelRef) -> str:
+    return model if isinstance(model, str) else model.__name__
+
+
+class Histogram:
+    """Duration counts per bucket, with the total and maximum."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound of the bucket holding the given percentile, at most the maximum."""
+        if not self.count:
+            return 0.0
+        rank = percent / 100 * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+@dataclass
+class QuerySample:
+    """One query being measured; set `rows` and `bytes` once they are known.
+
+    `cache` tells how the result cache was involved: "hit" or "stale" when the
+    result came from it, "miss" when it had to be queried, "bypass" when the
+    query does not go through the cache.
+    """
+
+    model: str
+    kind: str
+    cache: str = "bypass"
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+    sql: Optional[str] = None
+
+
+@dataclass
+class _Group:
+    histogram: Histogram = field(default_factory=Histogram)
+    errors: int = 0
+    cancelled: int = 0
+    rows: int = 0
+    bytes: int = 0
+
+
+class QueryMetrics:
+    """Query duration histograms and the slow-query log."""
+
+    def __init__(
+        self,
+        slow_seconds: float = DEFAULT_SLOW_QUERY_MS / 1000,
+        slow_log: Optional[Union[str, Path]] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """Initialize without any recorded queries.
+
+        Args:
+            slow_seconds: Queries taking at least this long are logged as slow
+            slow_log: JSON Lines file slow queries are appended to
+            clock: Time source for durations, replaceable in tests
+        """
+        self.slow_seconds = slow_seconds
+        self.slow_log = Path(slow_log) if slow_log else None
+        self._clock = clock
+        self._groups: Dict[Tuple[str, str, str], _Group] = {}
+        self._cancelled_loads: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "QueryMetrics":
+        """Create metrics configured through VINEAPP_SLOW_QUERY_* environment variables."""
+        return cls(
+            slow_seconds=_env_int("VINEAPP_SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS) / 1000,
+            slow_log=os.getenv("VINEAPP_SLOW_QUERY_LOG") or None,
+        )
+
+    @contextmanager
+    def measure(
+        self, model: ModelRef, kind: str, cache: str = "bypass", sql: Optional[str] = None
+    ) -> Iterator[QuerySample]:
+        """Time the enclosed query and record it, also when it raises.
+
+        A query raising QueryCancelledError is counted as cancelled, not as an
+        error, and is never logged as slow.
+
+        Yields:
+            The sample to complete with the row count and bytes read
+        """
+        sample = QuerySample(_model_name(model), kind, cache, sql=sql)
+        started = self._clock()
+        try:
+            yield sample
+        except QueryCancelledError:
+            self.record(sample, self._clock() - started, cancelled=True)
+            raise
+        except BaseException:
+            self.record(sample, self._clock() - started, error=True)
+            raise
+        self.record(sample, self._clock() - started)
+
+    def record(
+        self, sample: QuerySample, seconds: float, error: bool = False, cancelled: bool = False
+    ) -> None:
+        """Add a finished query to its histogram and log it when it was slow.
+
+        A cancelled query is only counted; its duration says nothing about Dremio.
+        """
+        key = (sample.model, sample.kind, sample.cache)
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = _Group()
+            if cancelled:
+                group.cancelled += 1
+                return
+            group.histogram.add(seconds)
+            group.errors += error
+            group.rows += sample.rows or 0
+            group.bytes += sample.bytes or 0
+        if seconds >= self.slow_seconds:
+            self._log_slow(sample, seconds, error)
+
+    def record_cancelled_load(self, model: ModelRef) -> None:
+        """Count a list load of `model` abandoned because a newer load replaced it."""
+        name = _model_name(model)
+        with self._lock:
+            self._cancelled_loads[name] = self._cancelled_loads.get(name, 0) + 1
+
+    def _log_slow(self, sample: QuerySample, seconds: float, error: bool) -> None:
+        logger.warning(
+            "slow %s query on %s: %.3fs, %s rows", sample.kind, sample.model, seconds, sample.rows
+        )
+        if self.slow_log is None:
+            return
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "model": sample.model,
+            "kind": sample.kind,
+            "cache": sample.cache,
+            "seconds": round(seconds, 6),
+            "rows": sample.rows,
+            "bytes": sample.bytes,
+            "error": error,
+            "sql": sample.sql,
+        }
+        try:
+            with self._log_lock, self.slow_log.open("a", encoding="utf-8") as log:
+                log.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            logger.warning("slow query not written to %s: %s", self.slow_log, e)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counts and duration percentiles (in milliseconds) per model, kind and cache outcome."""
+        with self._lock:
+            groups: List[Dict[str, Any]] = []
+            total = 0
+            for (model, kind, cache), group in sorted(self._groups.items()):
+                histogram = group.histogram
+                total += histogram.count
+                groups.append(
+                    {
+                        "model": model,
+                        "kind": kind,
+                        "cache": cache,
+                        "count": histogram.count,
+                        "errors": group.errors,
+                        "cancelled": group.cancelled,
+                        "rows": group.rows,
+                        "bytes": group.bytes,
+                        "mean_ms": round(histogram.total / max(histogram.count, 1) * 1000, 3),
+                        "max_ms": round(histogram.max * 1000, 3),
+                        **{
+                            f"p{percent}_ms": round(histogram.percentile(percent) * 1000, 3)
+                            for percent in PERCENTILES
+                        },
+                    }
+                )
+            cancelled_loads = dict(sorted(self._cancelled_loads.items()))
+        return {
+            "queries": total,
+            "slow_ms": round(self.slow_seconds * 1000),
+            "groups": groups,
+            "cancelled_loads": cancelled_loads,
+        }
+
+    def clear(self) -> None:
+        """Forget all recorded queries."""
+        with self._lock:
+            self._groups.clear()
+            self._cancelled_loads.clear()
+
+
+query_metrics = QueryMetrics.from_env()
@@ -1,15 +1,47 @@
 """Base repository for Dremio data access."""
 
-import os
+import asyncio
+import copy
+import logging
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Union, Tuple, TypeVar, List, Sequence, Generic, Type
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Optional,
+    Union,
+    Tuple,
+    TypeVar,
+    List,
+    Sequence,
+    Generic,
+    Iterator,
+    Type,
+)
 
 import pandas as pd
-from sqlalchemy import Engine, DateTime, create_engine, Integer, bindparam, Select, text, desc
+import pyarrow as pa
+from sqlalchemy import Column, Engine, DateTime, Integer, bindparam, Select, func, text, desc
+from sqlalchemy import String, false, inspect as sa_inspect, or_
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
 from sqlalchemy.types import TypeDecorator
-from sqlmodel import Session, SQLModel
+from sqlmodel import Session, SQLModel, select
 
+from . import arrow, keyset
+from .cache import COUNT_TTL, CachedValue, ResultCache, result_cache
+from .circuit import CircuitBreaker, CircuitBreakers, circuit_breakers, is_outage
+from .engine import shared_engine
+from .executor import run_in_pool
 from .pagination import Pagination
+from .query_metrics import QueryMetrics, QuerySample, query_metrics
+from .search_index import SearchIndexes, search_indexes
+from .singleflight import SingleFlight, single_flight
+from .snapshot import SnapshotStore, snapshot_store
+from .sql_template import SqlTemplateCache, sql_templates
 
 # sqlalchemy_dremio's _type_map ships with 'datetime64[ns]' but not 'datetime64[ms]',
 # which is what Dremio Flight returns for TIMESTAMP columns. Without this, any model
@@ -17,6 +49,10 @@ from .pagination import Pagination
 import sqlalchemy_dremio.query as _dremio_query  # noqa: E402
 
 _dremio_query._type_map.setdefault("datetime64[ms]", _dremio_query.types.DATETIME)
+# pandas 3 infers the 'str' dtype for VARCHAR columns instead of 'object'.
+_dremio_query._type_map.setdefault("str", _dremio_query.types.VARCHAR)
+
+logger = logging.getLogger(__name__)
 
 
 class DateFromTimestamp(TypeDecorator):
@@ -39,6 +75,12 @@ class DateFromTimestamp(TypeDecorator):
             return value.date()
         return value
 
+    def coerce_arrow(self, array):
+        """Vectorized `process_result_value` for Arrow results, see `data.arrow`."""
+        if pa.types.is_timestamp(array.type):
+            return array.cast(pa.date32())
+        return array
+
 
 T = TypeVar("T", bound=SQLModel)
 
@@ -55,12 +97,108 @@ class InvalidParameterError(RepositoryError):
     pass
 
 
+class QueryTimeoutError(RepositoryError):
+    """Exception raised when a query does not finish within its timeout."""
+
+    pass
+
+
+class DremioUnavailableError(RepositoryError):
+    """Exception raised when Dremio is down or does not answer within the query deadline."""
+
+    pass
+
+
+class Page(tuple):
+    """A page of rows and its total count, unpacked as `items, total`.
+
+    Also tells how old the rows are: `data_age` is the seconds since they
+    were read from Dremio (None when unknown) and `served_stale` whether they
+    had expired; see `DremioRepository.stale`. Both belong to this result
+    only, so concurrent loads through one repository do not mix them up.
+    """
+
+    data_age: Optional[float]
+    served_stale: bool
+
+    def __new__(
+        cls,
+        items: List[Any],
+        total: int,
+        data_age: Optional[float] = None,
+        served_stale: bool = False,
+    ) -> "Page":
+        page = super().__new__(cls, (items, total))
+        page.data_age = data_age
+        page.served_stale = served_stale
+        return page
+
+    @property
+    def items(self) -> List[Any]:
+        return self[0]
+
+    @property
+    def total(self) -> int:
+        return self[1]
+
+
 class DremioRepository(Generic[T]):
     """Base repository for Dremio data access.
 
     Currently using Dremio Flight protocol which doesn't support parameterized queries.
     """
 
+    # Fetch the total count as a column of the page query instead of a
+    # separate round trip; see _fetch_page. Repositories opt in.
+    count_in_page_query: bool = False
+
+    # Read-through cache for list pages; set to None to always query Dremio.
+    cache: Optional[ResultCache] = result_cache
+
+    # Shares one query between concurrent identical page requests; None disables it.
+    single_flight: Optional[SingleFlight] = single_flight
+
+    # Seconds a cached page stays fresh; None uses the cache's default TTL.
+    cache_ttl: Optional[float] = None
+
+    # Seconds an expired cached page or count may still be returned; see stale().
+    max_stale: float = 0.0
+
+    # Seconds a total count stays fresh. Counts only depend on the filters, so
+    # paging and sorting reuse them instead of counting again.
+    count_cache_ttl: float = COUNT_TTL
+
+    # Seconds a record loaded ahead by aprefetch_by_id waits in the cache for aget_by_id.
+    prefetch_ttl: float = 60.0
+
+    # Maximum number of keys in one IN (...) list of get_by_ids.
+    id_chunk_size: int = 500
+
+    # Local snapshots to read from instead of Dremio (see data.snapshot);
+    # None always reads from Dremio.
+    snapshots: Optional[SnapshotStore] = snapshot_store
+
+    # Seconds a snapshot may be old to be read from; None uses the store's maximum.
+    snapshot_max_age: Optional[float] = None
+
+    # Always read from Dremio, also when a snapshot is available; see live().
+    read_live: bool = False
+
+    # In-process trigram indexes resolving search text to primary keys (see
+    # data.search_index); None always filters in Dremio with LIKE.
+    search_indexes: Optional[SearchIndexes] = search_indexes
+
+    # Compiled SQL per statement structure (see data.sql_template); None
+    # compiles every query.
+    sql_templates: Optional[SqlTemplateCache] = sql_templates
+
+    # Records the duration of every query (see data.query_metrics); None disables it.
+    metrics: Optional[QueryMetrics] = query_metrics
+
+    # Stop sending queries to a Dremio that keeps failing (see data.circuit);
+    # None always sends them.
+    circuits: Optional[CircuitBreakers] = circuit_breakers
+
     def __init__(
         self,
         model: Type[T],
@@ -68,6 +206,10 @@ class DremioRepository(Generic[T]):
     ):
         """Initialize repository with model type and optional connection.
 
+        Without an explicit engine, the process-wide shared engine for the
+        connection string (or VINEAPP_DB_CONNECTION) is used, so constructing
+        a repository per request does not open new Flight connections.
+
         Args:
             model: The model class this repository handles
             connection: Optional connection string or engine
@@ -76,11 +218,73 @@ class DremioRepository(Generic[T]):
         if isinstance(connection, Engine):
             self.engine = connection
         else:
-            conn_str = os.getenv(
-                "VINEAPP_DB_CONNECTION",
-                "",
-            )
-            self.engine = create_engine(conn_str)
+            self.engine = shared_engine(connection)
+
+    @property
+    def engine(self) -> Engine:
+        """Engine to read from: the model's snapshot when it is usable, otherwise Dremio.
+
+        The choice can change between accesses, when the snapshot ages out or
+        is replaced. Each call picks the engine once and passes it on, so its
+        SQL is rendered for, run on and measured against the same engine.
+        """
+        if self.snapshots is not None and not self.read_live:
+            snapshot = self.snapshots.engine_for(self.model, self.snapshot_max_age)
+            if snapshot is not None:
+                return snapshot
+        return self.live_engine
+
+    @engine.setter
+    def engine(self, engine: Engine) -> None:
+        self.live_engine = engine
+
+    def live(self) -> "DremioRepository[T]":
+        """Copy of this repository that always reads from Dremio, for reads that must be current."""
+        repository = copy.copy(self)
+        repository.read_live = True
+        return repository
+
+    def with_deadline(self, seconds: float) -> "DremioRepository[T]":
+        """Copy of this repository whose Dremio queries fail after `seconds`.
+
+        For callers that have a fallback and cannot wait for the default
+        VINEAPP_DB_QUERY_DEADLINE; see `engine.flight_call_options`.
+        """
+        repository = copy.copy(self)
+        repository.live_engine = self.live_engine.execution_options(query_deadline=seconds)
+        return repository
+
+    def stale(self, max_stale: Optional[float] = None) -> "DremioRepository[T]":
+        """Copy of this repository that returns expired cached pages instead of waiting for Dremio.
+
+        The `Page` returned by get_paginated tells whether it had expired in
+        `served_stale`; the caller then shows it and reloads it with a
+        repository that does not accept stale pages. `data_age` tells how old
+        it is.
+
+        Args:
+            max_stale: Seconds a page may have been expired; defaults to the cache's max_stale
+        """
+        repository = copy.copy(self)
+        if max_stale is None:
+            max_stale = self.cache.max_stale if self.cache is not None else 0.0
+        repository.max_stale = max_stale
+        return repository
+
+    def snapshot_age(self) -> Optional[float]:
+        """Seconds since the snapshot reads are served from was taken; None when reading live."""
+        return self._engine_age(self.engine)
+
+    def _engine_age(self, engine: Engine) -> Optional[float]:
+        """Age of the snapshot `engine` reads; None for the live engine."""
+        if engine is self.live_engine:
+            return None
+        return self.snapshots.age(self.model)
+
+    def _session_engine(self, session: Session) -> Engine:
+        """Engine a session was opened on, so its queries are rendered for that engine."""
+        bind = session.get_bind()
+        return bind if isinstance(bind, Engine) else self.engine
 
     def _validate_pagination(
         self,
@@ -140,12 +344,17 @@ class DremioRepository(Generic[T]):
         """
         if not filter_text:
             return query
+        return query.where(self._text_condition(filter_text, fields))
 
-        # Note: Using string interpolation because Dremio Flight doesn't support parameters
-        pattern = f"%{filter_text}%"
-        conditions = [f"lower({field}) LIKE lower('{pattern}')" for field in fields]
-        filter_expr = text(" OR ".join(conditions))
-        return query.where(filter_expr)
+    def _text_condition(self, filter_text: str, fields: Sequence[str]):
+        """`lower(field) LIKE lower('%text%')` for any of the fields."""
+        # Dremio Flight doesn't support parameters, so the pattern is rendered
+        # inline; as a bind parameter it keeps the statement's structure the same.
+        pattern = bindparam(
+            "search_pattern", f"%{filter_text}%", type_=String, literal_execute=True
+        )
+        conditions = [f"lower({field}) LIKE lower(:search_pattern)" for field in fields]
+        return text(" OR ".join(conditions)).bindparams(pattern)
 
     def _apply_sorting(
         self,
@@ -184,6 +393,55 @@ class DremioRepository(Generic[T]):
         """
         return query
 
+    def _keyset_sort_key(
+        self,
+        sort_by: Optional[str],
+        descending: bool,
+    ) -> Optional[keyset.SortKey]:
+        """Get the sort key used for keyset pagination.
+
+        The key is derived from `_apply_sorting`, so it follows both user sort
+        columns and the default sorting of subclasses. The primary key is
+        appended as a unique tiebreaker when it is not already part of it.
+
+        Args:
+            sort_by: Column name to sort by
+            descending: Sort in descending order if True
+
+        Returns:
+            List of (column, descending) pairs, or None when the ordering
+            cannot be used for seeking and OFFSET pagination must be used
+        """
+        ordered = self._apply_sorting(select(self.model), sort_by, descending)
+        sort_key = []
+        for clause in ordered._order_by_clauses:
+            column, column_descending = clause, False
+            if isinstance(clause, UnaryExpression):
+                if clause.modifier not in (operators.asc_op, operators.desc_op):
+                    return None
+                column = clause.element
+                column_descending = clause.modifier is operators.desc_op
+            if not isinstance(column, Column) or not keyset.is_seekable(column):
+                return None
+            sort_key.append((column, column_descending))
+
+        primary_key = list(self.model.__table__.primary_key.columns)
+        if not primary_key:
+            return None
+        sorted_names = {column.key for column, _ in sort_key}
+        for column in primary_key:
+            if column.key not in sorted_names:
+                sort_key.append((column, False))
+        return sort_key
+
+    def _sort_key_values(self, item: Union[T, Dict[str, Any]], sort_key: keyset.SortKey) -> List:
+        """Get the values of the sort key columns for a model instance or record."""
+        mapper = self.model.__mapper__
+        keys = [mapper.get_property_by_column(column).key for column, _ in sort_key]
+        if isinstance(item, dict):
+            return [keyset.normalize(item[key]) for key in keys]
+        return [keyset.normalize(getattr(item, key)) for key in keys]
+
     def _execute_paginated_query(
         self,
         session: Session,
@@ -195,9 +453,37 @@ class DremioRepository(Generic[T]):
         search_fields: Optional[Sequence[str]] = None,
         sort_by: Optional[str] = None,
         descending: bool = False,
-    ) -> Tuple[List[T], int]:
+        pagination: Optional[Pagination] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Page:
         """Execute a paginated query and return results with total count.
 
+        When a pagination object is passed, the page is fetched by keyset:
+        its cursor remembers the sort key of the first and last row of the
+        previous load, so the next, previous or same page is found by seeking
+        past that key instead of skipping rows with OFFSET. Any other page
+        (or a cursor for a different filter or sort) falls back to OFFSET.
+        The cursor is updated after every load.
+
+        With `search_indexes`, the search text is resolved to primary keys in
+        process instead of by a LIKE scan in Dremio. Only text search fields
+        are indexed: Dremio casts numbers, dates and timestamps to text in its
+        own format, so those fields keep their LIKE filter next to the IN list
+        of keys. When all search fields are text, and without a user sort
+        order (or other filters), the page is cut from the ranked keys and
+        only its rows are fetched, best match first; otherwise the keys
+        replace the LIKE filter on the text fields as an IN list.
+
+        Total counts are cached by filter signature (the compiled count
+        query), so paging and sorting only pay for the page query. The
+        pagination object also remembers the signature its `total_rows` was
+        counted for; while it matches, that total is reused without a count.
+
+        With `columns`, only those attributes (plus the primary key and the
+        sort key) are selected and the page is returned as dictionaries read
+        through the Arrow path instead of model instances; list pages use this
+        to skip columns they do not show and load full records on demand.
+
         Args:
             session: The database session
             query: The base query to execute
@@ -208,37 +494,721 @@ class DremioRepository(Generic[T]):
             search_fields: Optional list of fields to search in
             sort_by: Optional column name to sort by
             descending: Sort in descending order if True
+            pagination: Optional Pagination object holding the keyset cursor
+            columns: Optional attribute names to select instead of whole records
 
         Returns:
-            Tuple containing list of items for the requested page and total count
+            Page of items (or dictionaries, with `columns`) for the requested
+            page and the total count, with the age of the rows
+
+        Raises:
+            InvalidParameterError: If a column is not an attribute of the model
         """
+        engine = self._session_engine(session)
+
         # Apply filtering if provided
         if search_text and search_fields:
-            query = self._apply_text_filter(query, search_text, search_fields)
-            count_stmt = self._apply_text_filter(count_stmt, search_text, search_fields)
-
-        # Apply sorting
-        query = self._apply_sorting(query, sort_by, descending)
+            indexed = self._indexed_fields(search_fields)
+            unindexed = [field for field in search_fields if field not in indexed]
+            keys = self._search_keys(search_text, indexed) if indexed else None
+            ranked = not unindexed and not sort_by and query.whereclause is None
+            if keys is not None and ranked:
+                return self._ranked_page(
+                    session, keys, page, items_per_page, pagination, columns, engine
+                )
+            if keys is not None and len(keys) <= self.search_indexes.max_keys:
+                condition = self._key_condition(keys)
+                if unindexed:
+                    condition = or_(condition, self._text_condition(search_text, unindexed))
+                query = query.where(condition)
+                count_stmt = count_stmt.where(condition)
+            else:
+                query = self._apply_text_filter(query, search_text, search_fields)
+                count_stmt = self._apply_text_filter(count_stmt, search_text, search_fields)
 
-        # Get total count
-        total = session.exec(count_stmt).one()
+        count_signature = keyset.signature(self._render_sql(count_stmt, engine=engine))
+        known_total, total_stale = self._known_total(count_signature, pagination)
 
-        # Calculate offset
+        sort_key = self._keyset_sort_key(sort_by, descending)
+        if columns is not None:
+            query = query.with_only_columns(
+                *self._projected_columns(columns, sort_key), maintain_column_froms=True
+            )
         offset = (page - 1) * items_per_page
+        seeking = False
+        reverse = False
 
-        # Apply pagination
-        query = query.limit(bindparam("limit", type_=Integer, literal_execute=True)).offset(
-            bindparam("offset", type_=Integer, literal_execute=True)
-        )
+        if sort_key is None:
+            query = self._apply_sorting(query, sort_by, descending)
+            signature = None
+        else:
+            signature = keyset.signature(
+                self._render_sql(query, engine=engine),
+                [(column.key, column_descending) for column, column_descending in sort_key],
+                items_per_page,
+            )
+            cursor = keyset.Cursor.decode(pagination.cursor) if pagination else None
+            if page > 1 and cursor is not None and cursor.signature == signature:
+                if page == cursor.page + 1:
+                    query = query.where(keyset.after(sort_key, cursor.last))
+                    seeking = True
+                elif page == cursor.page - 1:
+                    query = query.where(keyset.before(sort_key, cursor.first))
+                    seeking = True
+                    reverse = True
+                elif page == cursor.page:
+                    query = query.where(keyset.at_or_after(sort_key, cursor.first))
+                    seeking = True
+            if seeking:
+                offset = 0
+            query = query.order_by(*keyset.order_by(sort_key, reverse=reverse))
 
-        # Execute with bound parameters
-        result = session.exec(
+        fetched = self._fetch_page(
+            session,
             query,
-            params={
-                "limit": items_per_page,
-                "offset": offset,
-            },
+            count_stmt,
+            items_per_page,
+            offset,
+            seeking,
+            known_total,
+            records=columns is not None,
+            engine=engine,
+        )
+        items, total = fetched
+        if reverse:
+            items.reverse()
+        if known_total is None and self.cache is not None:
+            self.cache.put(self.model, ("count", count_signature), total, self.count_cache_ttl)
+
+        if pagination is not None:
+            pagination.cursor = (
+                self._encode_cursor(signature, page, items, sort_key) if sort_key else None
+            )
+            pagination.total_rows = total
+            pagination.total_signature = count_signature
+
+        return Page(items, total, fetched.data_age, fetched.served_stale or total_stale)
+
+    def _indexed_fields(self, search_fields: Sequence[str]) -> List[str]:
+        """The search fields a search index can match exactly like LIKE: text columns.
+
+        Other values are cast to text by Dremio, e.g. timestamps as
+        '2025-03-01 14:00:00.000', which `str()` of the value does not reproduce.
+        """
+        if self.search_indexes is None:
+            return []
+        columns = self.model.__table__.columns
+        indexed = []
+        for field in search_fields:
+            type_ = columns[field].type if field in columns else None
+            if isinstance(getattr(type_, "impl_instance", type_), String):
+                indexed.append(field)
+        return indexed
+
+    def _search_keys(self, search_text: str, search_fields: Sequence[str]) -> Optional[List[Any]]:
+        """Primary keys of the rows matching the search text, best match first.
+
+        Returns None when the text must be searched in Dremio: without
+        indexes, for a view too large to index, or for text with LIKE wildcards.
+        """
+        if self.search_indexes is None:
+            return None
+        return self.search_indexes.search(
+            self.model, search_fields, search_text, lambda: self._search_rows(search_fields)
         )
-        items = list(result)
 
+    def _search_rows(self, search_fields: Sequence[str]) -> Optional[List[Tuple[Any, tuple]]]:
+        """Primary key and search field values of every row, to build a search index."""
+        _, key_column = self._primary_key()
+        columns = self.model.__table__.columns
+        statement = select(*dict.fromkeys([key_column, *(columns[f] for f in search_fields)]))
+        statement = statement.limit(self.search_indexes.max_rows + 1)
+        engine = self.engine
+        sql = self._render_sql(statement, engine=engine)
+        with self._measure("search_index", sql=sql, engine=engine) as sample:
+            table = arrow.read_table(engine, sql)
+            sample.rows, sample.bytes = table.num_rows, table.nbytes
+        if table.num_rows > self.search_indexes.max_rows:
+            return None
+        values = {name: table.column(name).to_pylist() for name in table.column_names}
+        keys = [keyset.normalize(key) for key in values[key_column.name]]
+        return list(zip(keys, zip(*(values[f] for f in search_fields))))
+
+    def _ranked_page(
+        self,
+        session: Session,
+        keys: List[Any],
+        page: int,
+        items_per_page: int,
+        pagination: Optional[Pagination] = None,
+        columns: Optional[Sequence[str]] = None,
+        engine: Optional[Engine] = None,
+    ) -> Page:
+        """Fetch one page of ranked search results by primary key, in rank order."""
+        engine = engine or self._session_engine(session)
+        offset = (page - 1) * items_per_page
+        page_keys = keys[offset : offset + items_per_page]
+        attribute, _ = self._primary_key()
+        found = {}
+        if page_keys:
+            query = select(self.model).where(self._key_condition(page_keys))
+            if columns is None:
+                rows = self._execute(session, query, engine=engine, kind="page")
+                records = [row[0] for row in rows]
+            else:
+                query = query.with_only_columns(
+                    *self._projected_columns(columns, None), maintain_column_froms=True
+                )
+                records = self.fetch_records(query, engine=engine)
+            for record in records:
+                key = record[attribute] if columns is not None else getattr(record, attribute)
+                found[keyset.normalize(key)] = record
+        items = [found[key] for key in page_keys if key in found]
+
+        if pagination is not None:
+            pagination.cursor = None
+            pagination.total_rows = len(keys)
+            pagination.total_signature = None
+        return Page(items, len(keys), self._engine_age(engine) or 0.0)
+
+    def _key_condition(self, keys: List[Any]):
+        """`key IN (...)` for primary key values; FALSE for no keys."""
+        if not keys:
+            return false()
+        _, column = self._primary_key()
+        # Keys are rendered inline since Dremio Flight doesn't support parameters
+        return column.in_(keyset.literal(keys))
+
+    def _projected_columns(
+        self, columns: Sequence[str], sort_key: Optional[keyset.SortKey]
+    ) -> List[Column]:
+        """Columns to select for a list page showing only `columns`.
+
+        The primary key identifies rows and the sort key columns are needed
+        for the keyset cursor, so both are always included.
+        """
+        mapper = sa_inspect(self.model)
+        names = [self._primary_key()[0], *columns]
+        names.extend(mapper.get_property_by_column(column).key for column, _ in sort_key or [])
+        try:
+            return [mapper.columns[name] for name in dict.fromkeys(names)]
+        except KeyError as e:
+            raise InvalidParameterError(f"Unknown {self.model.__name__} column: {e.args[0]}")
+
+    def _known_total(
+        self, count_signature: str, pagination: Optional[Pagination]
+    ) -> Tuple[Optional[int], bool]:
+        """Total count for a filter signature if it need not be counted again.
+
+        Returns:
+            The total (None if it must be counted) and whether it had expired
+        """
+        if pagination is not None and pagination.total_signature == count_signature:
+            return pagination.total_rows, False
+        if self.cache is None:
+            return None, False
+        started = time.perf_counter()
+        found = self.cache.lookup(self.model, ("count", count_signature), self.max_stale)
+        if found is None:
+            return None, False
+        self._record_cache_hit("count", found, started)
+        return found.value, not found.fresh
+
+    def _fetch_page(
+        self,
+        session: Session,
+        query: Select,
+        count_stmt: Select,
+        items_per_page: int,
+        offset: int,
+        seeking: bool = False,
+        total: Optional[int] = None,
+        records: bool = False,
+        engine: Optional[Engine] = None,
+    ) -> Page:
+        """Fetch one page of a filtered, sorted query and the total count.
+
+        With `count_in_page_query` the total comes back as an extra column of
+        the page query, so a list page costs a single Dremio round trip: a
+        `COUNT(*) OVER ()` window, or the count statement as a scalar subquery
+        when a keyset predicate narrows the rows. The separate count query is
+        only needed when the page comes back empty. Otherwise the total is
+        counted first and the page fetched in a second query. When the total
+        is already known, only the page itself is queried.
+
+        Pages are read through `cache`, keyed on the compiled SQL and
+        parameters, so identical page requests within the TTL share one query.
+        Identical requests arriving while that query runs wait for it through
+        `single_flight` instead of sending their own. While Dremio is
+        unavailable, the last cached result for the page is returned however
+        long it has expired, as long as the cache retains it, flagged in the
+        page's `served_stale`.
+
+        Args:
+            session: The database session
+            query: The filtered and sorted query
+            count_stmt: The filtered count query
+            items_per_page: Number of items per page
+            offset: Number of rows to skip
+            seeking: Whether the query has a keyset predicate
+            total: Total count, if already known
+            records: Whether to read the page as dictionaries through the Arrow path
+            engine: Engine the session runs on; defaults to the session's bind
+
+        Returns:
+            Page of items and the total count, with the age of the rows
+
+        Raises:
+            DremioUnavailableError: If Dremio is unavailable and no result is retained
+        """
+        engine = engine or self._session_engine(session)
+        query = query.limit(bindparam("limit", type_=Integer, literal_execute=True))
+        params = {"limit": items_per_page}
+        if offset:
+            query = query.offset(bindparam("offset", type_=Integer, literal_execute=True))
+            params["offset"] = offset
+
+        # The page is cached under the query without the count column, so a
+        # page loaded with its count is reused once the count is cached too.
+        coalesce = self.single_flight is not None
+        key = None
+        if self.cache is not None or coalesce:
+            key = self._cache_key(query, params, count_stmt, engine)
+        if self.cache is not None:
+            started = time.perf_counter()
+            found = self.cache.lookup(self.model, key, self.max_stale)
+            if found is not None and (total is not None or found.value[1] is not None):
+                items, counted = found.value
+                self._record_cache_hit("page", found, started, rows=len(items))
+                total = total if total is not None else counted
+                return Page(list(items), total, found.age, not found.fresh)
+
+        count = total is None
+        if count and self.count_in_page_query:
+            if seeking:
+                total_column = count_stmt.scalar_subquery()
+            else:
+                total_column = func.count().over()
+            query = query.add_columns(total_column.label("total_rows"))
+
+        load = self._load_records if records else self._load_page
+        args = (session, query, count_stmt, params, offset, seeking, count, engine)
+        try:
+            if coalesce:
+                items, counted = self.single_flight.do(
+                    self.model.__name__, (id(engine), key, count), lambda: load(*args)
+                )
+            else:
+                items, counted = load(*args)
+        except DremioUnavailableError:
+            found = self._last_good(key)
+            if found is None or (total is None and found.value[1] is None):
+                raise
+            items, counted = found.value
+            logger.warning(
+                "Dremio unavailable; showing %s page of %.0fs ago", self.model.__name__, found.age
+            )
+            total = total if total is not None else counted
+            return Page(list(items), total, found.age, served_stale=True)
+        if self.cache is not None:
+            self.cache.put(self.model, key, (items, counted), ttl=self.cache_ttl)
+        total = total if total is not None else counted
+        return Page(list(items), total, self._engine_age(engine) or 0.0)
+
+    def _last_good(self, key: Optional[tuple]) -> Optional[CachedValue]:
+        """The last result cached for a page, however long expired, while it is retained."""
+        if self.cache is None or key is None:
+            return None
+        return self.cache.lookup(self.model, key, self.cache.max_stale)
+
+    def _load_page(
+        self,
+        session: Session,
+        query: Select,
+        count_stmt: Select,
+        params: dict,
+        offset: int,
+        seeking: bool,
+        count: bool = True,
+        engine: Optional[Engine] = None,
+    ) -> Tuple[Tuple[T, ...], Optional[int]]:
+        """Run the page query prepared by `_fetch_page` against Dremio.
+
+        The total is None when `count` is False.
+        """
+        engine = engine or self._session_engine(session)
+        cache = "bypass" if self.cache is None else "miss"
+        if not count:
+            rows = self._execute(session, query, params, engine, kind="page", cache=cache)
+            return tuple(row[0] for row in rows), None
+
+        if not self.count_in_page_query:
+            # Get total count, then the page
+            sql = self._render_sql(count_stmt, engine=engine)
+            with self._measure("count", cache, sql, engine):
+                total = session.exec(count_stmt).one()
+            sql = self._render_sql(query, params, engine)
+            with self._measure("page", cache, sql, engine) as sample:
+                items = tuple(session.exec(query, params=params))
+                sample.rows = len(items)
+            return items, total
+
+        rows = self._execute(session, query, params, engine, kind="page", cache=cache)
+        items = tuple(row[0] for row in rows)
+        if rows:
+            total = rows[0][-1]
+        elif offset == 0 and not seeking:
+            total = 0
+        else:
+            total = self._execute(session, count_stmt, engine=engine, kind="count", cache=cache)
+            total = total[0][0]
         return items, total
+
+    def _load_records(
+        self,
+        session: Session,
+        query: Select,
+        count_stmt: Select,
+        params: dict,
+        offset: int,
+        seeking: bool,
+        count: bool = True,
+        engine: Optional[Engine] = None,
+    ) -> Tuple[Tuple[Dict[str, Any], ...], Optional[int]]:
+        """Like `_load_page`, for a projected query read as dictionaries via Arrow."""
+        engine = engine or self._session_engine(session)
+        cache = "bypass" if self.cache is None else "miss"
+        table = self.fetch_arrow(query, params, kind="page", cache=cache, engine=engine)
+        total = None
+        if "total_rows" in table.column_names:
+            if table.num_rows:
+                total = table.column("total_rows")[0].as_py()
+            table = table.drop_columns(["total_rows"])
+        records = tuple(arrow.to_records(table))
+        if count and total is None:
+            if not records and offset == 0 and not seeking:
+                total = 0
+            else:
+                total = self._execute(
+                    session, count_stmt, engine=engine, kind="count", cache=cache
+                )[0][0]
+        return records, total
+
+    def _cache_key(
+        self, query: Select, params: dict, count_stmt: Select, engine: Optional[Engine] = None
+    ) -> tuple:
+        """Cache key for a page: the SQL of both queries, with the parameters inline."""
+        return (
+            self._render_sql(query, params, engine),
+            self._render_sql(count_stmt, engine=engine),
+        )
+
+    def _render_sql(
+        self, statement: Select, params: Optional[dict] = None, engine: Optional[Engine] = None
+    ) -> str:
+        """The SQL sent to Dremio for a statement, rendered from its cached template."""
+        engine = engine or self.engine
+        if self.sql_templates is None:
+            return arrow.compile_sql(engine, statement.params(params) if params else statement)
+        return self.sql_templates.render(engine, statement, params)
+
+    def _execute(
+        self,
+        session: Session,
+        statement: Select,
+        params: Optional[dict] = None,
+        engine: Optional[Engine] = None,
+        kind: str = "query",
+        cache: str = "bypass",
+    ) -> List[Row]:
+        """Run a statement as rendered SQL and return its rows, mapped as for the statement.
+
+        The session only parses the SQL text, so the full select is not
+        compiled again for every query. The SQL is rendered for the engine the
+        session was opened on, unless another `engine` is given. The query is
+        recorded in `metrics` under `kind`.
+        """
+        engine = engine or self._session_engine(session)
+        sql = self._render_sql(statement, params, engine)
+        # Colons are escaped so text() doesn't take them for parameters
+        textual = text(sql.replace(":", r"\:")).columns(*statement.selected_columns)
+        with self._measure(kind, cache, sql, engine) as sample:
+            rows = list(session.execute(statement.from_statement(textual)))
+            sample.rows = len(rows)
+        return rows
+
+    @contextmanager
+    def _measure(
+        self,
+        kind: str,
+        cache: str = "bypass",
+        sql: Optional[str] = None,
+        engine: Optional[Engine] = None,
+    ) -> Iterator[QuerySample]:
+        """Time and guard a query on this repository's model.
+
+        The query is recorded in `metrics` (see `data.query_metrics`). A query
+        on Dremio is only run while its circuit is closed, and its outcome is
+        reported to the circuit (see `data.circuit`). Errors of queries on a
+        snapshot are raised as they are: they do not tell anything about Dremio.
+        Subclasses wrap their own queries in it, e.g. `with self._measure("by_id")`.
+
+        Args:
+            kind: Query kind the query is recorded as
+            cache: How the result cache was involved
+            sql: SQL of the query, for the slow-query log
+            engine: Engine the query runs on; defaults to `engine`
+
+        Raises:
+            DremioUnavailableError: If the circuit is open, or the query failed
+                because Dremio is down or did not answer within the deadline
+        """
+        engine = engine or self.engine
+        breaker = self._circuit(engine)
+        if breaker is not None and not breaker.allow():
+            raise DremioUnavailableError(
+                f"Dremio is unavailable; {self.model.__name__} query not sent"
+            )
+        try:
+            if self.metrics is None:
+                yield QuerySample(self.model.__name__, kind, cache, sql=sql)
+            else:
+                with self.metrics.measure(self.model, kind, cache, sql) as sample:
+                    yield sample
+        except Exception as e:
+            if engine is not self.live_engine or not is_outage(e):
+                raise
+            if breaker is not None:
+                breaker.record_failure(e)
+            raise DremioUnavailableError(
+                f"{self.model.__name__} query failed, Dremio is unavailable: {e}"
+            ) from e
+        if breaker is not None:
+            breaker.record_success()
+
+    def _circuit(self, engine: Engine) -> Optional[CircuitBreaker]:
+        """Circuit breaker for queries on `engine`; None for snapshots or when disabled."""
+        if self.circuits is None or engine is not self.live_engine:
+            return None
+        return self.circuits.for_engine(engine)
+
+    def _record_cache_hit(
+        self, kind: str, found: CachedValue, started: float, rows: Optional[int] = None
+    ) -> None:
+        """Record a result served from the cache, timed from `started`."""
+        if self.metrics is not None:
+            cache = "hit" if found.fresh else "stale"
+            sample = QuerySample(self.model.__name__, kind, cache, rows=rows)
+            self.metrics.record(sample, time.perf_counter() - started)
+
+    def _encode_cursor(
+        self,
+        signature: str,
+        page: int,
+        items: List[T],
+        sort_key: keyset.SortKey,
+    ) -> Optional[str]:
+        """Encode the keyset cursor for a loaded page, or None if there is none."""
+        if not items:
+            return None
+        try:
+            return keyset.Cursor(
+                signature=signature,
+                page=page,
+                first=self._sort_key_values(items[0], sort_key),
+                last=self._sort_key_values(items[-1], sort_key),
+            ).encode()
+        except (AttributeError, TypeError):
+            return None
+
+    def _primary_key(self) -> Tuple[str, Column]:
+        """Attribute name and column of the model's (single-column) primary key."""
+        mapper = sa_inspect(self.model)
+        column = mapper.primary_key[0]
+        return mapper.get_property_by_column(column).key, column
+
+    def _coerce_key(self, column: Column, value: Any) -> Any:
+        """Convert a key to the column's Python type, e.g. "123" for an integer id."""
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            return value
+        if isinstance(value, python_type):
+            return value
+        try:
+            return python_type(value)
+        except (TypeError, ValueError):
+            raise InvalidParameterError(f"Invalid {self.model.__name__} key: {value!r}")
+
+    def get_by_ids(self, ids: Iterable[Any]) -> Dict[Any, T]:
+        """Get records by primary key in as few queries as possible.
+
+        Keys are looked up with `IN (...)` lists of at most `id_chunk_size`
+        keys, so resolving N records costs one round trip per chunk instead
+        of one per record.
+
+        Args:
+            ids: Primary key values to look up; duplicates and None are ignored
+
+        Returns:
+            Dictionary of the records found, keyed by primary key, in the
+            order the keys were given
+
+        Raises:
+            InvalidParameterError: If a key cannot be converted to the key type
+        """
+        attribute, column = self._primary_key()
+        keys = list(dict.fromkeys(self._coerce_key(column, id) for id in ids if id is not None))
+        if not keys:
+            return {}
+
+        engine = self.engine
+        found = self._find_by_ids(engine, attribute, column, keys)
+        missing = [key for key in keys if key not in found]
+        if missing and engine is not self.live_engine:
+            # Records created since the snapshot was taken are only in Dremio
+            found.update(self._find_by_ids(self.live_engine, attribute, column, missing))
+        return {key: found[key] for key in keys if key in found}
+
+    def fetch_arrow(
+        self,
+        statement: Select,
+        params: Optional[dict] = None,
+        kind: str = "records",
+        cache: str = "bypass",
+        engine: Optional[Engine] = None,
+    ) -> pa.Table:
+        """Run a query and return the result as an Arrow table, bypassing the ORM.
+
+        The result is read from the Flight stream as-is and the model's type
+        conversions are applied per column; see `data.arrow`. Columns are
+        named after the model attributes.
+
+        Args:
+            statement: Query on this repository's model
+            params: Values for bind parameters without one, e.g. limit and offset
+            kind: Query kind the read is recorded as in `metrics`
+            cache: How the result cache was involved, for `metrics`
+            engine: Engine to read from; defaults to `engine`
+
+        Returns:
+            Arrow table with the coerced result
+        """
+        engine = engine or self.engine
+        sql = self._render_sql(statement, params, engine)
+        with self._measure(kind, cache, sql, engine) as sample:
+            table = arrow.read_table(engine, sql)
+            sample.rows, sample.bytes = table.num_rows, table.nbytes
+        return arrow.coerce_table(table, self.model)
+
+    def fetch_records(
+        self,
+        statement: Select,
+        columns: Optional[List[str]] = None,
+        engine: Optional[Engine] = None,
+    ) -> List[Dict[str, Any]]:
+        """Run a query and return plain dictionaries instead of model instances.
+
+        Cheaper than loading model instances for read-only display, e.g. with
+        `table_utils.format_record`.
+
+        Args:
+            statement: Query on this repository's model
+            columns: Optional attribute names to keep
+            engine: Engine to read from; defaults to `engine`
+
+        Returns:
+            List of dictionaries keyed on model attribute names
+        """
+        return arrow.to_records(self.fetch_arrow(statement, engine=engine), columns)
+
+    def _find_by_ids(
+        self, engine: Engine, attribute: str, column: Column, keys: List[Any]
+    ) -> Dict[Any, T]:
+        found = {}
+        with Session(engine) as session:
+            for start in range(0, len(keys), self.id_chunk_size):
+                chunk = keys[start : start + self.id_chunk_size]
+                condition = self._key_condition(chunk)
+                query = select(self.model).where(condition)
+                for (record,) in self._execute(session, query, engine=engine, kind="by_id"):
+                    found[keyset.normalize(getattr(record, attribute))] = record
+        return found
+
+    async def _run(self, fn, *args, timeout: Optional[float] = None, **kwargs):
+        try:
+            return await run_in_pool(fn, *args, timeout=timeout, **kwargs)
+        except asyncio.TimeoutError as e:
+            raise QueryTimeoutError(
+                f"{self.model.__name__} query did not finish within the timeout"
+            ) from e
+
+    async def aget_paginated(
+        self, *args: Any, timeout: Optional[float] = None, **kwargs: Any
+    ) -> Tuple[List[T], int]:
+        """Run `get_paginated` on the query thread pool without blocking the event loop.
+
+        Args:
+            *args: Positional arguments for `get_paginated`
+            timeout: Seconds to wait; defaults to VINEAPP_DB_QUERY_TIMEOUT
+            **kwargs: Keyword arguments for `get_paginated`
+
+        Raises:
+            QueryTimeoutError: If the query does not finish within the timeout
+        """
+        return await self._run(self.get_paginated, *args, timeout=timeout, **kwargs)
+
+    async def aget_by_id(self, id: Any, timeout: Optional[float] = None) -> Optional[T]:
+        """Run `get_by_id` on the query thread pool without blocking the event loop.
+
+        A record loaded ahead by `aprefetch_by_id` is returned without a query.
+        A record missing from the snapshot is looked up in Dremio.
+
+        Raises:
+            QueryTimeoutError: If the query does not finish within the timeout
+        """
+        key = self._prefetch_key(id)
+        if key is not None:
+            found = self.cache.lookup(self.model, key)
+            if found is not None:
+                return found.value
+        record = await self._run(self.get_by_id, id, timeout=timeout)
+        if record is None and self.snapshot_age() is not None:
+            record = await self._run(self.live().get_by_id, id, timeout=timeout)
+        return record
+
+    async def aprefetch_by_id(self, id: Any, timeout: Optional[float] = None) -> None:
+        """Load a record the user is likely to open next, so `aget_by_id` finds it cached.
+
+        Records already cached are not loaded again; failures are ignored.
+        """
+        key = self._prefetch_key(id)
+        if key is None or self.cache.lookup(self.model, key) is not None:
+            return
+        try:
+            record = await self.aget_by_id(id, timeout=timeout)
+        except Exception as e:  # only a guess; the user may never open it
+            logger.debug("prefetching %s %r failed: %s", self.model.__name__, id, e)
+            return
+        if record is not None:
+            self.cache.put(self.model, key, record, ttl=self.prefetch_ttl)
+
+    def _prefetch_key(self, id: Any) -> Optional[tuple]:
+        """Cache key of a prefetched record, or None when records are not prefetched."""
+        if self.cache is None or self.prefetch_ttl <= 0 or id is None:
+            return None
+        _, column = self._primary_key()
+        try:
+            return ("record", keyset.normalize(self._coerce_key(column, id)))
+        except InvalidParameterError:
+            return None
+
+    async def aget_by_ids(
+        self, ids: Iterable[Any], timeout: Optional[float] = None
+    ) -> Dict[Any, T]:
+        """Run `get_by_ids` on the query thread pool without blocking the event loop.
+
+        Raises:
+            QueryTimeoutError: If the query does not finish within the timeout
+        """
+        return await self._run(self.get_by_ids, list(ids), timeout=timeout)
@@ -0,0 +1,309 @@
+"""In-process trigram indexes for list page search.
+
+The search box on list pages filters with `lower(field) LIKE lower('%text%')`
+over the repository's `search_fields`, which makes Dremio scan the whole view
+on every (debounced) keystroke. The views behind the list pages hold a few
+thousand rows, so their search fields fit comfortably in memory.
+
+A `TrigramIndex` keeps the lowercased search fields of every row, keyed on
+primary key, with a posting set of keys per three-character substring. A
+search intersects the postings of the text's trigrams and confirms each
+candidate with a substring test, so it matches exactly the rows the LIKE
+filter would on text fields, ranked by how well they match. Repositories
+then fetch only those rows by primary key.
+
+Only text fields are indexed. Dremio casts numbers, dates and timestamps to
+text in its own format (e.g. '2025-03-01 14:00:00.000'), which the Python
+values do not reproduce, so repositories keep filtering those fields with
+LIKE in Dremio (see `DremioRepository._indexed_fields`).
+
+`SearchIndexes` holds one index per model and search fields. An index is
+built on its first search and refreshed after a TTL, or after the model is
+invalidated in the result cache; a refresh reads the search fields again and
+only re-indexes the rows that changed.
+
+Settings can be tuned with environment variables:
+- VINEAPP_SEARCH_INDEX_TTL: seconds before an index is refreshed; unset or 0 disables indexes
+- VINEAPP_SEARCH_INDEX_MAX_ROWS: views with more rows are searched in Dremio (default: 200000)
+- VINEAPP_SEARCH_INDEX_MAX_KEYS: most keys sent as an IN list when the user sorts (default: 1000)
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Type, Union
+
+from .cache import result_cache
+from .engine import _env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ROWS = 200_000
+DEFAULT_MAX_KEYS = 1000
+
+# Characters with a meaning in LIKE patterns; text containing them is left to Dremio.
+LIKE_WILDCARDS = ("%", "_", "\\")
+
+ModelRef = Union[Type, str]
+Row = Tuple[Any, Sequence[Any]]
+
+
+def _model_name(model: ModelRef) -> str:
+    return model if isinstance(model, str) else model.__name__
+
+
+def trigrams(text: str) -> Set[str]:
+    """All three-character substrings of a text."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _normalize(values: Sequence[Any]) -> Tuple[str, ...]:
+    return tuple("" if value is None else str(value).lower() for value in values)
+
+
+class TrigramIndex:
+    """Trigram postings over the search fields of one model's rows."""
+
+    def __init__(self, rows: Iterable[Row] = ()):
+        """Initialize an index.
+
+        Args:
+            rows: (primary key, search field values) pairs to index
+        """
+        self._texts: Dict[Any, Tuple[str, ...]] = {}
+        # Insertion sequence per key, to keep the view's order between equal matches
+        self._order: Dict[Any, int] = {}
+        self._sequence = 0
+        self._postings: Dict[str, Set[Any]] = defaultdict(set)
+        self.update(rows)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def _add(self, key: Any, texts: Tuple[str, ...]) -> None:
+        self._texts[key] = texts
+        if key not in self._order:
+            self._order[key] = self._sequence
+            self._sequence += 1
+        for gram in set().union(*map(trigrams, texts)):
+            self._postings[gram].add(key)
+
+    def _discard(self, key: Any) -> None:
+        texts = self._texts.pop(key)
+        for gram in set().union(*map(trigrams, texts)):
+            postings = self._postings[gram]
+            postings.discard(key)
+            if not postings:
+                del self._postings[gram]
+
+    def update(self, rows: Iterable[Row]) -> int:
+        """Add or re-index rows; rows whose search fields are unchanged are skipped.
+
+        Returns:
+            Number of rows added or changed
+        """
+        changed = 0
+        for key, values in rows:
+            texts = _normalize(values)
+            current = self._texts.get(key)
+            if current == texts:
+                continue
+            if current is not None:
+                self._discard(key)
+            self._add(key, texts)
+            changed += 1
+        return changed
+
+    def remove(self, keys: Iterable[Any]) -> int:
+        """Remove rows from the index.
+
+        Returns:
+            Number of rows removed
+        """
+        removed = 0
+        for key in keys:
+            if key in self._texts:
+                self._discard(key)
+                del self._order[key]
+                removed += 1
+        return removed
+
+    def replace(self, rows: Iterable[Row]) -> Tuple[int, int]:
+        """Make the index hold exactly `rows`, touching only the rows that differ.
+
+        Returns:
+            Tuple of (rows added or changed, rows removed)
+        """
+        rows = list(rows)
+        seen = {key for key, _ in rows}
+        removed = self.remove([key for key in self._texts if key not in seen])
+        return self.update(rows), removed
+
+    def search(self, text: str) -> Optional[List[Any]]:
+        """Keys of the rows with `text` in any search field, best match first.
+
+        Matches are case-insensitive substrings, as with the LIKE filter.
+        Rows where the text starts a field come first, then by the position
+        of the field in the search fields, the position of the match and the
+        length of the field; remaining ties keep the order rows were indexed.
+
+        Returns:
+            Ranked keys, or None when the text contains LIKE wildcards
+        """
+        if any(wildcard in text for wildcard in LIKE_WILDCARDS):
+            return None
+        needle = text.lower()
+        grams = trigrams(needle)
+        if grams:
+            postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            keys = candidates if len(candidates) < len(self._texts) else list(self._texts)
+        else:
+            # Shorter than a trigram: check every row, still without a query
+            keys = list(self._texts)
+
+        ranked = []
+        order = self._order
+        for key in keys:
+            best = None
+            for number, haystack in enumerate(self._texts[key]):
+                position = haystack.find(needle)
+                if position < 0:
+                    continue
+                rank = (position > 0, number, position, len(haystack))
+                if best is None or rank < best:
+                    best = rank
+            if best is not None:
+                ranked.append((best, order[key], key))
+        ranked.sort()
+        return [key for _, _, key in ranked]
+
+
+@dataclass
+class _Entry:
+    index: Optional[TrigramIndex] = None
+    refreshed_at: Optional[float] = None
+    stale: bool = True
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class SearchIndexes:
+    """Trigram indexes per model and search fields, loaded on first use."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_keys: int = DEFAULT_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize without any indexes.
+
+        Args:
+            ttl: Seconds an index is used before its rows are read again
+            max_rows: Views with more rows are not indexed
+            max_keys: Most keys a repository sends as an IN list instead of a LIKE filter
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.max_keys = max_keys
+        self._clock = clock
+        self._entries: Dict[Tuple[str, Tuple[str, ...]], _Entry] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["SearchIndexes"]:
+        """Create indexes from VINEAPP_SEARCH_INDEX_* settings, or None when disabled."""
+        ttl = _env_int("VINEAPP_SEARCH_INDEX_TTL", 0)
+        if ttl <= 0:
+            return None
+        return cls(
+            ttl,
+            max_rows=_env_int("VINEAPP_SEARCH_INDEX_MAX_ROWS", DEFAULT_MAX_ROWS),
+            max_keys=_env_int("VINEAPP_SEARCH_INDEX_MAX_KEYS", DEFAULT_MAX_KEYS),
+        )
+
+    def _entry(self, model: ModelRef, fields: Sequence[str]) -> _Entry:
+        key = (_model_name(model), tuple(fields))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            return entry
+
+    def search(
+        self,
+        model: ModelRef,
+        fields: Sequence[str],
+        text: str,
+        load: Callable[[], Optional[List[Row]]],
+    ) -> Optional[List[Any]]:
+        """Resolve search text to ranked primary keys, loading or refreshing the index first.
+
+        Args:
+            model: Model whose rows are searched
+            fields: Search fields the rows hold
+            text: Search text
+            load: Reads (key, field values) pairs of all rows; returns None
+                when the view has more than `max_rows` rows
+
+        Returns:
+            Ranked keys, or None when the search must be done in Dremio
+        """
+        entry = self._entry(model, fields)
+        with entry.lock:
+            now = self._clock()
+            if entry.stale or entry.refreshed_at is None or now - entry.refreshed_at > self.ttl:
+                self._refresh(model, entry, load)
+                entry.refreshed_at = now
+                entry.stale = False
+            index = entry.index
+        return None if index is None else index.search(text)
+
+    def _refresh(self, model: ModelRef, entry: _Entry, load) -> None:
+        started = time.perf_counter()
+        try:
+            rows = load()
+        except Exception as e:  # the LIKE filter still works without the index
+            logger.warning("search index of %s not loaded: %s", _model_name(model), e)
+            entry.index = None
+            return
+        if rows is None:
+            logger.info("%s has too many rows to index for search", _model_name(model))
+            entry.index = None
+            return
+        if entry.index is None:
+            entry.index = TrigramIndex(rows)
+            changed, removed = len(entry.index), 0
+        else:
+            changed, removed = entry.index.replace(rows)
+        logger.debug(
+            "search index of %s: %d rows, %d changed, %d removed in %.3fs",
+            _model_name(model),
+            len(entry.index),
+            changed,
+            removed,
+            time.perf_counter() - started,
+        )
+
+    def mark_stale(self, model: Optional[ModelRef] = None) -> None:
+        """Refresh a model's indexes (all indexes for None) on their next search."""
+        name = None if model is None else _model_name(model)
+        with self._lock:
+            entries = [entry for key, entry in self._entries.items() if name in (None, key[0])]
+        for entry in entries:
+            entry.stale = True
+
+    def clear(self) -> None:
+        """Drop all indexes."""
+        with self._lock:
+            self._entries.clear()
+
+
+search_indexes = SearchIndexes.from_env()
+
+if search_indexes is not None:
+    result_cache.add_invalidation_listener(search_indexes.mark_stale)
@@ -0,0 +1,139 @@
+"""Coalescing of identical concurrent queries.
+
+When a shift starts, many tablets open the same list pages at once and send
+Dremio the same page and count queries. The result cache only helps once the
+first of them has finished; until then every request runs its own query.
+
+`SingleFlight.do` runs a call only if no identical call (same group and key,
+e.g. the compiled SQL) is in flight. Callers arriving while it runs wait for
+it and all receive its result, or its exception. Nothing is kept after the
+call finishes; caching is left to `data.cache`.
+
+A call cancelled because its own caller stopped waiting (QueryCancelledError)
+is not shared: callers that joined it run the call again, one of them leading.
+
+Results are shared between the callers, so treat them as read-only.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from .executor import QueryCancelledError
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+@dataclass
+class FlightStats:
+    """Counters for one group of calls, or for all groups together."""
+
+    calls: int = 0
+    coalesced: int = 0
+    errors: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "errors": self.errors}
+
+
+@dataclass
+class _Call:
+    done: threading.Event = field(default_factory=threading.Event)
+    waiters: int = 0
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its outcome."""
+
+    def __init__(self):
+        self._calls: Dict[Tuple[str, Hashable], _Call] = {}
+        self._stats: Dict[str, FlightStats] = {}
+        self._lock = threading.Lock()
+
+    def _group_stats(self, group: str) -> FlightStats:
+        stats = self._stats.get(group)
+        if stats is None:
+            stats = self._stats[group] = FlightStats()
+        return stats
+
+    def do(self, group: str, key: Hashable, call: Callable[[], V]) -> V:
+        """Run `call`, or wait for the identical call already in flight.
+
+        Args:
+            group: What is being called, e.g. a model name; counters are kept per group
+            key: Identifies identical calls within the group
+            call: Function producing the result
+
+        Returns:
+            The result of this call or of the call it joined
+
+        Raises:
+            Exception: Whatever the call raised, also in the callers that joined it
+        """
+        with self._lock:
+            stats = self._group_stats(group)
+            flight = self._calls.get((group, key))
+            if flight is None:
+                flight = self._calls[(group, key)] = _Call()
+                stats.calls += 1
+                leader = True
+            else:
+                flight.waiters += 1
+                stats.coalesced += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if isinstance(flight.error, QueryCancelledError):
+                return self.do(group, key, call)
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = call()
+            return flight.result
+        except QueryCancelledError as e:
+            flight.error = e
+            raise
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                stats.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[(group, key)]
+            flight.done.set()
+            if flight.waiters:
+                logger.debug("%s: %d identical calls shared one result", group, flight.waiters)
+
+    def in_flight(self) -> int:
+        """Number of calls currently running."""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        """Call and coalescing counters in total and per group."""
+        with self._lock:
+            total = FlightStats()
+            groups = {}
+            for name, stats in self._stats.items():
+                groups[name] = stats.to_dict()
+                total.calls += stats.calls
+                total.coalesced += stats.coalesced
+                total.errors += stats.errors
+            return {**total.to_dict(), "in_flight": len(self._calls), "groups": groups}
+
+    def clear(self) -> None:
+        """Reset the counters; calls in flight are not affected."""
+        with self._lock:
+            self._stats.clear()
+
+
+single_flight = SingleFlight()
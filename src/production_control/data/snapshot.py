@@ -0,0 +1,355 @@
+"""Local snapshots of Dremio views.
+
+Most views behind the app (products, the potting list, the floor plan)
+change a few times per day, yet every screen queries Dremio for them. The
+snapshot store periodically copies each view into a local SQLite file with
+the same table layout, so repositories can serve list, detail and search
+queries from the copy with the same SQL they send to Dremio.
+
+Repositories read from a snapshot while it is younger than the maximum age
+and fall back to live Dremio when there is no usable snapshot. Invalidating a
+model in the result cache (after writing to a source system) also marks its
+snapshot stale until a newer one is taken, so users see their own changes.
+
+Snapshots are written to a temporary file and swapped in atomically;
+queries that are running on the previous file finish undisturbed.
+
+Settings can be tuned with environment variables:
+- VINEAPP_SNAPSHOT_DIR: directory for the snapshot files; unset disables snapshots
+- VINEAPP_SNAPSHOT_MAX_AGE: seconds a snapshot is served before reads go live (default: 900)
+- VINEAPP_SNAPSHOT_INTERVAL: seconds between refreshes in the web app (default: 300)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Annotated, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+import sqlalchemy as sa
+import typer
+from sqlalchemy import Engine, MetaData, create_engine
+from sqlmodel import SQLModel, select
+
+from . import arrow
+from .cache import result_cache
+from .engine import _env_int, shared_engine
+from .executor import run_in_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE = 900
+DEFAULT_INTERVAL = 300
+
+ModelRef = Union[Type[SQLModel], str]
+
+app = typer.Typer()
+
+
+def _model_name(model: ModelRef) -> str:
+    return model if isinstance(model, str) else model.__name__
+
+
+def default_models() -> List[Type[SQLModel]]:
+    """The views the bot describes; the same set the app's list pages show."""
+    from ..bot.schema import OVERVIEWS
+
+    return list(OVERVIEWS)
+
+
+@dataclass(frozen=True)
+class SnapshotInfo:
+    """When a snapshot was taken and what it holds."""
+
+    taken_at: float
+    row_count: int
+    duration: float
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the snapshot was taken."""
+        return (time.time() if now is None else now) - self.taken_at
+
+
+class SnapshotStore:
+    """Directory of SQLite snapshots, one file per model."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_age: float = DEFAULT_MAX_AGE,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize a store; the directory is created on the first refresh.
+
+        Args:
+            directory: Directory holding the snapshot files
+            max_age: Seconds a snapshot is served before reads go to Dremio
+            clock: Wall clock time source, replaceable in tests
+        """
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self._clock = clock
+        self._engines: Dict[str, Engine] = {}
+        self._infos: Dict[str, Tuple[Optional[int], Optional[SnapshotInfo]]] = {}
+        # Snapshots taken before these times predate a write to the source.
+        self._stale_since: Dict[Optional[str], float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["SnapshotStore"]:
+        """Create a store from VINEAPP_SNAPSHOT_* settings, or None when disabled."""
+        directory = os.getenv("VINEAPP_SNAPSHOT_DIR")
+        if not directory:
+            return None
+        return cls(directory, max_age=_env_int("VINEAPP_SNAPSHOT_MAX_AGE", DEFAULT_MAX_AGE))
+
+    def path(self, model: Type[SQLModel]) -> Path:
+        """Snapshot file for a model, named after its Dremio view."""
+        schema = model.__table__.schema
+        name = f"{schema}.{model.__tablename__}" if schema else model.__tablename__
+        return self.directory / f"{name}.sqlite"
+
+    def _engine(self, model: Type[SQLModel]) -> Engine:
+        name = model.__name__
+        engine = self._engines.get(name)
+        if engine is None:
+            with self._lock:
+                engine = self._engines.get(name)
+                if engine is None:
+                    # Queries are compiled against the Dremio schema; the
+                    # snapshot holds the view as a table in SQLite's main schema.
+                    engine = create_engine(
+                        f"sqlite:///{self.path(model)}",
+                        connect_args={"check_same_thread": False},
+                    ).execution_options(schema_translate_map={model.__table__.schema: "main"})
+                    self._engines[name] = engine
+        return engine
+
+    def info(self, model: Type[SQLModel]) -> Optional[SnapshotInfo]:
+        """When the model's snapshot was taken, or None if there is none.
+
+        The file is checked on every call, so a snapshot refreshed by another
+        process (e.g. `pc snapshot refresh` from cron) is picked up.
+        """
+        name = model.__name__
+        path = self.path(model)
+        try:
+            stamp = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            stamp = None
+        cached = self._infos.get(name)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        self._release(name)
+        info = None
+        if stamp is not None:
+            try:
+                with self._engine(model).connect() as connection:
+                    row = connection.exec_driver_sql(
+                        "SELECT taken_at, row_count, duration FROM snapshot_info"
+                    ).one()
+                info = SnapshotInfo(*row)
+            except sa.exc.SQLAlchemyError:
+                logger.warning("unreadable snapshot %s", path, exc_info=True)
+        self._infos[name] = (stamp, info)
+        return info
+
+    def _release(self, name: str) -> None:
+        """Let new connections open the current file; running queries keep the old one."""
+        with self._lock:
+            engine = self._engines.pop(name, None)
+        if engine is not None:
+            engine.dispose(close=False)
+
+    def engine_for(
+        self, model: Type[SQLModel], max_age: Optional[float] = None
+    ) -> Optional[Engine]:
+        """Engine for reading the model's snapshot, or None when reads must go live.
+
+        Args:
+            model: Model to read
+            max_age: Seconds the snapshot may be old; defaults to the store's max_age
+        """
+        info = self.info(model)
+        limit = self.max_age if max_age is None else max_age
+        if info is None or info.age(self._clock()) > limit:
+            return None
+        stale_since = max(
+            self._stale_since.get(model.__name__, 0.0), self._stale_since.get(None, 0.0)
+        )
+        if info.taken_at <= stale_since:
+            return None
+        return self._engine(model)
+
+    def age(self, model: Type[SQLModel]) -> Optional[float]:
+        """Seconds since the model's snapshot was taken, or None if there is none."""
+        info = self.info(model)
+        return None if info is None else info.age(self._clock())
+
+    def mark_stale(self, model: Optional[ModelRef] = None) -> None:
+        """Stop serving a model's snapshot (all snapshots for None) until a newer one is taken."""
+        with self._lock:
+            self._stale_since[None if model is None else _model_name(model)] = self._clock()
+
+    def refresh(self, model: Type[SQLModel], source: Engine) -> SnapshotInfo:
+        """Copy a view from Dremio into a new snapshot and swap it in.
+
+        Copying a whole view may take longer than the query deadline for page
+        loads, so it does not apply (see `data.engine`).
+
+        Args:
+            model: Model whose view to copy
+            source: Engine for live Dremio
+
+        Returns:
+            Information about the new snapshot
+        """
+        started = self._clock()
+        source = source.execution_options(query_deadline=0)
+        table = arrow.read_table(source, arrow.compile_sql(source, select(model)))
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.path(model)
+        temporary = target.with_suffix(".sqlite.tmp")
+        temporary.unlink(missing_ok=True)
+
+        local = model.__table__.to_metadata(MetaData(), schema=None)
+        writer = create_engine(f"sqlite:///{temporary}")
+        try:
+            with writer.begin() as connection:
+                local.create(connection)
+                by_name = {column.name: column.key for column in local.columns}
+                rows = [
+                    {by_name[name]: value for name, value in row.items() if name in by_name}
+                    for row in table.to_pylist()
+                ]
+                if rows:
+                    connection.execute(local.insert(), rows)
+                info = SnapshotInfo(
+                    taken_at=started, row_count=len(rows), duration=self._clock() - started
+                )
+                connection.exec_driver_sql(
+                    "CREATE TABLE snapshot_info (taken_at REAL, row_count INTEGER, duration REAL)"
+                )
+                connection.exec_driver_sql(
+                    "INSERT INTO snapshot_info VALUES (?, ?, ?)",
+                    (info.taken_at, info.row_count, info.duration),
+                )
+        finally:
+            writer.dispose()
+
+        os.replace(temporary, target)
+        self._release(model.__name__)
+        with self._lock:
+            self._infos[model.__name__] = (target.stat().st_mtime_ns, info)
+        logger.info(
+            "snapshot of %s: %d rows in %.1fs", model.__name__, info.row_count, info.duration
+        )
+        return info
+
+    def refresh_all(
+        self, source: Engine, models: Optional[Iterable[Type[SQLModel]]] = None
+    ) -> Dict[str, Union[SnapshotInfo, Exception]]:
+        """Refresh the snapshots of several models; a failing model does not stop the others.
+
+        Args:
+            source: Engine for live Dremio
+            models: Models to refresh; defaults to `default_models()`
+
+        Returns:
+            The new snapshot information or the error, per model name
+        """
+        results: Dict[str, Union[SnapshotInfo, Exception]] = {}
+        for model in default_models() if models is None else models:
+            try:
+                results[model.__name__] = self.refresh(model, source)
+            except Exception as e:  # keep refreshing the other views
+                logger.warning("snapshot of %s failed: %s", model.__name__, e)
+                results[model.__name__] = e
+        return results
+
+    def dispose(self) -> None:
+        """Close all snapshot connections."""
+        with self._lock:
+            engines, self._engines = list(self._engines.values()), {}
+        for engine in engines:
+            engine.dispose()
+
+
+snapshot_store = SnapshotStore.from_env()
+
+if snapshot_store is not None:
+    result_cache.add_invalidation_listener(snapshot_store.mark_stale)
+
+
+async def refresh_periodically(store: SnapshotStore, interval: Optional[float] = None) -> None:
+    """Keep the snapshots of the default models fresh; runs until cancelled."""
+    if interval is None:
+        interval = _env_int("VINEAPP_SNAPSHOT_INTERVAL", DEFAULT_INTERVAL)
+    while True:
+        await run_in_pool(store.refresh_all, shared_engine(), timeout=0)
+        await asyncio.sleep(interval)
+
+
+def _store_or_exit() -> SnapshotStore:
+    if snapshot_store is None:
+        typer.echo("Snapshots are disabled: set VINEAPP_SNAPSHOT_DIR", err=True)
+        raise typer.Exit(code=1)
+    return snapshot_store
+
+
+def _selected_models(names: Optional[List[str]]) -> List[Type[SQLModel]]:
+    models = default_models()
+    if not names:
+        return models
+    by_name = {model.__name__.lower(): model for model in models}
+    unknown = [name for name in names if name.lower() not in by_name]
+    if unknown:
+        typer.echo(f"Unknown model(s): {', '.join(unknown)}", err=True)
+        raise typer.Exit(code=1)
+    return [by_name[name.lower()] for name in names]
+
+
+@app.command(name="refresh")
+def snapshot_refresh(
+    model: Annotated[
+        Optional[List[str]],
+        typer.Option(help="Model to refresh, e.g. PottingLot (default: all overviews)"),
+    ] = None,
+):
+    """Copy the overview views from Dremio into the local snapshot store.
+
+    Examples:
+        pc snapshot refresh
+        pc snapshot refresh --model Product --model PottingLot
+    """
+    store = _store_or_exit()
+    results = store.refresh_all(shared_engine(), _selected_models(model))
+    failed = 0
+    for name, result in results.items():
+        if isinstance(result, SnapshotInfo):
+            typer.echo(f"{name}: {result.row_count} rows in {result.duration:.1f}s")
+        else:
+            failed += 1
+            typer.echo(f"{name}: failed: {result}", err=True)
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command(name="status")
+def snapshot_status():
+    """Show the age and size of each snapshot."""
+    store = _store_or_exit()
+    for model in default_models():
+        info = store.info(model)
+        if info is None:
+            typer.echo(f"{model.__name__}: no snapshot")
+        else:
+            typer.echo(
+                f"{model.__name__}: {info.row_count} rows, "
+                f"{store.age(model):.0f}s old (max {store.max_age}s)"
+            )
@@ -0,0 +1,181 @@
+"""Compiled SQL templates for Dremio queries.
+
+The Dremio Flight dialect does not support SQLAlchemy's compiled statement
+cache, so every query compiles the full ORM select again. Dremio Flight
+doesn't support query parameters either; values used to be pasted into the
+statements as text, so every search text, cursor and page made a different
+statement anyway.
+
+Repositories put such values in bind parameters that are rendered inline
+(`literal_execute`, see `keyset.literal`). Statements that differ only in
+those values share their structure: model, filters, sort order, projection.
+`SqlTemplateCache` compiles each structure once, with a placeholder per
+value, and renders a statement by substituting its values as SQL literals,
+which costs a fraction of a compile.
+
+Settings can be tuned with environment variables:
+- VINEAPP_SQL_TEMPLATE_CACHE_SIZE: templates kept; 0 compiles every statement (default: 512)
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from sqlalchemy import Engine
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.compiler import Compiled
+
+from .arrow import compile_sql
+from .engine import _env_int
+from .keyset import sql_literal
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 512
+
+# How the compiler marks a bind parameter rendered at execution time
+_PLACEHOLDER = re.compile(r"__\[POSTCOMPILE_(\w+)\]")
+
+
+class SqlTemplate:
+    """SQL of a compiled statement, split around its parameter placeholders."""
+
+    def __init__(self, compiled: Compiled):
+        self.compiled = compiled
+        parts = _PLACEHOLDER.split(compiled.string)
+        self._texts: List[str] = parts[0::2]
+        self._names: List[str] = parts[1::2]
+        self._processors: Dict[str, Callable[[Any], str]] = {}
+        escaped = getattr(compiled, "escaped_bind_names", {})
+        for bind, name in compiled.bind_names.items():
+            processor = bind.type.literal_processor(compiled.dialect)
+            self._processors[escaped.get(name, name)] = processor or sql_literal
+
+    def _literal(self, name: str, value: Any) -> str:
+        render = self._processors.get(name, sql_literal)
+        if isinstance(value, (list, tuple)):
+            if not value:
+                raise TypeError("Cannot render an empty IN list")
+            return ", ".join(sql_literal(v) if v is None else render(v) for v in value)
+        return sql_literal(value) if value is None else render(value)
+
+    def render(self, values: Dict[str, Any]) -> str:
+        """SQL with every placeholder replaced by its value as a literal.
+
+        Raises:
+            TypeError: If a value has no literal representation
+        """
+        rendered = [self._texts[0]]
+        for name, text in zip(self._names, self._texts[1:]):
+            rendered.append(self._literal(name, values[name]))
+            rendered.append(text)
+        return "".join(rendered)
+
+
+class SqlTemplateCache:
+    """Least recently used templates per dialect, schema translation and statement structure."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: Number of templates kept; 0 compiles every statement
+        """
+        self.max_entries = max_entries
+        self._templates: "OrderedDict[Hashable, SqlTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.compile_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "SqlTemplateCache":
+        """Create a cache configured through VINEAPP_SQL_TEMPLATE_CACHE_SIZE."""
+        return cls(max_entries=_env_int("VINEAPP_SQL_TEMPLATE_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+
+    def render(self, engine: Engine, statement: Executable, params: Optional[dict] = None) -> str:
+        """Render a statement as SQL text with all parameters inline.
+
+        Produces the same SQL as `arrow.compile_sql`, compiling the statement
+        only when no template for its structure is cached yet.
+
+        Args:
+            engine: Engine the SQL is for; its dialect and schema translation apply
+            statement: Statement to render
+            params: Values for bind parameters left without one, e.g. limit and offset
+        """
+        cache_key = statement._generate_cache_key() if self.max_entries > 0 else None
+        if cache_key is None:
+            return compile_sql(engine, statement.params(params) if params else statement)
+
+        translate = engine.get_execution_options().get("schema_translate_map")
+        key = (
+            engine.dialect.name,
+            engine.dialect.driver,
+            tuple(translate.items()) if translate else None,
+            cache_key.key,
+        )
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+        if template is None:
+            template = self._compile(engine, statement, cache_key, translate)
+            with self._lock:
+                self.misses += 1
+                self._templates[key] = template
+                while len(self._templates) > self.max_entries:
+                    self._templates.popitem(last=False)
+
+        values = template.compiled.construct_params(
+            params, extracted_parameters=cache_key.bindparams
+        )
+        try:
+            return template.render(values)
+        except TypeError:
+            # A value without a plain literal form; let the dialect render it
+            return compile_sql(engine, statement.params(params) if params else statement)
+
+    def _compile(self, engine, statement, cache_key, translate) -> SqlTemplate:
+        started = time.perf_counter()
+        # Compiling an ORM select updates its compile options in place, which
+        # would change the structure of statements derived from it; compile a copy.
+        compiled = statement._clone().compile(
+            dialect=engine.dialect,
+            cache_key=cache_key,
+            schema_translate_map=translate,
+            render_schema_translate=translate is not None,
+            compile_kwargs={"literal_execute": True},
+        )
+        template = SqlTemplate(compiled)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.compile_seconds += elapsed
+        logger.debug("compiled SQL template in %.1f ms", elapsed * 1000)
+        return template
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, time spent compiling and the current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "compile_seconds": self.compile_seconds,
+                "size": len(self._templates),
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self) -> None:
+        """Drop all templates and reset the counters."""
+        with self._lock:
+            self._templates.clear()
+            self.hits = 0
+            self.misses = 0
+            self.compile_seconds = 0.0
+
+
+sql_templates = SqlTemplateCache.from_env()
@@ -3,8 +3,11 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
+from ..data.cache import invalidate
 from ..inspectie.commands import UpdateAfwijkingCommand
+from ..inspectie.models import InspectieRonde
 from ..vloerplan.commands import UpdateTuinNrCommand
+from ..vloerplan.models import Vloerplan19cm
 from .connection import execute_firebird_command
 
 router = APIRouter(prefix="/api/firebird", tags=["firebird"])
@@ -43,6 +46,7 @@ async def update_afwijking(command: UpdateAfwijkingCommand) -> ApiResponse:
     result = execute_firebird_command(sql, params)
 
     if result["success"]:
+        invalidate(InspectieRonde)
         if command.new_datum_afleveren:
             return ApiResponse(
                 success=True,
@@ -66,6 +70,7 @@ async def update_tuin_nr(command: UpdateTuinNrCommand) -> ApiResponse:
     result = execute_firebird_command(sql, params)
 
     if result["success"]:
+        invalidate(Vloerplan19cm)
         return ApiResponse(
             success=True,
             message=f"Updated TUINNUMMER for TEELTNR {command.teeltnr} to {command.new_tuinnummer}",
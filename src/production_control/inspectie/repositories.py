@@ -17,9 +17,19 @@ class InspectieRepository(DremioRepository[InspectieRonde]):
     # Fields to search when filtering inspectie records
     search_fields = ["code", "product_naam", "product_groep_naam", "klant_code"]
 
-    def __init__(self, connection: Optional[Union[str, Engine]] = None):
-        """Initialize the repository with InspectieRonde model."""
+    def __init__(
+        self,
+        connection: Optional[Union[str, Engine]] = None,
+        default_filter: Optional[str] = None,
+    ):
+        """Initialize the repository with InspectieRonde model.
+
+        Args:
+            connection: Connection string or engine
+            default_filter: Named filter applied when get_paginated is not passed one
+        """
         super().__init__(InspectieRonde, connection)
+        self.default_filter = default_filter
 
     def _apply_default_sorting(self, query: Select) -> Select:
         """Apply default sorting to query.
@@ -78,12 +88,16 @@ class InspectieRepository(DremioRepository[InspectieRonde]):
         date_from: Optional[date] = None,
         date_to: Optional[date] = None,
         default_filter: Optional[str] = None,
+        columns: Optional[List[str]] = None,
     ) -> Tuple[List[InspectieRonde], int]:
         """Get paginated inspectie records from the data source."""
         page, items_per_page, sort_by, descending = self._validate_pagination(
             page, items_per_page, sort_by, descending, pagination
         )
 
+        if default_filter is None:
+            default_filter = self.default_filter
+
         with Session(self.engine) as session:
             # Create base queries
             base_query = select(InspectieRonde)
@@ -104,10 +118,15 @@ class InspectieRepository(DremioRepository[InspectieRonde]):
                 self.search_fields,
                 sort_by,
                 descending,
+                pagination=pagination,
+                columns=columns,
             )
 
     def get_by_id(self, code: str) -> Optional[InspectieRonde]:
         """Get an inspectie record by its code."""
-        with Session(self.engine) as session:
+        engine = self.engine
+        with Session(engine) as session, self._measure("by_id", engine=engine) as query:
             # Using text() since Dremio Flight doesn't support parameterized queries
-            return session.exec(select(InspectieRonde).where(text(f"code = '{code}'"))).first()
+            record = session.exec(select(InspectieRonde).where(text(f"code = '{code}'"))).first()
+            query.rows = int(record is not None)
+            return record
@@ -31,6 +31,10 @@ LEUZE_LAST_SCAN_NODEID = "ns=5;i=6122"
 
 DEFAULT_BOLLEN_PER_KRAT = 999
 
+# Seconds the picklist lookup may take before the default is published; the
+# PLC waits for the scan ack, so this is far below the Dremio query deadline.
+BOLLEN_PER_KRAT_DEADLINE = 5
+
 
 def _default_bollen_per_krat() -> int:
     """Fallback bulb count; override via VINEAPP_BOLLEN_PER_KRAT_DEFAULT."""
@@ -55,7 +59,9 @@ def bollen_per_krat_for(partij: int, repository=None) -> int:
     (the picklist's bakken are the kratten on the ontstapelaar line).
     Any miss — unknown partij, null/zero fields, non-positive result,
     or a lookup error — falls back to the configurable default so the
-    scan ack never blocks on Dremio data quality.
+    scan ack never blocks on Dremio data quality. The lookup gives up after
+    BOLLEN_PER_KRAT_DEADLINE seconds, and fails at once while Dremio's
+    circuit is open (see `data.circuit`).
 
     Blocking call (Dremio query); run off the event loop.
     """
@@ -64,7 +70,7 @@ def bollen_per_krat_for(partij: int, repository=None) -> int:
         if repository is None:
             from ...bulb_picklist.repositories import BulbPickListRepository
 
-            repository = BulbPickListRepository()
+            repository = BulbPickListRepository().with_deadline(BOLLEN_PER_KRAT_DEADLINE)
         record = repository.get_by_id(partij)
         if record is None or not record.aantal_bollen or not record.aantal_bakken:
             logger.warning(
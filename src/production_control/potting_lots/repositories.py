@@ -13,6 +13,9 @@ from .models import PottingLot
 class PottingLotRepository(DremioRepository[PottingLot]):
     """Repository for potting lot records."""
 
+    # Fetch list pages and their total count in one Dremio query
+    count_in_page_query = True
+
     # Fields to search when filtering potting lot records
     search_fields = [
         "id",
@@ -47,6 +50,7 @@ class PottingLotRepository(DremioRepository[PottingLot]):
         descending: bool = False,
         filter_text: Optional[str] = None,
         pagination: Optional[Pagination] = None,
+        columns: Optional[List[str]] = None,
     ) -> Tuple[List[PottingLot], int]:
         """Get paginated potting lot records from the data source."""
         page, items_per_page, sort_by, descending = self._validate_pagination(
@@ -69,13 +73,18 @@ class PottingLotRepository(DremioRepository[PottingLot]):
                 self.search_fields,
                 sort_by,
                 descending,
+                pagination=pagination,
+                columns=columns,
             )
 
     def get_by_id(self, id: int) -> Optional[PottingLot]:
         """Get a potting lot record by its id."""
-        with Session(self.engine) as session:
+        engine = self.engine
+        with Session(engine) as session, self._measure("by_id", engine=engine) as query:
             # Using text() since Dremio Flight doesn't support parameterized queries
-            return session.exec(select(PottingLot).where(text(f"id = {id}"))).first()
+            record = session.exec(select(PottingLot).where(text(f"id = {id}"))).first()
+            query.rows = int(record is not None)
+            return record
 
     def get_top_lots(self, limit: int = 50) -> List[PottingLot]:
         """Get the top N potting lots ordered by potting date (most recent first)."""
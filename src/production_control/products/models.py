@@ -61,6 +61,9 @@ class ProductRepository(DremioRepository[Product]):
     # Fields to search when filtering products
     search_fields = ["name", "product_group_name"]
 
+    # Product master data rarely changes, so pages can be cached longer
+    cache_ttl = 300
+
     def __init__(self, connection: Optional[Engine] = None):
         """Initialize repository with optional connection."""
         super().__init__(Product, connection)
@@ -78,8 +81,11 @@ class ProductRepository(DremioRepository[Product]):
 
     def get_by_id(self, product_id: int) -> Optional[Product]:
         """Get a product by its ID."""
-        with Session(self.engine) as session:
-            return session.exec(select(Product).where(text(f"id = {product_id}"))).first()
+        engine = self.engine
+        with Session(engine) as session, self._measure("by_id", engine=engine) as query:
+            record = session.exec(select(Product).where(text(f"id = {product_id}"))).first()
+            query.rows = int(record is not None)
+            return record
 
     def get_paginated(
         self,
@@ -89,6 +95,7 @@ class ProductRepository(DremioRepository[Product]):
         descending: bool = False,
         filter_text: Optional[str] = None,
         pagination: Optional[Pagination] = None,
+        columns: Optional[List[str]] = None,
     ) -> Tuple[List[Product], int]:
         """Get paginated products from the data source."""
         page, items_per_page, sort_by, descending = self._validate_pagination(
@@ -111,4 +118,6 @@ class ProductRepository(DremioRepository[Product]):
                 self.search_fields,
                 sort_by,
                 descending,
+                pagination=pagination,
+                columns=columns,
             )
@@ -102,7 +102,8 @@ class WijderzetRegistratie(SQLModel, table=True):
     wijderzet_registratie_fout: Optional[str] = Field(
         default=None,
         title="Fout",
-        sa_column_kwargs={"info": {"ui_sortable": True, "ui_hidden": True}},
+        # Not shown as a column, but list pages need it for warning_emoji
+        sa_column_kwargs={"info": {"ui_sortable": True, "ui_hidden": True, "ui_fetch": True}},
     )
 
     # Calculated fields
@@ -7,7 +7,9 @@ from urllib.parse import urlparse
 import httpx
 from pydantic import BaseModel
 
+from ..data.cache import invalidate
 from .commands import CorrectSpacingRecord
+from .models import WijderzetRegistratie
 
 logger = logging.getLogger(__name__)
 
@@ -104,6 +106,7 @@ class OpTechClient:
                         detail = response.text or "Unknown error"
                     raise OpTechResponseError(response.status_code, detail)
 
+                invalidate(WijderzetRegistratie)
                 return CorrectionResponse(
                     success=True,
                     message=f"Successfully updated spacing data for partij {command.partij_code}",
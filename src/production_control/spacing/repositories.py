@@ -37,6 +37,7 @@ class SpacingRepository(DremioRepository[WijderzetRegistratie]):
         filter_text: Optional[str] = None,
         warning_filter: bool = False,
         pagination: Optional[Pagination] = None,
+        columns: Optional[List[str]] = None,
     ) -> Tuple[List[WijderzetRegistratie], int]:
         """Get paginated spacing records from the data source."""
         page, items_per_page, sort_by, descending = self._validate_pagination(
@@ -69,6 +70,8 @@ class SpacingRepository(DremioRepository[WijderzetRegistratie]):
                 self.search_fields,
                 sort_by,
                 descending,
+                pagination=pagination,
+                columns=columns,
             )
 
     def get_error_records(self) -> List[WijderzetRegistratie]:
@@ -83,11 +86,14 @@ class SpacingRepository(DremioRepository[WijderzetRegistratie]):
 
     def get_by_id(self, partij_code: str) -> Optional[WijderzetRegistratie]:
         """Get a spacing record by its partij_code."""
-        with Session(self.engine) as session:
+        engine = self.engine
+        with Session(engine) as session, self._measure("by_id", engine=engine) as query:
             # Using text() since Dremio Flight doesn't support parameterized queries
-            return session.exec(
+            record = session.exec(
                 select(WijderzetRegistratie).where(text(f"partij_code = '{partij_code}'"))
             ).first()
+            query.rows = int(record is not None)
+            return record
 
     def get_by_partij_code(self, partij_code: str) -> Optional[WijderzetRegistratie]:
         """Get a spacing record by its partij_code.
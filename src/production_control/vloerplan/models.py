@@ -4,10 +4,12 @@ from datetime import date
 from math import isnan
 from typing import Optional
 
+import pyarrow as pa
 from sqlalchemy import Column, Integer
 from sqlalchemy.types import TypeDecorator
 from sqlmodel import Field, SQLModel
 
+from ..data.arrow import nan_to_null
 from ..data.repository import DateFromTimestamp
 
 
@@ -24,6 +26,10 @@ class _IntFromDouble(TypeDecorator):
             return None
         return int(value)
 
+    def coerce_arrow(self, array):
+        """Vectorized `process_result_value` for Arrow results, see `data.arrow`."""
+        return nan_to_null(array).cast(pa.int64(), safe=False)
+
 
 class Vloerplan19cm(SQLModel, table=True):
     """Model representing a vloerplan record for 19cm pots from vloerplan_19cm view."""
@@ -13,6 +13,9 @@ from .models import Vloerplan19cm
 class Vloerplan19cmRepository(DremioRepository[Vloerplan19cm]):
     """Repository for vloerplan 19cm records."""
 
+    # Fetch list pages and their total count in one Dremio query
+    count_in_page_query = True
+
     search_fields = [
         "id",
         "product_naam",
@@ -38,6 +41,7 @@ class Vloerplan19cmRepository(DremioRepository[Vloerplan19cm]):
         descending: bool = False,
         filter_text: Optional[str] = None,
         pagination: Optional[Pagination] = None,
+        columns: Optional[List[str]] = None,
     ) -> Tuple[List[Vloerplan19cm], int]:
         page, items_per_page, sort_by, descending = self._validate_pagination(
             page, items_per_page, sort_by, descending, pagination
@@ -57,12 +61,17 @@ class Vloerplan19cmRepository(DremioRepository[Vloerplan19cm]):
                 self.search_fields,
                 sort_by,
                 descending,
+                pagination=pagination,
+                columns=columns,
             )
 
     def get_by_id(self, id: int) -> Optional[Vloerplan19cm]:
-        with Session(self.engine) as session:
+        engine = self.engine
+        with Session(engine) as session, self._measure("by_id", engine=engine) as query:
             # text() because Dremio Flight doesn't support parameterized queries
-            return session.exec(select(Vloerplan19cm).where(text(f"id = {id}"))).first()
+            record = session.exec(select(Vloerplan19cm).where(text(f"id = {id}"))).first()
+            query.rows = int(record is not None)
+            return record
 
     _PENDING_SYNC_WHERE = (
         "tuin_nr_plan IS NOT NULL AND "
@@ -71,14 +80,18 @@ class Vloerplan19cmRepository(DremioRepository[Vloerplan19cm]):
 
     def get_pending_olsthoorn_sync(self) -> List[Vloerplan19cm]:
         """Rows where tuin_nr_plan is set and Olsthoorn doesn't match it yet."""
-        with Session(self.engine) as session:
+        engine = self.engine
+        with Session(engine) as session, self._measure("pending_sync", engine=engine) as measured:
             query = self._apply_default_sorting(
                 select(Vloerplan19cm).where(text(self._PENDING_SYNC_WHERE))
             )
-            return list(session.exec(query).all())
+            records = list(session.exec(query).all())
+            measured.rows = len(records)
+            return records
 
     def count_pending_olsthoorn_sync(self) -> int:
         """How many rows still need their TUINNUMMER synced to Olsthoorn."""
-        with Session(self.engine) as session:
+        engine = self.engine
+        with Session(engine) as session, self._measure("pending_sync_count", engine=engine):
             stmt = select(func.count(Vloerplan19cm.id)).where(text(self._PENDING_SYNC_WHERE))
             return session.exec(stmt).one()
@@ -52,6 +52,8 @@ def server_side_paginated_table(
     row_actions: Dict[str, Dict[str, Any]] = {},
     enable_fullscreen: bool = False,
     columns: Optional[List[str]] = None,
+    on_highlight: Optional[Callable] = None,
+    on_virtual_scroll: Optional[Callable] = None,
 ) -> ui.table:
     """Create a refreshable table component.
 
@@ -63,6 +65,11 @@ def server_side_paginated_table(
         row_actions: Optional dict of row actions, each with 'icon' and 'handler'
         enable_fullscreen: Whether to enable fullscreen toggle button
         columns: Optional list of column names to show. If None, shows all non-hidden columns.
+        on_highlight: Optional callback for a pointer resting on or touching a row's
+            action buttons, e.g. to load the record ahead of a click
+        on_virtual_scroll: Optional callback for scrolling through all rows ("Alle"
+            rows per page), which are then shown as one scrolling list; receives the
+            `index`, `from` and `to` of the rows shown, to load more rows
 
     Returns:
         A refreshable table component
@@ -76,12 +83,15 @@ def server_side_paginated_table(
         columns=columns,
     )
 
-    btns = [
-        f"""
-            <q-btn @click="$parent.$emit('{action_key}', props)" icon="{action['icon']}" flat dense color='primary'/>
-            """
-        for action_key, action in row_actions.items()
-    ]
+    highlight = (
+        """@mouseenter="$parent.$emit('highlight', props.key)" """
+        """@touchstart.passive="$parent.$emit('highlight', props.key)" """
+        if on_highlight
+        else ""
+    )
+    btns = [f"""
+            <q-btn @click="$parent.$emit('{action_key}', props)" {highlight}icon="{action['icon']}" flat dense color='primary'/>
+            """ for action_key, action in row_actions.items()]
 
     if btns:
         table.add_slot(
@@ -112,5 +122,11 @@ def server_side_paginated_table(
                 .tooltip("Schakelen naar volledig scherm")
             )
 
+    if on_virtual_scroll and state.pagination.rows_per_page == 0:
+        # Quasar's virtual scroll needs a fixed height; the header stays in view
+        table.props("virtual-scroll :virtual-scroll-sticky-size-start=48").style("height: 70vh")
+        table.on("virtual-scroll", on_virtual_scroll, args=["index", "from", "to"], throttle=0.1)
+    if on_highlight:
+        table.on("highlight", on_highlight)
     table.on("request", on_request)
     return table
@@ -0,0 +1,79 @@
+"""Latest-wins loading of a list page.
+
+Typing in the search field or sorting quickly starts a load for every change.
+Awaited one after the other, each of them used to run its Dremio query and show
+its rows, so the page flickered through outdated results until the last one
+arrived.
+
+`LatestLoad` runs each load as a task and cancels the load still running when
+a newer one starts. The cancelled load's query is abandoned too: the query
+thread is told through its `CancelToken` and stops reading the Flight stream
+(see `data.executor`). Only the newest load shows its rows.
+"""
+
+import asyncio
+import inspect
+from contextlib import nullcontext
+from typing import Any, Callable, Optional
+
+
+class LatestLoad:
+    """Runs the loads of one table, cancelling a load when a newer one starts."""
+
+    def __init__(
+        self,
+        container: Any = None,
+        on_cancelled: Optional[Callable[[], None]] = None,
+    ):
+        """Initialize without a load running.
+
+        Args:
+            container: UI element entered while loading, so loads can update the
+                page from their own task
+            on_cancelled: Called for each load cancelled by a newer one
+        """
+        self.container = container
+        self.on_cancelled = on_cancelled
+        self.cancelled = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def cancel(self) -> None:
+        """Cancel the load running, if any."""
+        if self.running:
+            self._task.cancel()
+            self.cancelled += 1
+            if self.on_cancelled is not None:
+                self.on_cancelled()
+
+    async def run(self, load: Callable[[], Any]) -> bool:
+        """Cancel the load running and run `load`, which may be synchronous.
+
+        Returns:
+            True when the load finished, False when a newer load cancelled it
+
+        Raises:
+            Exception: Whatever the load raised
+        """
+        self.cancel()
+        task = asyncio.ensure_future(self._load(load))
+        self._task = task
+        try:
+            await task
+        except asyncio.CancelledError:
+            if task is not self._task:
+                return False
+            raise
+        finally:
+            if task is self._task:
+                self._task = None
+        return True
+
+    async def _load(self, load: Callable[[], Any]) -> None:
+        with self.container if self.container is not None else nullcontext():
+            result = load()
+            if inspect.isawaitable(result):
+                await result
@@ -4,6 +4,7 @@ from typing import Optional, Any, Dict, Callable
 from pydantic import BaseModel
 from nicegui import ui
 
+from ...data.repository import DremioUnavailableError, QueryTimeoutError
 from .model_card import display_model_card
 from .styles import LINK_CLASSES
 from .message import show_error
@@ -92,10 +93,17 @@ def create_model_view_action(
     """
     if dialog:
 
-        def handle_view(e: Dict[str, Any]) -> None:
+        async def handle_view(e: Dict[str, Any]) -> None:
             """Handle view button click."""
             id_value = e.args.get("key")
-            record = repository.get_by_id(id_value)
+            try:
+                record = await repository.aget_by_id(id_value)
+            except QueryTimeoutError:
+                show_error("Het laden van het record duurt te lang, probeer het opnieuw")
+                return
+            except DremioUnavailableError:
+                show_error("De database is niet bereikbaar, probeer het later opnieuw")
+                return
             if record:
                 with ui.dialog() as dialog, ui.card():
                     if custom_display_function:
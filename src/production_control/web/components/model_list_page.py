@@ -1,12 +1,33 @@
 """Component for displaying model list pages."""
 
-from typing import Dict, Any, Callable, Optional, Type, List
-from nicegui import ui
+import copy
+from typing import Dict, Any, Callable, Optional, Type, List, Tuple
+from nicegui import background_tasks, ui
 
+from ...data.repository import DremioUnavailableError, QueryTimeoutError
 from .styles import CARD_CLASSES, HEADER_CLASSES
 from .data_table import server_side_paginated_table
-from .table_utils import format_row
+from .latest_load import LatestLoad
+from .message import show_error
+from .prefetch import PrefetchBuffer
+from .table_utils import format_record, format_row, get_list_fields
 from .table_state import ClientStorageTableState
+from .virtual_scroll import ScrollWindows
+
+
+def describe_data_age(age: Optional[float], refreshing: bool = False) -> str:
+    """Short Dutch description of how old the shown rows are."""
+    if age is None:
+        return ""
+    if age < 1:
+        text = "Actueel"
+    elif age < 60:
+        text = f"Gegevens van {age:.0f} s geleden"
+    elif age < 3600:
+        text = f"Gegevens van {age // 60:.0f} min geleden"
+    else:
+        text = f"Gegevens van {age // 3600:.0f} uur geleden"
+    return f"{text}, bijwerken..." if refreshing else text
 
 
 def display_model_list_page(
@@ -21,6 +42,9 @@ def display_model_list_page(
     custom_load_data: Optional[Callable[[Any, Any], Callable]] = None,
     enable_fullscreen: bool = False,
     columns: Optional[List[str]] = None,
+    stale_while_revalidate: bool = True,
+    prefetch: bool = True,
+    virtual_scroll: bool = True,
 ) -> None:
     """Display a model list page with standard layout.
 
@@ -36,6 +60,13 @@ def display_model_list_page(
         custom_load_data: Optional function for custom data loading
         enable_fullscreen: Whether to enable fullscreen toggle button
         columns: Optional list of column names to show. If None, shows all non-hidden columns.
+        stale_while_revalidate: Show a recently expired cached page at once and
+            replace it when fresh data arrives (default loader only)
+        prefetch: Load the next page in the background after showing a page
+            (default loader only), and a record when the pointer rests on its
+            row actions
+        virtual_scroll: Show all rows ("Alle" rows per page) as a scrolling list
+            loaded in windows instead of in one query (default loader only)
     """
     # Set up table data access
     table_state = ClientStorageTableState.initialize(table_state_key)
@@ -51,32 +82,72 @@ def display_model_list_page(
             store_load_data = custom_load_data.__globals__["store_load_data"]
             load_data = store_load_data(load_data)
     else:
+        loader = _DefaultLoader(
+            repository,
+            model_cls,
+            table_state,
+            columns,
+            stale_while_revalidate,
+            prefetch,
+            virtual_scroll,
+        )
+        load_data = loader.load
 
-        def load_data():
-            pagination = table_state.pagination
-            filter_text = table_state.filter
-            items, total = repository.get_paginated(
-                pagination=pagination,
-                filter_text=filter_text,
-            )
-            table_state.update_rows([format_row(item) for item in items], total)
-            server_side_paginated_table.refresh()
+    def count_cancelled() -> None:
+        metrics = getattr(repository, "metrics", None)
+        if metrics is not None:
+            metrics.record_cancelled_load(model_cls)
+
+    # Only the newest load of the table shows its rows; scrolling loads windows separately
+    list_loads = LatestLoad(on_cancelled=count_cancelled)
+    scroll_loads = LatestLoad(on_cancelled=count_cancelled)
+
+    async def reload(load: Callable[[], Any] = load_data, loads: LatestLoad = list_loads) -> None:
+        """Load data off the event loop, cancelling the load it supersedes.
+
+        Custom loaders may still be synchronous.
+        """
+        try:
+            await loads.run(load)
+        except QueryTimeoutError:
+            show_error("Het laden van de gegevens duurt te lang, probeer het opnieuw")
+        except DremioUnavailableError:
+            show_error("De database is niet bereikbaar, probeer het later opnieuw")
 
     # event handlers
     async def handle_filter(e: Any) -> None:
         """Handle changes to the search filter."""
         table_state.update_filter(e.value if e.value else "")
-        load_data()
+        scroll_loads.cancel()
+        await reload()
 
-    def handle_table_request(event: Dict[str, Any]) -> None:
+    async def handle_table_request(event: Dict[str, Any]) -> None:
         """Handle table request events."""
         table_state.update_from_request(event)
-        load_data()
+        scroll_loads.cancel()
+        await reload()
+
+    async def handle_virtual_scroll(e: Any) -> None:
+        """Load the rows the user is scrolling towards."""
+        await reload(lambda: loader.scroll(e.sender, e.args), scroll_loads)
+
+    highlighted: Dict[str, Any] = {}
+
+    def handle_highlight(e: Any) -> None:
+        """Load the record behind a row the user is about to act on."""
+        if e.args is None or highlighted.get("key") == e.args:
+            return
+        highlighted["key"] = e.args
+        background_tasks.create(repository.aprefetch_by_id(e.args), name="prefetch_record")
 
     # render page
-    with ui.card().classes(CARD_CLASSES.replace("max-w-3xl", card_width)):
+    with ui.card().classes(CARD_CLASSES.replace("max-w-3xl", card_width)) as card:
         with ui.row().classes("w-full justify-between items-center mb-4"):
-            ui.label("Overzicht").classes(HEADER_CLASSES)
+            with ui.row().classes("items-baseline gap-4"):
+                ui.label("Overzicht").classes(HEADER_CLASSES)
+                data_age = ui.label().classes("text-sm text-gray-500").mark("data-age")
+                if not custom_load_data:
+                    loader.data_age = data_age
             with ui.row().classes("gap-4"):
                 # Add custom filters if provided
                 if custom_filters:
@@ -102,7 +173,213 @@ def display_model_list_page(
             row_actions=row_actions,
             enable_fullscreen=enable_fullscreen,
             columns=columns,
+            on_highlight=handle_highlight if prefetch else None,
+            on_virtual_scroll=(
+                handle_virtual_scroll if virtual_scroll and not custom_load_data else None
+            ),
         )
 
-    # load initial data
-    load_data()
+    list_loads.container = scroll_loads.container = card
+
+    # load initial data once the page is delivered
+    ui.timer(0, reload, once=True)
+
+
+class _DefaultLoader:
+    """Loads list pages through `aget_paginated` for `display_model_list_page`.
+
+    With stale-while-revalidate, an expired cached page is shown at once and
+    reloaded. With prefetching, the next page is loaded in the background
+    after a page is shown and kept in a `PrefetchBuffer` until it is asked for.
+    With virtual scrolling, "Alle" rows per page loads `ScrollWindows` as the
+    user scrolls instead of every row at once.
+    """
+
+    def __init__(
+        self,
+        repository: Any,
+        model_cls: Type,
+        table_state: ClientStorageTableState,
+        columns: Optional[List[str]],
+        stale_while_revalidate: bool,
+        prefetch: bool,
+        virtual_scroll: bool = False,
+    ):
+        self.repository = repository
+        self.model_cls = model_cls
+        self.table_state = table_state
+        # Only fetch the columns the table shows; "view" loads the full record.
+        self.list_fields = get_list_fields(model_cls, columns)
+        self.stale_while_revalidate = stale_while_revalidate
+        self.prefetched = PrefetchBuffer.from_env() if prefetch else None
+        self.windows = ScrollWindows.from_env() if virtual_scroll else None
+        self.data_age: Optional[ui.label] = None
+
+    def format_rows(self, items: List[Any]) -> List[Dict[str, Any]]:
+        return [
+            format_record(self.model_cls, item) if isinstance(item, dict) else format_row(item)
+            for item in items
+        ]
+
+    def show(
+        self,
+        rows: List[Dict[str, Any]],
+        total: int,
+        age_text: str,
+        records: Optional[List[Any]] = None,
+    ) -> None:
+        self.table_state.update_rows(rows, total, records)
+        if self.data_age is not None:
+            self.data_age.set_text(age_text)
+        server_side_paginated_table.refresh()
+
+    async def fetch(self, reader: Any, pagination: Any, filter_text: str) -> Tuple[List[Any], int]:
+        """Load a page; a repository's `Page` also tells how old its rows are."""
+        return await reader.aget_paginated(
+            pagination=pagination,
+            filter_text=filter_text,
+            columns=self.list_fields,
+        )
+
+    async def load(self) -> None:
+        pagination = self.table_state.pagination
+        filter_text = self.table_state.filter
+        if self.windows is not None and pagination.rows_per_page == 0:
+            await self.load_first_window(pagination, filter_text)
+            return
+        buffered = (
+            self.prefetched.take(_page_key(pagination, filter_text)) if self.prefetched else None
+        )
+        if buffered is not None:
+            pagination.cursor = buffered.cursor
+            pagination.total_signature = buffered.total_signature
+            self.show(
+                buffered.rows, buffered.total, describe_data_age(self.prefetched.age(buffered))
+            )
+        else:
+            reader = self.repository.stale() if self.stale_while_revalidate else self.repository
+            page = await self.fetch(reader, pagination, filter_text)
+            items, total = page
+            age, served_stale = _freshness(page)
+            self.show(
+                self.format_rows(items),
+                total,
+                describe_data_age(age, served_stale),
+                _models(items),
+            )
+            if served_stale:
+                await self.revalidate(pagination, filter_text)
+        self.prefetch_next(pagination, filter_text)
+
+    async def load_first_window(self, pagination: Any, filter_text: str) -> None:
+        """Show the first window of rows of a list shown as one scrolling list."""
+        window = self.windows.first(pagination)
+        page = await self.fetch(self.repository, window, filter_text)
+        items, total = page
+        self.windows.add(window, self.format_rows(items), total)
+        pagination.cursor = None
+        pagination.total_signature = window.total_signature
+        self.show(self.windows.rows, total, describe_data_age(_freshness(page)[0]))
+
+    async def scroll(self, table: Any, visible: Dict[str, Any]) -> None:
+        """Load the window the user is scrolling towards, if it is not loaded yet.
+
+        Args:
+            table: The table scrolled
+            visible: Quasar's virtual-scroll event: `index`, `from` and `to` of the
+                rows shown, as indexes in the table rows
+        """
+        if self.windows is None or self.table_state.pagination.rows_per_page != 0:
+            return
+        request = self.windows.next_request(visible["from"], visible["to"])
+        if request is None:
+            return
+        generation = self.windows.generation
+        self.windows.loading = True
+        try:
+            items, total = await self.fetch(self.repository, request, self.table_state.filter)
+        finally:
+            self.windows.loading = False
+        if generation != self.windows.generation:
+            return
+        shift = self.windows.add(request, self.format_rows(items), total)
+        rows = self.windows.rows
+        self.table_state.update_rows(rows, total)
+        table.rows = rows
+        table.update()
+        if shift:
+            # Rows were dropped or added before the visible ones; stay on the same rows
+            table.run_method("scrollTo", max(0, visible["index"] - shift))
+
+    async def revalidate(self, pagination: Any, filter_text: str) -> None:
+        """Reload an expired page and show it, unless the user has moved on."""
+        requested = _page_key(pagination, filter_text)
+        fresh = copy.copy(pagination)
+        fresh.total_signature = None
+        page = await self.fetch(self.repository, fresh, filter_text)
+        items, total = page
+        current = self.table_state.pagination
+        if _page_key(current, self.table_state.filter) != requested:
+            return
+        current.cursor = fresh.cursor
+        current.total_signature = fresh.total_signature
+        self.show(
+            self.format_rows(items),
+            total,
+            describe_data_age(_freshness(page)[0]),
+            _models(items),
+        )
+
+    def prefetch_next(self, pagination: Any, filter_text: str) -> None:
+        """Start loading the page after the one shown, if there is one."""
+        if self.prefetched is None or not self.prefetched.enabled:
+            return
+        if pagination.rows_per_page <= 0:
+            return
+        if pagination.page * pagination.rows_per_page >= pagination.total_rows:
+            return
+        ahead = copy.copy(pagination)
+        ahead.page += 1
+        background_tasks.create(self.load_ahead(ahead, filter_text), name="prefetch_page")
+
+    async def load_ahead(self, ahead: Any, filter_text: str) -> None:
+        """Load a page into the prefetch buffer; it is only a guess, so errors are ignored."""
+        key = _page_key(ahead, filter_text)
+        if key in self.prefetched:
+            return
+        try:
+            page = await self.fetch(self.repository, ahead, filter_text)
+        except Exception:
+            return
+        items, total = page
+        self.prefetched.put(
+            key,
+            self.format_rows(items),
+            total,
+            ahead.cursor,
+            ahead.total_signature,
+            _freshness(page)[0],
+        )
+
+
+def _models(items: List[Any]) -> Optional[List[Any]]:
+    """The items of a page if they are models, to keep with their rows; None for records."""
+    if not items or isinstance(items[0], dict):
+        return None
+    return items
+
+
+def _freshness(page: Tuple[List[Any], int]) -> Tuple[Optional[float], bool]:
+    """Age of a page's rows and whether they had expired; unknown for a plain tuple."""
+    return getattr(page, "data_age", None), getattr(page, "served_stale", False)
+
+
+def _page_key(pagination: Any, filter_text: str) -> tuple:
+    """What identifies a page request: filter, page, page size and sort order."""
+    return (
+        filter_text,
+        pagination.page,
+        pagination.rows_per_page,
+        pagination.sort_by,
+        pagination.descending,
+    )
@@ -1,13 +1,13 @@
 """Label printing functionality for potting lots."""
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import date
 
 from nicegui import ui, run
 
-from ...potting_lots.models import PottingLot
 from ...potting_lots.label_generation import LabelGenerator
+from ...potting_lots.repositories import PottingLotRepository
 from .table_state import ClientStorageTableState
 
 logger = logging.getLogger(__name__)
@@ -28,15 +28,20 @@ def _generate_labels_in_background(records) -> str:
     return label_generator.generate_pdf(records)
 
 
-def create_label_action(table_state_key: str) -> Dict[str, Any]:
-    """Create a label action for individual potting lots."""
+def create_label_action(
+    table_state_key: str, repository: Optional[PottingLotRepository] = None
+) -> Dict[str, Any]:
+    """Create a label action for individual potting lots.
+
+    The lot is the model kept with its row, or else is looked up and kept;
+    usually the lookup hits the cache, as the record is prefetched when the
+    pointer rests on the row's actions.
+    """
 
     async def handle_label(e: Dict[str, Any]) -> None:
         id_value = e.args.get("key")
         table_state = ClientStorageTableState.initialize(table_state_key)
-        record = next(
-            (PottingLot(**row) for row in table_state.rows if row["id"] == id_value), None
-        )
+        record = await table_state.load_record(id_value, repository or PottingLotRepository())
 
         if record:
             # Create a descriptive filename, this is used for the downloaded file for the user
@@ -61,18 +66,23 @@ def create_label_action(table_state_key: str) -> Dict[str, Any]:
     }
 
 
-async def print_all_labels(table_state_key: str) -> None:
+async def print_all_labels(
+    table_state_key: str, repository: Optional[PottingLotRepository] = None
+) -> None:
     """Print labels for all visible potting lots."""
     table_state = ClientStorageTableState.initialize(table_state_key)
 
-    records = [PottingLot(**visible_row) for visible_row in table_state.rows]
+    ids = list(table_state.row_ids)
 
-    if not records:
+    if not ids:
         return
 
     ui.notify("Generating labels...")
 
     try:
+        # Reuse the lots kept with their rows; resolve the others in one round trip
+        records = await table_state.load_records(ids, repository or PottingLotRepository())
+
         # Generate labels in background process
         pdf_path = await run.cpu_bound(_generate_labels_in_background, records)
 
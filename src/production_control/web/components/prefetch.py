@@ -0,0 +1,154 @@
+"""Buffer for list pages loaded ahead of the user.
+
+Operators on the inspectie and spacing pages mostly page forward one page at
+a time. After a page is shown, the list page loads the next one in the
+background and keeps the formatted rows here, so the next click is rendered
+without waiting for Dremio.
+
+Each open list page has its own buffer with a small memory budget: the
+oldest pages are dropped when it is exceeded. Pages expire after a maximum
+age and are discarded when any model was invalidated in the result cache
+after they were loaded.
+
+Settings can be tuned with environment variables:
+- VINEAPP_PREFETCH_BUDGET_KB: memory for prefetched pages per open list page; 0 disables
+  prefetching (default: 256)
+- VINEAPP_PREFETCH_MAX_AGE: seconds a prefetched page may be shown (default: 30)
+"""
+
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, List, Optional
+
+from ...data.cache import result_cache
+from ...data.engine import _env_int
+
+DEFAULT_BUDGET_KB = 256
+DEFAULT_MAX_AGE = 30
+
+
+def estimate_size(rows: List[dict]) -> int:
+    """Approximate memory used by formatted table rows, in bytes."""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        size += sum(sys.getsizeof(value) for value in row.values())
+    return size
+
+
+@dataclass
+class PrefetchedPage:
+    """Formatted rows of a page and the pagination state after loading it."""
+
+    rows: List[dict]
+    total: int
+    cursor: Optional[str]
+    total_signature: Optional[str]
+    loaded_at: float
+    generation: int
+    data_age: float = 0.0
+    size: int = 0
+
+
+class PrefetchBuffer:
+    """Least recently loaded pages first out, within a byte budget."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_BUDGET_KB * 1024,
+        max_age: float = DEFAULT_MAX_AGE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize an empty buffer.
+
+        Args:
+            max_bytes: Estimated bytes of rows kept before the oldest page is dropped
+            max_age: Seconds a page may be taken from the buffer after it was loaded
+            clock: Monotonic time source, replaceable in tests
+        """
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._clock = clock
+        self._pages: "OrderedDict[Hashable, PrefetchedPage]" = OrderedDict()
+        self.size = 0
+
+    @classmethod
+    def from_env(cls) -> "PrefetchBuffer":
+        """Create a buffer configured through VINEAPP_PREFETCH_* environment variables."""
+        return cls(
+            max_bytes=_env_int("VINEAPP_PREFETCH_BUDGET_KB", DEFAULT_BUDGET_KB) * 1024,
+            max_age=_env_int("VINEAPP_PREFETCH_MAX_AGE", DEFAULT_MAX_AGE),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._pages
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def put(
+        self,
+        key: Hashable,
+        rows: List[dict],
+        total: int,
+        cursor: Optional[str] = None,
+        total_signature: Optional[str] = None,
+        data_age: Optional[float] = None,
+    ) -> bool:
+        """Keep a loaded page, dropping the oldest pages to stay within the budget.
+
+        Returns:
+            Whether the page was kept; a page larger than the budget is not
+        """
+        page = PrefetchedPage(
+            rows=rows,
+            total=total,
+            cursor=cursor,
+            total_signature=total_signature,
+            loaded_at=self._clock(),
+            generation=result_cache.generation,
+            data_age=data_age or 0.0,
+            size=estimate_size(rows),
+        )
+        self.discard(key)
+        if page.size > self.max_bytes:
+            return False
+        while self._pages and self.size + page.size > self.max_bytes:
+            _, dropped = self._pages.popitem(last=False)
+            self.size -= dropped.size
+        self._pages[key] = page
+        self.size += page.size
+        return True
+
+    def take(self, key: Hashable) -> Optional[PrefetchedPage]:
+        """Remove and return a page if it is still current enough to show."""
+        page = self.discard(key)
+        if page is None:
+            return None
+        if self._clock() - page.loaded_at > self.max_age:
+            return None
+        if page.generation != result_cache.generation:
+            return None
+        return page
+
+    def age(self, page: PrefetchedPage) -> float:
+        """Seconds since the rows of a buffered page were read."""
+        return page.data_age + self._clock() - page.loaded_at
+
+    def discard(self, key: Hashable) -> Optional[PrefetchedPage]:
+        """Remove a page, returning it if it was buffered."""
+        page = self._pages.pop(key, None)
+        if page is not None:
+            self.size -= page.size
+        return page
+
+    def clear(self) -> None:
+        """Drop all pages."""
+        self._pages.clear()
+        self.size = 0
@@ -0,0 +1,132 @@
+"""Server-side store of the rows shown in list tables.
+
+Table state used to keep the formatted rows of the page shown in
+`app.storage.client`, a copy per open browser tab, rewritten on every
+update. Label printing then turned those display strings back into models.
+
+Rows are kept here instead, once per table and primary key, shared by all
+clients showing them; client storage only holds the ids of the rows shown
+(see `ClientStorageTableState`). Next to the formatted row, the typed model
+it was formatted from is kept when the loader had one, so actions on a row
+can use it without parsing the row or querying again. List pages read only
+the columns they show, so their rows start without a model; label printing
+loads the models it needs once and keeps them with their rows
+(see `ClientStorageTableState.load_records`). View and edit dialogs read the
+record from the repository, as they show every field and edit the current
+values.
+
+The store holds at most `max_rows` rows; the least recently shown rows are
+dropped first. A table state whose rows were dropped shows fewer rows until
+it is loaded again.
+
+Settings can be tuned with environment variables:
+- VINEAPP_ROW_STORE_ROWS: rows kept for all tables together (default: 10000)
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from ...data.engine import _env_int
+
+DEFAULT_MAX_ROWS = 10000
+
+
+@dataclass
+class _Entry:
+    row: Dict[str, Any]
+    record: Any = None
+
+
+class RowStore:
+    """Formatted rows and their models per table and primary key, evicted least recently used."""
+
+    def __init__(self, max_rows: int = DEFAULT_MAX_ROWS):
+        """Initialize an empty store.
+
+        Args:
+            max_rows: Rows kept for all tables together
+        """
+        self.max_rows = max(1, max_rows)
+        self._entries: "OrderedDict[Tuple[str, Hashable], _Entry]" = OrderedDict()
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RowStore":
+        """Create a store configured through VINEAPP_ROW_STORE_ROWS."""
+        return cls(max_rows=_env_int("VINEAPP_ROW_STORE_ROWS", DEFAULT_MAX_ROWS))
+
+    def put(
+        self,
+        table: str,
+        rows: Sequence[Dict[str, Any]],
+        records: Optional[Sequence[Any]] = None,
+    ) -> List[Hashable]:
+        """Keep the rows of a table, replacing rows with the same id.
+
+        Args:
+            table: Table the rows are shown in, e.g. its table state key
+            rows: Formatted rows, identified by their "id"
+            records: Models the rows were formatted from, in the same order
+
+        Returns:
+            The ids of the rows, in order
+        """
+        ids = [row["id"] for row in rows]
+        with self._lock:
+            for index, (id, row) in enumerate(zip(ids, rows)):
+                key = (table, id)
+                record = records[index] if records is not None else None
+                entry = self._entries.get(key)
+                if record is None and entry is not None and entry.row == row:
+                    # Same row shown again; keep the model loaded with it
+                    record = entry.record
+                self._entries[key] = _Entry(row, record)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_rows:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+        return ids
+
+    def rows(self, table: str, ids: Sequence[Hashable]) -> List[Dict[str, Any]]:
+        """The rows of a table with the given ids that are still kept, in order."""
+        rows = []
+        with self._lock:
+            for id in ids:
+                entry = self._entries.get((table, id))
+                if entry is not None:
+                    self._entries.move_to_end((table, id))
+                    rows.append(entry.row)
+        return rows
+
+    def keep(self, table: str, records: Dict[Hashable, Any]) -> None:
+        """Keep models, by id, with the rows of a table they belong to that are still kept."""
+        with self._lock:
+            for id, record in records.items():
+                entry = self._entries.get((table, id))
+                if entry is not None:
+                    entry.record = record
+
+    def record(self, table: str, id: Hashable) -> Any:
+        """The model a row of a table was formatted from, or None when it was not kept."""
+        with self._lock:
+            entry = self._entries.get((table, id))
+            return entry.record if entry is not None else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Rows kept and rows dropped to stay within the maximum."""
+        with self._lock:
+            return {"rows": len(self._entries), "max_rows": self.max_rows, "evicted": self.evicted}
+
+    def clear(self) -> None:
+        """Forget all rows."""
+        with self._lock:
+            self._entries.clear()
+
+
+row_store = RowStore.from_env()
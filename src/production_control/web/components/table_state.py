@@ -1,11 +1,16 @@
-"""Table state management."""
+"""Table state management.
+
+Client storage keeps pagination, filters and the ids of the rows shown; the
+rows themselves are kept once for all clients in the `row_store`.
+"""
 
 from dataclasses import dataclass, field
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional, Sequence
 
 from nicegui import app
 
 from ...data import Pagination
+from .row_store import row_store
 
 
 @dataclass
@@ -15,7 +20,7 @@ class ClientStorageTableState:
     pagination: Pagination
     filter: str = ""
     warning_filter: bool = False
-    rows: List[Any] = field(default_factory=list)
+    row_ids: List[Any] = field(default_factory=list)
     storage_key: str = field(default="")
 
     @classmethod
@@ -26,18 +31,52 @@ class ClientStorageTableState:
                 "pagination": Pagination(),
                 "filter": "",
                 "warning_filter": False,
-                "rows": [],
+                "row_ids": [],
             }
         return cls(
             pagination=app.storage.client[storage_key]["pagination"],
             filter=app.storage.client[storage_key]["filter"],
             warning_filter=app.storage.client[storage_key]["warning_filter"],
-            rows=app.storage.client[storage_key]["rows"],
+            row_ids=app.storage.client[storage_key]["row_ids"],
             storage_key=storage_key,
         )
 
+    @property
+    def rows(self) -> List[Dict[str, Any]]:
+        """The formatted rows shown, from the row store."""
+        return row_store.rows(self.storage_key, self.row_ids)
+
+    def record(self, id: Any) -> Optional[Any]:
+        """The model a shown row was formatted from, if it was kept."""
+        return row_store.record(self.storage_key, id) if id in self.row_ids else None
+
+    async def load_record(self, id: Any, repository: Any) -> Optional[Any]:
+        """The model of a shown row: the kept one, or else loaded and kept with the row."""
+        if id not in self.row_ids:
+            return None
+        record = self.record(id)
+        if record is None:
+            record = await repository.aget_by_id(id)
+            if record is not None:
+                row_store.keep(self.storage_key, {id: record})
+        return record
+
+    async def load_records(self, ids: Sequence[Any], repository: Any) -> List[Any]:
+        """Models of rows, in order: the kept ones, the others loaded in one round trip and kept."""
+        kept = {id: self.record(id) for id in ids}
+        missing = [id for id, record in kept.items() if record is None]
+        if missing:
+            loaded = await repository.aget_by_ids(missing)
+            row_store.keep(self.storage_key, loaded)
+            kept.update(loaded)
+        return [record for record in kept.values() if record is not None]
+
     def update_from_request(self, event: Dict[str, Any]) -> None:
-        """Update state from table request event."""
+        """Update state from table request event.
+
+        Table requests only change paging and sorting, so the total loaded for
+        the current filters stays valid and the repository need not recount.
+        """
         self.pagination.update(
             event["pagination"] if isinstance(event, dict) else event.args["pagination"]
         )
@@ -47,17 +86,27 @@ class ClientStorageTableState:
         """Update filter and reset to first page."""
         self.filter = text
         self.pagination.page = 1
+        self.pagination.total_signature = None
         self._save()
 
     def update_warning_filter(self, enabled: bool) -> None:
         """Update warning filter and reset to first page."""
         self.warning_filter = enabled
         self.pagination.page = 1
+        self.pagination.total_signature = None
         self._save()
 
-    def update_rows(self, rows: List[Any], total: int) -> None:
-        """Update rows and total count."""
-        self.rows = rows
+    def update_rows(
+        self, rows: List[Any], total: int, records: Optional[Sequence[Any]] = None
+    ) -> None:
+        """Update rows and total count.
+
+        Args:
+            rows: Formatted rows shown
+            total: Total number of rows for the current filters
+            records: Models the rows were formatted from, kept for row actions
+        """
+        self.row_ids = row_store.put(self.storage_key, rows, records)
         self.pagination.total_rows = total
         self._save()
 
@@ -67,5 +116,5 @@ class ClientStorageTableState:
             "pagination": self.pagination,
             "filter": self.filter,
             "warning_filter": self.warning_filter,
-            "rows": self.rows,
+            "row_ids": self.row_ids,
         }
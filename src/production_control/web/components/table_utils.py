@@ -2,11 +2,12 @@
 
 from datetime import date
 from decimal import Decimal
-from typing import Dict, List, Any, Type, Optional, get_args, get_origin
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Dict, List, Any, Tuple, Type, Optional, get_args, get_origin
 from sqlmodel import SQLModel
 from pydantic_core._pydantic_core import PydanticUndefinedType
 
-
 DATE_FORMAT = "%gw%V-%u"
 
 
@@ -130,6 +131,35 @@ def get_table_columns(
     return result_columns
 
 
+def get_list_fields(model_class: Type[SQLModel], columns: Optional[List[str]] = None) -> List[str]:
+    """Names of the fields a list page has to fetch to render its rows.
+
+    These are the primary key and the fields get_table_columns shows, plus
+    hidden fields marked with sa_column_kwargs.info.ui_fetch because the
+    rows need them otherwise (e.g. for warning_emoji).
+
+    Args:
+        model_class: The SQLModel class shown in the table
+        columns: Optional list of field names shown, as for get_table_columns
+
+    Returns:
+        List of field names in model order
+    """
+    primary_key_field, _ = _row_layout(model_class)
+    fields = []
+    for field_name, field in model_class.model_fields.items():
+        sa_kwargs = getattr(field, "sa_column_kwargs", None)
+        if isinstance(sa_kwargs, (PydanticUndefinedType, type(None))):
+            sa_kwargs = {}
+        field_info = sa_kwargs.get("info", {})
+
+        if field_name == primary_key_field or field_info.get("ui_fetch"):
+            fields.append(field_name)
+        elif not field_info.get("ui_hidden") and (columns is None or field_name in columns):
+            fields.append(field_name)
+    return fields
+
+
 def format_row(model: SQLModel) -> Dict[str, Any]:
     """Format a model instance as a table row.
 
@@ -141,25 +171,32 @@ def format_row(model: SQLModel) -> Dict[str, Any]:
     Returns:
         Dictionary with field values for use in ui.table rows
     """
+    record = {field_name: getattr(model, field_name) for field_name in model.__class__.model_fields}
+    if hasattr(model, "warning_emoji"):
+        record["warning_emoji"] = model.warning_emoji
+    return format_record(model.__class__, record)
+
+
+@lru_cache(maxsize=None)
+def _row_layout(model_class: Type[SQLModel]) -> Tuple[str, Tuple[Tuple[str, bool], ...]]:
+    """Primary key field and (field name, is date) of the visible fields of a model class.
+
+    Derived from the field metadata once per class instead of once per row.
+    """
     # Find primary key field
     primary_key_field = next(
         (
             name
-            for name, field in model.__class__.model_fields.items()
+            for name, field in model_class.model_fields.items()
             if getattr(field, "primary_key", False)
         ),
         None,
     )
     if not primary_key_field:
-        raise ValueError(f"No primary key field found in model {model.__class__.__name__}")
-
-    row = {"id": getattr(model, primary_key_field)}  # Use primary key for row key
-
-    # Add warning emoji if model has it
-    if hasattr(model, "warning_emoji"):
-        row["warning_emoji"] = model.warning_emoji
+        raise ValueError(f"No primary key field found in model {model_class.__name__}")
 
-    for field_name, field in model.__class__.model_fields.items():
+    fields = []
+    for field_name, field in model_class.model_fields.items():
         # Get UI metadata from SQLAlchemy column info
         sa_kwargs = getattr(field, "sa_column_kwargs", None)
         if isinstance(sa_kwargs, (PydanticUndefinedType, type(None))):
@@ -170,9 +207,38 @@ def format_row(model: SQLModel) -> Dict[str, Any]:
         if field_info.get("ui_hidden"):
             continue
 
+        fields.append((field_name, is_date_field(field.annotation)))
+    return primary_key_field, tuple(fields)
+
+
+def format_record(model_class: Type[SQLModel], record: Dict[str, Any]) -> Dict[str, Any]:
+    """Format a dictionary of field values as a table row for a model class.
+
+    Like format_row, for records read without creating model instances,
+    e.g. with DremioRepository.fetch_records. Fields missing from the record
+    are shown as empty. A warning_emoji property is evaluated on the record.
+
+    Args:
+        model_class: The model class the record was read for
+        record: Field values keyed on attribute name
+
+    Returns:
+        Dictionary with field values for use in ui.table rows
+    """
+    primary_key_field, fields = _row_layout(model_class)
+    row = {"id": record.get(primary_key_field)}  # Use primary key for row key
+
+    # Add warning emoji if model has it
+    warning_emoji = getattr(model_class, "warning_emoji", None)
+    if "warning_emoji" in record:
+        row["warning_emoji"] = record["warning_emoji"]
+    elif isinstance(warning_emoji, property):
+        row["warning_emoji"] = warning_emoji.fget(SimpleNamespace(**record))
+
+    for field_name, is_date in fields:
         # Add field value to row, formatting dates using our custom format
-        value = getattr(model, field_name)
-        if is_date_field(field.annotation) and value:
+        value = record.get(field_name)
+        if is_date and value:
             row[field_name] = format_date(value)
             row[f"{field_name}_raw"] = value
         else:
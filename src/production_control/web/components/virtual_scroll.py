@@ -0,0 +1,145 @@
+"""Rows of a list page loaded in windows as the user scrolls.
+
+Showing all rows of a list ("Alle" rows per page) used to load the entire
+view with one query, send it to the browser in one message and keep every
+row in the table state. In virtual-scroll mode the table is one scrolling
+list instead, of which only windows of `window_size` rows are loaded: the
+first window when the list is opened, the next one when the user scrolls
+near the end of what is loaded. Each window is fetched by keyset, seeking
+past the last row of the window before it.
+
+At most `max_windows` windows are kept. Scrolling on drops the window
+furthest back; scrolling back loads it again, seeking before the first row
+kept. Server memory and the rows sent per update stay bounded however large
+the view is.
+
+Settings can be tuned with environment variables:
+- VINEAPP_SCROLL_WINDOW: rows loaded per window (default: 100)
+- VINEAPP_SCROLL_MAX_WINDOWS: windows kept per list page (default: 5)
+"""
+
+import copy
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from ...data import Pagination
+from ...data.engine import _env_int
+
+DEFAULT_WINDOW_SIZE = 100
+DEFAULT_MAX_WINDOWS = 5
+
+
+@dataclass
+class _Window:
+    pagination: Pagination
+    rows: List[Dict[str, Any]]
+
+
+class ScrollWindows:
+    """The windows of rows kept for one list page, in list order."""
+
+    def __init__(
+        self, window_size: int = DEFAULT_WINDOW_SIZE, max_windows: int = DEFAULT_MAX_WINDOWS
+    ):
+        """Initialize without windows.
+
+        Args:
+            window_size: Rows loaded per window
+            max_windows: Windows kept before the one furthest away is dropped
+        """
+        self.window_size = max(1, window_size)
+        self.max_windows = max(2, max_windows)
+        self._windows: Deque[_Window] = deque()
+        self.total = 0
+        # Whether a window is being loaded, so scroll events don't load it twice
+        self.loading = False
+        # Incremented when starting over, to discard windows requested before
+        self.generation = 0
+
+    @classmethod
+    def from_env(cls) -> "ScrollWindows":
+        """Create windows configured through VINEAPP_SCROLL_* environment variables."""
+        return cls(
+            window_size=_env_int("VINEAPP_SCROLL_WINDOW", DEFAULT_WINDOW_SIZE),
+            max_windows=_env_int("VINEAPP_SCROLL_MAX_WINDOWS", DEFAULT_MAX_WINDOWS),
+        )
+
+    @property
+    def rows(self) -> List[Dict[str, Any]]:
+        """The kept rows, in list order."""
+        return [row for window in self._windows for row in window.rows]
+
+    def first(self, pagination: Pagination) -> Pagination:
+        """Start over: forget all windows and return the pagination of the first one.
+
+        The sort order and the counted total of `pagination` carry over.
+        """
+        self._windows.clear()
+        self.loading = False
+        self.generation += 1
+        return Pagination(
+            page=1,
+            rows_per_page=self.window_size,
+            total_rows=pagination.total_rows,
+            sort_by=pagination.sort_by,
+            descending=pagination.descending,
+            total_signature=pagination.total_signature,
+        )
+
+    def next_request(self, first_visible: int, last_visible: int) -> Optional[Pagination]:
+        """Pagination of the window to load for the visible kept rows, if any.
+
+        A window is loaded when fewer than half a window of kept rows is left
+        beyond the visible ones: the next one when scrolling towards the end,
+        the previous (dropped) one when scrolling back to the start.
+
+        Args:
+            first_visible: Index in the kept rows of the first row shown
+            last_visible: Index in the kept rows of the last row shown
+        """
+        if not self._windows or self.loading:
+            return None
+        margin = self.window_size // 2
+        kept = sum(len(window.rows) for window in self._windows)
+        tail = self._windows[-1].pagination
+        head = self._windows[0].pagination
+        if last_visible >= kept - margin and tail.page * self.window_size < self.total:
+            request = copy.copy(tail)
+            request.page += 1
+            return request
+        if first_visible < margin and head.page > 1:
+            request = copy.copy(head)
+            request.page -= 1
+            return request
+        return None
+
+    def add(self, pagination: Pagination, rows: List[Dict[str, Any]], total: int) -> int:
+        """Keep a loaded window, dropping the window furthest away when over the maximum.
+
+        Args:
+            pagination: Pagination the window was loaded with, holding its keyset cursor
+            rows: Formatted rows of the window
+            total: Total number of rows in the list
+
+        Returns:
+            How many places the rows kept before moved towards the start of
+            the kept rows; negative when rows were added before them. Scroll
+            positions must move as much to stay on the same rows.
+        """
+        self.total = total
+        window = _Window(pagination, rows)
+        shift = 0
+        if self._windows and pagination.page == self._windows[-1].pagination.page + 1:
+            self._windows.append(window)
+            while len(self._windows) > self.max_windows:
+                shift += len(self._windows.popleft().rows)
+        elif self._windows and pagination.page == self._windows[0].pagination.page - 1:
+            self._windows.appendleft(window)
+            shift -= len(rows)
+            while len(self._windows) > self.max_windows:
+                self._windows.pop()
+        else:
+            self._windows.clear()
+            self._windows.append(window)
+        return shift
@@ -17,7 +17,6 @@ from ..components.model_detail_page import (
 from ..components.model_list_page import display_model_list_page
 from ..components.table_state import ClientStorageTableState
 
-
 router = APIRouter(prefix="/bulb-picking")
 label_generator = LabelGenerator()
 table_state_key = "bulb_picklist_table"
@@ -33,9 +32,8 @@ def create_label_action() -> Dict[str, Any]:
     async def handle_label(e: Dict[str, Any]) -> None:
         id_value = e.args.get("key")
         table_state = ClientStorageTableState.initialize(table_state_key)
-        record = next(
-            (BulbPickList(**row) for row in table_state.rows if row["id"] == id_value), None
-        )
+        # The model kept with the row, or else the (usually prefetched) record
+        record = await table_state.load_record(id_value, BulbPickListRepository())
 
         if record:
             # Create a descriptive filename, this is used for the downloaded file for the user
@@ -59,14 +57,17 @@ def create_label_action() -> Dict[str, Any]:
 
 async def handle_print_all() -> None:
     table_state = ClientStorageTableState.initialize(table_state_key)
-    records = [BulbPickList(**visible_row) for visible_row in table_state.rows]
+    ids = list(table_state.row_ids)
 
-    if not records:
+    if not ids:
         return
 
     ui.notify("Generating labels...")
 
     try:
+        # Reuse the records kept with their rows; resolve the others in one round trip
+        records = await table_state.load_records(ids, BulbPickListRepository())
+
         # Generate labels in background process
         pdf_path = await run.cpu_bound(generate_labels, records)
 
@@ -10,9 +10,11 @@ from ...inspectie.repositories import InspectieRepository
 from ...inspectie.models import InspectieRonde
 from ...inspectie.commands import UpdateAfwijkingCommand
 from ...inspectie.changes import STORAGE_KEY, apply_delta, parse_date as _parse_date
+from ...data.repository import DremioUnavailableError, QueryTimeoutError
 from ..components import frame
 from ..components.model_card import display_model_card
 from ..components.model_list_page import display_model_list_page
+from ..components.message import show_error
 from ..components.model_detail_page import create_model_view_action, create_scan_action
 from ..components.styles import add_print_styles
 from ..components.table_utils import format_date
@@ -168,22 +170,9 @@ def toggle_filter() -> None:
 
 def create_enhanced_repository() -> InspectieRepository:
     """Create repository with current filter state applied."""
-    repository = InspectieRepository()
     filter_state = get_filter_state()
-
-    # Apply default filter if set to next_two_weeks
-    if filter_state == "next_two_weeks":
-        # Monkey patch the get_paginated method to apply default filter
-        original_get_paginated = repository.get_paginated
-
-        def get_paginated_with_filter(*args, **kwargs):
-            if "default_filter" not in kwargs:
-                kwargs["default_filter"] = "next_two_weeks"
-            return original_get_paginated(*args, **kwargs)
-
-        repository.get_paginated = get_paginated_with_filter
-
-    return repository
+    default_filter = "next_two_weeks" if filter_state == "next_two_weeks" else None
+    return InspectieRepository(default_filter=default_filter)
 
 
 def show_pending_changes_dialog(changes_state=None) -> None:
@@ -430,6 +419,191 @@ def create_afwijking_actions(repository: InspectieRepository, changes_state=None
     }
 
 
+def display_compact_view(
+    repository: InspectieRepository,
+    changes_state: Any,
+    row_actions: Dict[str, Dict[str, Any]],
+) -> None:
+    """Show the inspectierondes as cards with their own pagination (compact mode)."""
+    from ..components.table_state import ClientStorageTableState
+    from ..components.table_utils import format_row
+
+    table_state = ClientStorageTableState.initialize("inspectie_table")
+
+    async def load_data():
+        pagination = table_state.pagination
+        filter_text = table_state.filter
+        try:
+            items, total = await repository.aget_paginated(
+                pagination=pagination,
+                filter_text=filter_text,
+            )
+        except QueryTimeoutError:
+            show_error("Het laden van de gegevens duurt te lang, probeer het opnieuw")
+            return
+        except DremioUnavailableError:
+            show_error("De database is niet bereikbaar, probeer het later opnieuw")
+            return
+        table_state.update_rows([format_row(item) for item in items], total, items)
+        render_cards.refresh()
+        render_pagination.refresh()
+
+    async def change_rows_per_page(rows_per_page: int) -> None:
+        table_state.pagination.rows_per_page = rows_per_page
+        table_state.pagination.page = 1
+        await load_data()
+
+    async def go_to_page(page: int) -> None:
+        table_state.pagination.page = page
+        await load_data()
+
+    @ui.refreshable
+    def render_cards():
+        storage = get_storage()
+        changes = storage.get(STORAGE_KEY, {})
+
+        with ui.row().classes("w-full gap-4 flex-wrap"):
+            for item in table_state.rows:
+                code = item.get("id")
+                change_data = changes.get(code)
+                valid_change = isinstance(change_data, dict) and "new_afwijking" in change_data
+
+                # Check if item is manually marked as checked (or auto-checked by afwijking)
+                manually_checked = storage.get("inspectie_checked", {}).get(code, False)
+                is_checked = manually_checked
+
+                card_classes = "w-full sm:w-80"
+                if valid_change:
+                    card_classes += " border-l-4"
+
+                with (
+                    ui.card()
+                    .classes(card_classes)
+                    .style("border-left-color: #f39c21" if valid_change else None)
+                ):
+                    with ui.row().classes("w-full justify-between items-center"):
+                        ui.label(item.get("product_naam", "")).classes("text-lg font-bold")
+                        ui.label(item.get("datum_afleveren_plan", "")).classes(
+                            "text-sm text-gray-600"
+                        )
+
+                    with ui.row().classes("w-full gap-2 mt-2"):
+                        ui.label("Baan:").classes("text-sm font-semibold")
+                        ui.label(item.get("baan_samenvatting", "")).classes("text-sm")
+
+                    with ui.row().classes("w-full gap-2"):
+                        ui.label("Afwijking:").classes("text-sm font-semibold")
+                        current_afwijking = item.get("afwijking_afleveren") or 0
+
+                        if valid_change:
+                            new_value = change_data["new_afwijking"]
+                            ui.label(f"{current_afwijking} → {new_value}").classes(
+                                "text-base font-bold text-accent"
+                            )
+                        else:
+                            ui.label(str(current_afwijking)).classes("text-sm")
+
+                    # Action buttons
+                    with ui.row().classes("w-full justify-end gap-2 mt-2"):
+                        # Checkmark button
+                        def toggle_check(_e, code=code):
+                            storage = get_storage()
+                            if "inspectie_checked" not in storage:
+                                storage["inspectie_checked"] = {}
+
+                            current_state = storage["inspectie_checked"].get(code, False)
+                            storage["inspectie_checked"][code] = not current_state
+                            render_cards.refresh()
+
+                        ui.button(
+                            icon="check" if is_checked else "check_box_outline_blank",
+                            on_click=toggle_check,
+                        ).props("dense flat color=primary")
+                        ui.button(
+                            icon="add",
+                            on_click=lambda _e, code=item.get("id"), row=item: row_actions[
+                                "plus_one"
+                            ]["handler"](type("Event", (), {"args": {"key": code, "row": row}})()),
+                        ).props("dense flat color=primary").tooltip("+1")
+
+                        ui.button(
+                            icon="remove",
+                            on_click=lambda _e, code=item.get("id"), row=item: row_actions[
+                                "minus_one"
+                            ]["handler"](type("Event", (), {"args": {"key": code, "row": row}})()),
+                        ).props("dense flat color=primary").tooltip("-1")
+
+                        ui.button(
+                            icon="visibility",
+                            on_click=lambda _e, code=item.get("id"), row=item: row_actions["view"][
+                                "handler"
+                            ](type("Event", (), {"args": {"key": code, "row": row}})()),
+                        ).props("dense flat color=primary").tooltip("Details")
+
+    @ui.refreshable
+    def render_pagination():
+        # Calculate total pages (handle 0 = show all)
+        rows_per_page = table_state.pagination.rows_per_page
+        if rows_per_page == 0:
+            total_pages = 1  # All rows on one page
+        else:
+            total_pages = (table_state.pagination.total_rows + rows_per_page - 1) // rows_per_page
+
+        # Show pagination controls
+        with ui.row().classes("w-full justify-between items-center mt-4"):
+            # Page size selector on left
+            with ui.row().classes("items-center gap-2"):
+                ui.label("Rijen per pagina:")
+                # Create options with labels - show "Alle" instead of 0
+                options_dict = {
+                    10: "10",
+                    25: "25",
+                    50: "50",
+                    0: f"Alle ({table_state.pagination.total_rows})",
+                }
+                ui.select(
+                    options=options_dict,
+                    value=table_state.pagination.rows_per_page,
+                    on_change=lambda e: change_rows_per_page(e.value),
+                ).props("dense options-dense").classes("w-32").bind_value(
+                    table_state.pagination, "rows_per_page"
+                )
+
+            # Page navigation on right (only if more than one page)
+            if total_pages > 1:
+                with ui.row().classes("items-center gap-2"):
+                    # Previous button
+                    ui.button(
+                        icon="chevron_left",
+                        on_click=lambda: go_to_page(table_state.pagination.page - 1),
+                    ).props("flat round").bind_enabled_from(
+                        table_state.pagination, "page", backward=lambda p: p > 1
+                    )
+
+                    # Page info
+                    ui.label().bind_text_from(
+                        table_state.pagination,
+                        "page",
+                        backward=lambda p: f"Pagina {p} van {total_pages}",
+                    )
+
+                    # Next button
+                    ui.button(
+                        icon="chevron_right",
+                        on_click=lambda: go_to_page(table_state.pagination.page + 1),
+                    ).props("flat round").bind_enabled_from(
+                        table_state.pagination, "page", backward=lambda p: p < total_pages
+                    )
+
+    # Set up refresh callback so changes trigger card refresh
+    changes_state.set_refresh_callback(render_cards.refresh)
+
+    render_cards()
+    render_pagination()
+    # Load the cards once the page is delivered, off the event loop
+    ui.timer(0, load_data, once=True)
+
+
 @router.page("/")
 def inspectie_page() -> None:
     """Render the inspectieronde overview page."""
@@ -525,194 +699,7 @@ def inspectie_page() -> None:
 
         if compact_view:
             # Card view for compact mode
-            from ..components.table_state import ClientStorageTableState
-            from ..components.table_utils import format_row
-
-            table_state = ClientStorageTableState.initialize("inspectie_table")
-
-            def load_data():
-                pagination = table_state.pagination
-                filter_text = table_state.filter
-                items, total = repository.get_paginated(
-                    pagination=pagination,
-                    filter_text=filter_text,
-                )
-                table_state.update_rows([format_row(item) for item in items], total)
-                render_cards.refresh()
-                render_pagination.refresh()
-
-            @ui.refreshable
-            def render_cards():
-                storage = get_storage()
-                changes = storage.get(STORAGE_KEY, {})
-
-                with ui.row().classes("w-full gap-4 flex-wrap"):
-                    for item in table_state.rows:
-                        code = item.get("id")
-                        change_data = changes.get(code)
-                        valid_change = (
-                            isinstance(change_data, dict) and "new_afwijking" in change_data
-                        )
-
-                        # Check if item is manually marked as checked (or auto-checked by afwijking)
-                        manually_checked = storage.get("inspectie_checked", {}).get(code, False)
-                        is_checked = manually_checked
-
-                        card_classes = "w-full sm:w-80"
-                        if valid_change:
-                            card_classes += " border-l-4"
-
-                        with (
-                            ui.card()
-                            .classes(card_classes)
-                            .style("border-left-color: #f39c21" if valid_change else None)
-                        ):
-                            with ui.row().classes("w-full justify-between items-center"):
-                                ui.label(item.get("product_naam", "")).classes("text-lg font-bold")
-                                ui.label(item.get("datum_afleveren_plan", "")).classes(
-                                    "text-sm text-gray-600"
-                                )
-
-                            with ui.row().classes("w-full gap-2 mt-2"):
-                                ui.label("Baan:").classes("text-sm font-semibold")
-                                ui.label(item.get("baan_samenvatting", "")).classes("text-sm")
-
-                            with ui.row().classes("w-full gap-2"):
-                                ui.label("Afwijking:").classes("text-sm font-semibold")
-                                current_afwijking = item.get("afwijking_afleveren") or 0
-
-                                if valid_change:
-                                    new_value = change_data["new_afwijking"]
-                                    ui.label(f"{current_afwijking} → {new_value}").classes(
-                                        "text-base font-bold text-accent"
-                                    )
-                                else:
-                                    ui.label(str(current_afwijking)).classes("text-sm")
-
-                            # Action buttons
-                            with ui.row().classes("w-full justify-end gap-2 mt-2"):
-                                # Checkmark button
-                                def toggle_check(_e, code=code):
-                                    storage = get_storage()
-                                    if "inspectie_checked" not in storage:
-                                        storage["inspectie_checked"] = {}
-
-                                    current_state = storage["inspectie_checked"].get(code, False)
-                                    storage["inspectie_checked"][code] = not current_state
-                                    render_cards.refresh()
-
-                                ui.button(
-                                    icon="check" if is_checked else "check_box_outline_blank",
-                                    on_click=toggle_check,
-                                ).props("dense flat color=primary")
-                                ui.button(
-                                    icon="add",
-                                    on_click=lambda _e, code=item.get("id"), row=item: row_actions[
-                                        "plus_one"
-                                    ]["handler"](
-                                        type("Event", (), {"args": {"key": code, "row": row}})()
-                                    ),
-                                ).props("dense flat color=primary").tooltip("+1")
-
-                                ui.button(
-                                    icon="remove",
-                                    on_click=lambda _e, code=item.get("id"), row=item: row_actions[
-                                        "minus_one"
-                                    ]["handler"](
-                                        type("Event", (), {"args": {"key": code, "row": row}})()
-                                    ),
-                                ).props("dense flat color=primary").tooltip("-1")
-
-                                ui.button(
-                                    icon="visibility",
-                                    on_click=lambda _e, code=item.get("id"), row=item: row_actions[
-                                        "view"
-                                    ]["handler"](
-                                        type("Event", (), {"args": {"key": code, "row": row}})()
-                                    ),
-                                ).props("dense flat color=primary").tooltip("Details")
-
-            @ui.refreshable
-            def render_pagination():
-                # Calculate total pages (handle 0 = show all)
-                rows_per_page = table_state.pagination.rows_per_page
-                if rows_per_page == 0:
-                    total_pages = 1  # All rows on one page
-                else:
-                    total_pages = (
-                        table_state.pagination.total_rows + rows_per_page - 1
-                    ) // rows_per_page
-
-                # Show pagination controls
-                with ui.row().classes("w-full justify-between items-center mt-4"):
-                    # Page size selector on left
-                    with ui.row().classes("items-center gap-2"):
-                        ui.label("Rijen per pagina:")
-                        # Create options with labels - show "Alle" instead of 0
-                        options_dict = {
-                            10: "10",
-                            25: "25",
-                            50: "50",
-                            0: f"Alle ({table_state.pagination.total_rows})",
-                        }
-                        ui.select(
-                            options=options_dict,
-                            value=table_state.pagination.rows_per_page,
-                            on_change=lambda e: (
-                                setattr(table_state.pagination, "rows_per_page", e.value),
-                                setattr(table_state.pagination, "page", 1),
-                                load_data(),
-                            ),
-                        ).props("dense options-dense").classes("w-32").bind_value(
-                            table_state.pagination, "rows_per_page"
-                        )
-
-                    # Page navigation on right (only if more than one page)
-                    if total_pages > 1:
-                        with ui.row().classes("items-center gap-2"):
-                            # Previous button
-                            ui.button(
-                                icon="chevron_left",
-                                on_click=lambda: (
-                                    setattr(
-                                        table_state.pagination,
-                                        "page",
-                                        table_state.pagination.page - 1,
-                                    ),
-                                    load_data(),
-                                ),
-                            ).props("flat round").bind_enabled_from(
-                                table_state.pagination, "page", backward=lambda p: p > 1
-                            )
-
-                            # Page info
-                            ui.label().bind_text_from(
-                                table_state.pagination,
-                                "page",
-                                backward=lambda p: f"Pagina {p} van {total_pages}",
-                            )
-
-                            # Next button
-                            ui.button(
-                                icon="chevron_right",
-                                on_click=lambda: (
-                                    setattr(
-                                        table_state.pagination,
-                                        "page",
-                                        table_state.pagination.page + 1,
-                                    ),
-                                    load_data(),
-                                ),
-                            ).props("flat round").bind_enabled_from(
-                                table_state.pagination, "page", backward=lambda p: p < total_pages
-                            )
-
-            # Set up refresh callback so changes trigger card refresh
-            changes_state.set_refresh_callback(render_cards.refresh)
-
-            render_cards()
-            render_pagination()
-            load_data()
+            display_compact_view(repository, changes_state, row_actions)
         else:
             # Table view for full mode
             display_model_list_page(
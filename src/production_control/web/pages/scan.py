@@ -1,5 +1,6 @@
 """Mobile-optimized barcode scanning page for viewing batch information."""
 
+import asyncio
 import logging
 
 from nicegui import APIRouter, ui
@@ -180,11 +181,14 @@ def render_klant_afleverdatum_card(lot: PottingLot, inspectie: InspectieRonde |
 
 
 @router.page("/view/{id}")
-def view_batch(id: int) -> None:
+async def view_batch(id: int) -> None:
     """Mobile-optimized view of batch information."""
     try:
-        lot = get_repository().get_by_id(id)
-        inspectie = InspectieRepository().get_by_id(str(id)) if lot is not None else None
+        # The lot and its inspectie are independent lookups; run them side by side
+        lot, inspectie = await asyncio.gather(
+            get_repository().aget_by_id(id),
+            InspectieRepository().aget_by_id(str(id)),
+        )
 
         if lot is None:
             with frame("Batch Not Found"):
@@ -5,6 +5,7 @@ from typing import Dict, Any, Callable
 from nicegui import APIRouter, ui
 from pydantic import ValidationError
 
+from ...data.repository import DremioUnavailableError, QueryTimeoutError
 from ...spacing.repositories import SpacingRepository
 from ...spacing.models import WijderzetRegistratie
 from ...spacing.commands import CorrectSpacingRecord
@@ -20,7 +21,6 @@ from ..components.model_detail_page import (
 )
 from ..components.model_list_page import display_model_list_page
 
-
 router = APIRouter(prefix="/spacing")
 
 
@@ -65,10 +65,17 @@ def display_spacing_record(record: WijderzetRegistratie) -> None:
 
 def create_edit_action(repository: SpacingRepository) -> Dict[str, Any]:
 
-    def handle_edit(e: Dict[str, Any]) -> None:
+    async def handle_edit(e: Dict[str, Any]) -> None:
         """Handle edit button click."""
         partij_code = e.args.get("key")
-        record = repository.get_by_id(partij_code)
+        try:
+            record = await repository.aget_by_id(partij_code)
+        except QueryTimeoutError:
+            show_error("Het laden van het record duurt te lang, probeer het opnieuw")
+            return
+        except DremioUnavailableError:
+            show_error("De database is niet bereikbaar, probeer het later opnieuw")
+            return
         if record:
             with ui.dialog() as dialog, ui.card():
                 create_correction_form(record, dialog.close)
@@ -117,12 +124,19 @@ def spacing_page() -> None:
 
 
 @router.page("/{partij_code}")
-def spacing_detail(partij_code: str) -> None:
+async def spacing_detail(partij_code: str) -> None:
     """Render the spacing record detail page."""
     repository = SpacingRepository()
-    record = repository.get_by_id(partij_code)
 
     with frame("Wijderzet Details"):
+        try:
+            record = await repository.aget_by_id(partij_code)
+        except QueryTimeoutError:
+            show_error("Het laden van het record duurt te lang, probeer het opnieuw")
+            return
+        except DremioUnavailableError:
+            show_error("De database is niet bereikbaar, probeer het later opnieuw")
+            return
         display_model_detail_page(
             model=record,
             title="Wijderzet Details",
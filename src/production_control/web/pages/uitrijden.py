@@ -7,9 +7,12 @@ from typing import Any, Dict, Iterable, List, Set
 import httpx
 from nicegui import APIRouter, ui
 
+from ...data.executor import run_in_pool
+from ...data.repository import DremioUnavailableError, QueryTimeoutError
 from ...vloerplan.repositories import Vloerplan19cmRepository
 from ...vloerplan.models import Vloerplan19cm
 from ..components import frame
+from ..components.message import show_error
 from ..components.model_detail_page import (
     create_model_view_action,
     create_scan_action,
@@ -18,7 +21,6 @@ from ..components.model_detail_page import (
 from ..components.model_list_page import display_model_list_page
 from ..components.table_utils import format_date
 
-
 router = APIRouter(prefix="/uitrijden")
 
 SYNC_RECENT_DAYS = 7
@@ -133,7 +135,8 @@ async def _confirm_sync_selection(pending: List[Vloerplan19cm]) -> List[Vloerpla
 
 
 async def handle_sync_click(button, pending_state: _PendingState) -> None:
-    pending = get_repository().get_pending_olsthoorn_sync()
+    # The updates are pushed to Firebird, so compare against live Dremio
+    pending = await run_in_pool(get_repository().live().get_pending_olsthoorn_sync)
     if not pending:
         ui.notify("Geen wijzigingen nodig", type="positive")
         return
@@ -147,14 +150,14 @@ async def handle_sync_click(button, pending_state: _PendingState) -> None:
     try:
         result = await sync_to_olsthoorn(rows_to_sync)
         ui.notify(result["message"], type="positive" if result["success"] else "negative")
-        pending_state.count = get_repository().count_pending_olsthoorn_sync()
+        pending_state.count = await run_in_pool(get_repository().count_pending_olsthoorn_sync)
     finally:
         button.props(remove="loading")
         button.enable()
 
 
 @router.page("/")
-def uitrijden_page() -> None:
+async def uitrijden_page() -> None:
     # Uitrijden rows ARE potting lots (same id), so the scan action
     # routes to the lot's content page directly, skipping the
     # `/potting-lots/scan/{id}` redirect entry point.
@@ -170,7 +173,7 @@ def uitrijden_page() -> None:
         ),
     }
 
-    pending_state = _PendingState(get_repository().count_pending_olsthoorn_sync())
+    pending_state = _PendingState(await run_in_pool(get_repository().count_pending_olsthoorn_sync))
 
     with frame("Uitrijden"):
         with ui.row().classes("w-full justify-end mb-4"):
@@ -196,10 +199,16 @@ def uitrijden_page() -> None:
 
 
 @router.page("/{id}")
-def uitrijden_detail(id: int) -> None:
-    record = get_repository().get_by_id(id)
-
+async def uitrijden_detail(id: int) -> None:
     with frame("Uitrijden Details"):
+        try:
+            record = await get_repository().aget_by_id(id)
+        except QueryTimeoutError:
+            show_error("Het laden van het record duurt te lang, probeer het opnieuw")
+            return
+        except DremioUnavailableError:
+            show_error("De database is niet bereikbaar, probeer het later opnieuw")
+            return
         display_model_detail_page(
             model=record,
             title="Uitrijden Details",
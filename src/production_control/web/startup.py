@@ -1,9 +1,13 @@
 """Web application startup configuration."""
 
 import logging
-from nicegui import app, ui
+from nicegui import app, background_tasks, ui
 
 from .pages import home, products, spacing, bulb_picklist, potting_lots, inspectie, scan, uitrijden
+from ..data.api import router as metrics_router
+from ..data.circuit import circuit_breakers
+from ..data.executor import shutdown_executor
+from ..data.snapshot import refresh_periodically, snapshot_store
 from ..firebird.api import router as firebird_router
 
 
@@ -31,3 +35,15 @@ def startup() -> None:
     app.include_router(scan.router)
     app.include_router(uitrijden.router)
     app.include_router(firebird_router)
+    app.include_router(metrics_router)
+
+    app.on_shutdown(shutdown_executor)
+    app.on_shutdown(circuit_breakers.stop)
+
+    if snapshot_store is not None:
+        app.on_startup(
+            lambda: background_tasks.create(
+                refresh_periodically(snapshot_store), name="refresh_snapshots"
+            )
+        )
+        app.on_shutdown(snapshot_store.dispose)
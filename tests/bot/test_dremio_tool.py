@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from sqlalchemy import create_engine
 
@@ -30,6 +34,33 @@ class TestExecute:
         assert cols == ["id"]
         assert rows == []
 
+    def test_identical_concurrent_queries_run_once(self, sqlite_engine, monkeypatch):
+        release = threading.Event()
+        runs = []
+
+        def slow_query(eng, sql):
+            runs.append(sql)
+            release.wait(5)
+            return ["n"], [[1]]
+
+        monkeypatch.setattr(dremio_tool, "_query", slow_query)
+        before = dremio_tool.single_flight.stats()["coalesced"]
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [
+                pool.submit(dremio_tool.execute, "SELECT 1 AS n", sqlite_engine) for _ in range(3)
+            ]
+            deadline = time.monotonic() + 5
+            while dremio_tool.single_flight.stats()["coalesced"] < before + 2:
+                assert time.monotonic() < deadline
+                time.sleep(0.001)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert runs == ["SELECT 1 AS n"]
+        assert results == [(["n"], [[1]])] * 3
+        # Every caller gets its own lists
+        assert results[0][1] is not results[1][1]
+
 
 class TestFormat:
     def test_basic_table(self):
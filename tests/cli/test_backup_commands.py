@@ -1,13 +1,21 @@
 """Tests for Dremio backup commands."""
 
 import csv
+import hashlib
+import json
+from datetime import date, datetime
 from unittest.mock import MagicMock, patch
 
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 import sqlalchemy as sa
 from typer.testing import CliRunner
 
 from production_control.__cli__ import app
+from production_control.data import backup
+from production_control.data.backup import split_range
+from production_control.data.backup_manifest import BackupManifest, file_sha256
 
 
 @pytest.fixture
@@ -44,8 +52,7 @@ def test_backup_query_success(tmp_path, mock_engine, mock_session, runner):
     mock_session.return_value.__enter__.return_value.exec.return_value = mock_result
 
     # Run backup command
-    with patch("production_control.data.backup.DremioRepository") as mock_repo:
-        mock_repo.return_value.engine = mock_engine
+    with patch("production_control.data.backup.get_engine", return_value=mock_engine):
         result = runner.invoke(
             app, ["backup", "query", "SELECT * FROM test", "--output-dir", str(tmp_path)]
         )
@@ -53,6 +60,7 @@ def test_backup_query_success(tmp_path, mock_engine, mock_session, runner):
     # Verify command output
     assert result.exit_code == 0
     assert "Success: Saved 1 file(s)" in result.stdout
+    assert "Stage times: fetch" in result.stdout
 
     # Verify file contents
     output_file = tmp_path / "backup_001.csv"
@@ -76,8 +84,7 @@ def test_backup_query_with_name(tmp_path, mock_engine, mock_session, runner):
     mock_session.return_value.__enter__.return_value.exec.return_value = mock_result
 
     # Run backup command
-    with patch("production_control.data.backup.DremioRepository") as mock_repo:
-        mock_repo.return_value.engine = mock_engine
+    with patch("production_control.data.backup.get_engine", return_value=mock_engine):
         result = runner.invoke(
             app,
             [
@@ -114,8 +121,7 @@ def test_backup_query_db_error(tmp_path, mock_engine, mock_session, runner):
     )
 
     # Run backup command
-    with patch("production_control.data.backup.DremioRepository") as mock_repo:
-        mock_repo.return_value.engine = mock_engine
+    with patch("production_control.data.backup.get_engine", return_value=mock_engine):
         result = runner.invoke(
             app, ["backup", "query", "SELECT * FROM test", "--output-dir", str(tmp_path)]
         )
@@ -140,8 +146,7 @@ def test_backup_query_filesystem_error(tmp_path, mock_engine, mock_session, runn
     readonly_dir.chmod(0o555)  # Read + execute only
 
     # Run backup command
-    with patch("production_control.data.backup.DremioRepository") as mock_repo:
-        mock_repo.return_value.engine = mock_engine
+    with patch("production_control.data.backup.get_engine", return_value=mock_engine):
         result = runner.invoke(
             app, ["backup", "query", "SELECT * FROM test", "--output-dir", str(readonly_dir)]
         )
@@ -169,8 +174,7 @@ def test_backup_query_env_var_precedence(tmp_path, mock_engine, mock_session, ru
     mock_session.return_value.__enter__.return_value.exec.return_value = mock_result
 
     # Run backup command with environment variable set
-    with patch("production_control.data.backup.DremioRepository") as mock_repo:
-        mock_repo.return_value.engine = mock_engine
+    with patch("production_control.data.backup.get_engine", return_value=mock_engine):
         result = runner.invoke(
             app,
             ["backup", "query", "SELECT * FROM test"],
@@ -199,8 +203,7 @@ def test_backup_query_large_result(tmp_path, mock_engine, mock_session, runner):
     mock_session.return_value.__enter__.return_value.exec.return_value = mock_result
 
     # Run backup command with small chunk size
-    with patch("production_control.data.backup.DremioRepository") as mock_repo:
-        mock_repo.return_value.engine = mock_engine
+    with patch("production_control.data.backup.get_engine", return_value=mock_engine):
         result = runner.invoke(
             app,
             [
@@ -227,3 +230,256 @@ def test_backup_query_large_result(tmp_path, mock_engine, mock_session, runner):
             rows = list(reader)
             assert rows[0] == ["id"]  # Header
             assert len(rows) == 6  # Header + 5 rows
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """SQLite engine with a typed table of 12 rows."""
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'source.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE lots (id INTEGER, naam TEXT, gewicht REAL)")
+        connection.exec_driver_sql(
+            "INSERT INTO lots VALUES "
+            + ", ".join(f"({i}, 'lot {i}', {i * 1.5})" for i in range(1, 13))
+        )
+    yield engine
+    engine.dispose()
+
+
+def test_backup_query_parquet(tmp_path, sqlite_engine, runner):
+    """Test that Parquet backups keep column types, with a row group per chunk."""
+    with patch("production_control.data.backup.get_engine", return_value=sqlite_engine):
+        result = runner.invoke(
+            app,
+            [
+                "backup",
+                "query",
+                "SELECT * FROM lots ORDER BY id",
+                "--output-dir",
+                str(tmp_path / "out"),
+                "--format",
+                "parquet",
+                "--chunk-size",
+                "5",
+                "--compression",
+                "snappy",
+            ],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert "Success: Saved 12 row(s)" in result.stdout
+    parquet_file = pq.ParquetFile(tmp_path / "out" / "backup.parquet")
+    assert [parquet_file.metadata.row_group(i).num_rows for i in range(3)] == [5, 5, 2]
+    assert parquet_file.metadata.row_group(0).column(0).compression == "SNAPPY"
+    table = parquet_file.read()
+    assert table.schema.field("id").type == pa.int64()
+    assert table.schema.field("gewicht").type == pa.float64()
+    assert table.column("naam").to_pylist()[-1] == "lot 12"
+
+
+def test_backup_query_arrow(tmp_path, sqlite_engine, runner):
+    """Test that Arrow IPC backups hold record batches of chunk-size rows."""
+    with patch("production_control.data.backup.get_engine", return_value=sqlite_engine):
+        result = runner.invoke(
+            app,
+            [
+                "backup",
+                "query",
+                "SELECT id, naam FROM lots",
+                "--name",
+                "lots",
+                "--output-dir",
+                str(tmp_path),
+                "--format",
+                "arrow",
+                "--chunk-size",
+                "8",
+            ],
+        )
+
+    assert result.exit_code == 0, result.output
+    with pa.ipc.open_file(tmp_path / "lots.arrow") as reader:
+        assert [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)] == [8, 4]
+        assert reader.read_all().num_rows == 12
+
+
+def test_backup_query_arrow_rejects_snappy(tmp_path, sqlite_engine, runner):
+    """Test that snappy is refused for Arrow IPC files, which do not support it."""
+    with patch("production_control.data.backup.get_engine", return_value=sqlite_engine):
+        result = runner.invoke(
+            app,
+            ["backup", "query", "SELECT 1", "--output-dir", str(tmp_path)]
+            + ["--format", "arrow", "--compression", "snappy"],
+        )
+
+    assert result.exit_code == 2
+    assert not (tmp_path / "backup.arrow").exists()
+
+
+def test_backup_query_partitioned(tmp_path, sqlite_engine, runner):
+    """Test that a partitioned backup writes every row once, one file per range."""
+    with sqlite_engine.begin() as connection:
+        connection.exec_driver_sql("INSERT INTO lots VALUES (NULL, 'zonder id', 0)")
+
+    with patch("production_control.data.backup.get_engine", return_value=sqlite_engine):
+        result = runner.invoke(
+            app,
+            ["backup", "query", "SELECT * FROM lots", "--output-dir", str(tmp_path)]
+            + ["--format", "parquet", "--partition-by", "id", "--parallel", "3"],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert "Success: Saved 13 row(s) in 3 part(s)" in result.stdout
+    assert "rows/s" in result.stdout and "MB/s" in result.stdout
+    parts = [pq.read_table(tmp_path / f"backup_part{i:03d}.parquet") for i in (1, 2, 3)]
+    assert [part.num_rows for part in parts] == [5, 4, 4]
+    ids = [id for part in parts for id in part.column("id").to_pylist()]
+    assert sorted(ids, key=lambda id: id or 0) == [None, *range(1, 13)]
+
+
+def test_split_range_of_numbers_and_dates():
+    """Test that ranges split evenly and never repeat a start value."""
+    assert split_range(1, 12, 3) == [1, 5, 9]
+    assert split_range(5, 6, 4) == [5, 6]
+    assert split_range(date(2025, 1, 1), date(2025, 1, 31), 3) == [
+        date(2025, 1, 1),
+        date(2025, 1, 11),
+        date(2025, 1, 21),
+    ]
+    with pytest.raises(TypeError):
+        split_range("a", "z", 2)
+
+
+def test_partition_queries_render_typed_date_bounds():
+    """Test that the range bounds of a timestamp column are Dremio timestamp literals."""
+    engine = sa.create_engine("dremio+flight://mock:32010/dremio")
+    bounds = pa.table({"low": [datetime(2025, 1, 1)], "high": [datetime(2025, 1, 3)]})
+
+    with patch("production_control.data.backup.arrow.read_table", return_value=bounds):
+        queries = backup.partition_queries(engine, "SELECT * FROM lots", "gewijzigd", 2)
+
+    assert len(queries) == 2
+    assert "< TIMESTAMP '2025-01-02 00:00:00.000'" in queries[0]
+    assert ">= TIMESTAMP '2025-01-02 00:00:00.000'" in queries[1]
+
+
+def test_backup_query_incremental(tmp_path, sqlite_engine, runner):
+    """Test that each incremental run only adds the rows beyond the high-water mark."""
+    arguments = ["backup", "query", "SELECT * FROM lots", "--name", "lots"]
+    arguments += ["--output-dir", str(tmp_path), "--format", "parquet", "--incremental-by", "id"]
+
+    with patch("production_control.data.backup.get_engine", return_value=sqlite_engine):
+        first = runner.invoke(app, arguments)
+        with sqlite_engine.begin() as connection:
+            connection.exec_driver_sql("INSERT INTO lots VALUES (13, 'lot 13', 19.5)")
+        second = runner.invoke(app, arguments)
+        third = runner.invoke(app, arguments)
+
+    assert first.exit_code == second.exit_code == third.exit_code == 0, third.output
+    assert "No rows beyond the high-water mark" in third.stdout
+    assert pq.read_table(tmp_path / "lots_001.parquet").num_rows == 12
+    assert pq.read_table(tmp_path / "lots_002.parquet").column("id").to_pylist() == [13]
+    assert not (tmp_path / "lots_003.parquet").exists()
+
+    manifest = json.loads((tmp_path / "lots.manifest.json").read_text())
+    assert manifest["watermark"] == {"type": "int", "value": 13}
+    assert [(part["file"], part["rows"]) for part in manifest["parts"]] == [
+        ("lots_001.parquet", 12),
+        ("lots_002.parquet", 1),
+    ]
+    part = manifest["parts"][1]
+    assert part["bytes"] == (tmp_path / "lots_002.parquet").stat().st_size
+    assert part["sha256"] == file_sha256(tmp_path / "lots_002.parquet")
+
+
+def test_manifest_keeps_date_watermarks(tmp_path):
+    """Test that dates and timestamps read back from the manifest as they were written."""
+    path = tmp_path / "lots.manifest.json"
+    manifest = BackupManifest(path, "lots", "gewijzigd", "parquet")
+    data = tmp_path / "lots_001.parquet"
+    data.write_bytes(b"PAR1")
+    manifest.add(data, 3, datetime(2025, 3, 1, 12, 30))
+    manifest.save()
+
+    loaded = BackupManifest.load(path, "lots", "gewijzigd", "parquet")
+    assert loaded.watermark == datetime(2025, 3, 1, 12, 30)
+    assert loaded.parts[0].sha256 == hashlib.sha256(b"PAR1").hexdigest()
+    with pytest.raises(ValueError, match="by gewijzigd as parquet"):
+        BackupManifest.load(path, "lots", "id", "parquet")
+
+
+def test_manifest_filters_on_a_typed_watermark(tmp_path):
+    """Test that date and timestamp watermarks render as Dremio literals of their type."""
+    engine = sa.create_engine("dremio+flight://mock:32010/dremio")
+    manifest = BackupManifest(tmp_path / "lots.manifest.json", "lots", "gewijzigd", "parquet")
+
+    manifest.watermark = datetime(2025, 3, 1, 12, 30)
+    sql = manifest.filter_query(engine, "SELECT * FROM lots")
+    assert "gewijzigd > TIMESTAMP '2025-03-01 12:30:00.000'" in sql
+
+    manifest.watermark = date(2025, 3, 1)
+    sql = manifest.filter_query(engine, "SELECT * FROM lots")
+    assert "gewijzigd > DATE '2025-03-01'" in sql
+
+
+def test_backup_query_resumes_after_completed_chunks(tmp_path, mock_engine, mock_session, runner):
+    """Test that --resume continues after the last completed CSV chunk."""
+    session = mock_session.return_value.__enter__.return_value
+    failing = MagicMock()
+    failing.keys.return_value = ["id"]
+    failing.fetchmany.side_effect = [
+        [(1,), (2,)],
+        [(3,), (4,)],
+        sa.exc.OperationalError("SELECT", {}, ConnectionResetError("connection reset")),
+    ]
+    resumed = MagicMock()
+    resumed.keys.return_value = ["id"]
+    resumed.fetchmany.side_effect = [[(5,)], []]
+    session.exec.side_effect = [failing, resumed]
+    arguments = ["backup", "query", "SELECT * FROM test ORDER BY id", "--output-dir", str(tmp_path)]
+    arguments += ["--chunk-size", "2"]
+
+    with patch("production_control.data.backup.get_engine", return_value=mock_engine):
+        failed = runner.invoke(app, arguments)
+        assert failed.exit_code == 1
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "backup.journal.jsonl",
+            "backup_001.csv",
+            "backup_002.csv",
+        ]
+        result = runner.invoke(app, arguments + ["--resume"])
+
+    assert result.exit_code == 0, result.output
+    assert "Resuming after 4 row(s) in 2 file(s)" in result.stdout
+    assert "Success: Saved 3 file(s)" in result.stdout
+    assert session.exec.call_args[0][0].text.endswith("OFFSET 4 ROWS")
+    with open(tmp_path / "backup_003.csv") as f:
+        assert list(csv.reader(f)) == [["id"], ["5"]]
+    assert not (tmp_path / "backup.journal.jsonl").exists()
+
+
+def test_backup_query_resumes_partitioned_parts(tmp_path, sqlite_engine, runner):
+    """Test that resuming a partitioned backup only runs the parts that did not complete."""
+    write_batches = backup.write_batches
+
+    def failing_second_part(engine, query, path, *args):
+        if path.name == "backup_part002.parquet":
+            raise pa.ArrowIOError("connection reset")
+        return write_batches(engine, query, path, *args)
+
+    arguments = ["backup", "query", "SELECT * FROM lots", "--output-dir", str(tmp_path)]
+    arguments += ["--format", "parquet", "--partition-by", "id", "--parallel", "3"]
+    with patch("production_control.data.backup.get_engine", return_value=sqlite_engine):
+        with patch("production_control.data.backup.write_batches", failing_second_part):
+            assert runner.invoke(app, arguments).exit_code == 1
+        assert not (tmp_path / "backup_part002.parquet").exists()
+
+        changed = runner.invoke(app, arguments + ["--chunk-size", "5", "--resume"])
+        assert changed.exit_code == 2
+        result = runner.invoke(app, arguments + ["--resume"])
+
+    assert result.exit_code == 0, result.output
+    assert result.stdout.count("saved before") == 2
+    assert "Success: Saved 12 row(s) in 3 part(s)" in result.stdout
+    assert pq.read_table(tmp_path / "backup_part002.parquet").num_rows == 4
+    assert not list(tmp_path.glob("*.tmp"))
@@ -1 +1,13 @@
+import pytest
+
+from production_control.data.cache import result_cache
+
 pytest_plugins = ["nicegui.testing.user_plugin"]
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    """Keep cached query results from leaking between tests."""
+    result_cache.clear()
+    yield
+    result_cache.clear()
@@ -0,0 +1,41 @@
+"""Fixtures for the data layer tests."""
+
+import pyarrow as pa
+import pytest
+from pyarrow import flight
+from sqlalchemy import create_engine
+
+
+class StaticFlightServer(flight.FlightServerBase):
+    """Local Flight server answering every query with the same table."""
+
+    def __init__(self):
+        super().__init__("grpc+tcp://127.0.0.1:0")
+        self.table = pa.table({})
+        self.queries = []
+
+    def get_flight_info(self, context, descriptor):
+        self.queries.append(descriptor.command.decode())
+        endpoint = flight.FlightEndpoint(descriptor.command, [])
+        return flight.FlightInfo(self.table.schema, descriptor, [endpoint], self.table.num_rows, -1)
+
+    def do_get(self, context, ticket):
+        return flight.RecordBatchStream(self.table)
+
+
+@pytest.fixture
+def flight_server():
+    """Flight server standing in for Dremio; set `table` to the result to return."""
+    server = StaticFlightServer()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def flight_engine(flight_server):
+    """Dremio Flight engine connected to the local Flight server."""
+    engine = create_engine(
+        f"dremio+flight://127.0.0.1:{flight_server.port}/dremio?UseEncryption=false&Token=test"
+    )
+    yield engine
+    engine.dispose()
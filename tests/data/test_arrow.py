@@ -0,0 +1,169 @@
+"""Tests for the Arrow-native result path."""
+
+import asyncio
+import time
+from datetime import date, datetime
+
+import pyarrow as pa
+import pytest
+from pyarrow import flight
+from sqlalchemy import Column, DateTime
+from sqlalchemy.types import TypeDecorator
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+from production_control.data import arrow
+from production_control.data.executor import QueryCancelledError, run_in_pool
+from production_control.data.keyset import normalize
+from production_control.vloerplan.models import Vloerplan19cm
+from production_control.vloerplan.repositories import Vloerplan19cmRepository
+
+
+def vloerplan_table() -> pa.Table:
+    """Vloerplan rows typed the way Dremio returns them over Flight."""
+    return pa.table(
+        {
+            "id": pa.array([1, 2, 3], pa.int64()),
+            "product_naam": ["Lilium A", None, "Lilium C"],
+            "productgroep_naam": ["Oriental", "Oriental", None],
+            "klant_code": ["K1", "K2", "K3"],
+            "tuin_nr_plan": pa.array([4.0, None, float("nan")], pa.float64()),
+            "tuin_nr_olsthoorn": pa.array([12.0, 7.0, None], pa.float64()),
+            "datum_oppot_plan": pa.array(
+                [datetime(2025, 3, 3, 14, 30), None, datetime(2025, 3, 5)], pa.timestamp("ms")
+            ),
+            "datum_uit_cel_plan_opm": pa.array([None, None, None], pa.timestamp("ms")),
+            "opmerking": ["", "spoed", None],
+        }
+    )
+
+
+@pytest.fixture
+def repository(flight_server, flight_engine):
+    flight_server.table = vloerplan_table()
+    return Vloerplan19cmRepository(flight_engine)
+
+
+def test_fetch_records_coerces_columns(repository):
+    """Test that timestamps become dates and NaN/NULL doubles become None or int."""
+    records = repository.fetch_records(select(Vloerplan19cm))
+
+    assert [r["id"] for r in records] == [1, 2, 3]
+    assert records[0]["datum_oppot_plan"] == date(2025, 3, 3)
+    assert records[1]["datum_oppot_plan"] is None
+    assert [r["tuin_nr_plan"] for r in records] == [4, None, None]
+    assert [r["tuin_nr_olsthoorn"] for r in records] == [12, 7, None]
+    assert isinstance(records[0]["tuin_nr_plan"], int)
+
+
+def test_query_is_sent_with_inline_values(repository, flight_server):
+    """Test that bound values are rendered into the SQL sent over Flight."""
+    repository.fetch_records(select(Vloerplan19cm).where(Vloerplan19cm.id > 1).limit(2))
+
+    assert "> 1" in flight_server.queries[-1]
+    assert "LIMIT 2" in flight_server.queries[-1]
+
+
+def test_records_match_orm_path(repository):
+    """Test that records hold the same values as model instances loaded through the ORM."""
+    with Session(repository.engine) as session:
+        items = list(session.exec(select(Vloerplan19cm)))
+
+    records = repository.fetch_records(select(Vloerplan19cm))
+
+    # The pandas conversion may turn NULL strings into NaN; Arrow keeps them None.
+    assert records == [
+        {name: normalize(getattr(item, name)) for name in Vloerplan19cm.model_fields}
+        for item in items
+    ]
+
+
+def test_fetch_records_selected_columns(repository):
+    """Test that records can be limited to the columns a table shows."""
+    records = repository.fetch_records(select(Vloerplan19cm), columns=["id", "tuin_nr_plan"])
+    assert records[0] == {"id": 1, "tuin_nr_plan": 4}
+
+
+class UncoercedType(TypeDecorator):
+    impl = DateTime
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        return value
+
+
+class UncoercedLot(SQLModel, table=True):
+    __tablename__ = "uncoerced_lots"
+
+    id: int = Field(primary_key=True)
+    moment: datetime = Field(sa_column=Column("moment", UncoercedType()))
+
+
+def test_coerce_table_requires_vectorized_conversion():
+    """Test that a per-cell conversion without an Arrow equivalent is not skipped silently."""
+    table = pa.table({"id": [1], "moment": pa.array([datetime(2025, 1, 1)], pa.timestamp("ms"))})
+    with pytest.raises(TypeError, match="coerce_arrow"):
+        arrow.coerce_table(table, UncoercedLot)
+
+
+def test_read_table_from_dbapi_cursor():
+    """Test that non-Flight connections are read through a cursor."""
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE t (id INTEGER, naam TEXT)")
+        connection.exec_driver_sql("INSERT INTO t VALUES (1, 'a'), (2, NULL)")
+
+    table = arrow.read_table(engine, "SELECT id, naam FROM t ORDER BY id")
+    assert table.to_pylist() == [{"id": 1, "naam": "a"}, {"id": 2, "naam": None}]
+
+    empty = arrow.read_table(engine, "SELECT id, naam FROM t WHERE id > 5")
+    assert empty.column_names == ["id", "naam"]
+    assert empty.num_rows == 0
+
+
+async def test_abandoned_query_stops_reading_the_stream(flight_server, flight_engine):
+    """Test that a Flight query nobody waits for anymore stops at the next record batch."""
+    sent = []
+
+    def slow_do_get(context, ticket):
+        def batches():
+            for i in range(100):
+                if context.is_cancelled():
+                    return
+                time.sleep(0.02)
+                sent.append(i)
+                yield pa.record_batch([pa.array([i])], names=["id"])
+
+        return flight.GeneratorStream(pa.schema([("id", pa.int64())]), batches())
+
+    flight_server.do_get = slow_do_get
+    outcome = []
+
+    def read():
+        try:
+            return arrow.read_table(flight_engine, "SELECT id FROM lots")
+        except QueryCancelledError as e:
+            outcome.append(e)
+            raise
+
+    with pytest.raises(asyncio.TimeoutError):
+        await run_in_pool(read, timeout=0.2)
+    deadline = time.monotonic() + 5
+    while not outcome and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+
+    assert outcome
+    assert len(sent) < 100
+    # Queries read to the end as before
+    flight_server.do_get = lambda context, ticket: flight.RecordBatchStream(pa.table({"id": [1]}))
+    table = await run_in_pool(arrow.read_table, flight_engine, "SELECT id FROM lots")
+    assert table.to_pylist() == [{"id": 1}]
+
+
+def test_open_batches_streams_flight_record_batches(flight_server, flight_engine):
+    """Test that Flight results stream batch by batch with the schema Dremio reports."""
+    flight_server.table = pa.Table.from_batches(
+        [pa.record_batch({"id": pa.array(range(i, i + 3), pa.int32())}) for i in (0, 3)]
+    )
+    with arrow.open_batches(flight_engine, "SELECT id FROM lots") as batches:
+        assert batches.schema == pa.schema([("id", pa.int32())])
+        assert [batch.num_rows for batch in batches] == [3, 3]
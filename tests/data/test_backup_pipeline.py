@@ -0,0 +1,128 @@
+"""Tests for overlapped fetching and writing of backups."""
+
+import threading
+import time
+
+import pytest
+
+from production_control.data.backup_pipeline import (
+    ChunkQueue,
+    StageTimes,
+    open_timed,
+    run_pipeline,
+)
+
+
+def test_pipeline_fetches_in_its_own_thread_and_writes_in_order():
+    """Test that chunks are fetched in another thread and written in order."""
+    fetch_threads = []
+    written = []
+
+    def chunks():
+        for i in range(5):
+            fetch_threads.append(threading.current_thread().name)
+            yield i
+
+    times = StageTimes()
+    run_pipeline(chunks(), written.append, lambda chunk: 1, times, ChunkQueue(2, 100))
+
+    assert written == [0, 1, 2, 3, 4]
+    assert set(fetch_threads) == {"backup-fetch"}
+
+
+def test_pipeline_applies_back_pressure():
+    """Test that fetching waits while the queue holds its maximum of chunks."""
+    fetched = []
+    ahead = []
+
+    def chunks():
+        for i in range(10):
+            fetched.append(i)
+            yield i
+
+    def write(chunk):
+        ahead.append(len(fetched) - chunk)
+        time.sleep(0.01)
+
+    times = StageTimes()
+    run_pipeline(chunks(), write, lambda chunk: 1, times, ChunkQueue(2, 100))
+
+    # Two chunks queued and one fetched, waiting for room, besides the one written
+    assert max(ahead) <= 4
+    assert times.fetch_waited > 0
+
+
+def test_pipeline_caps_queued_bytes():
+    """Test that the queue holds at most max_bytes, except for a single larger chunk."""
+    times = StageTimes()
+    run_pipeline(iter_of([6, 6, 6, 6]), slow_write, lambda size: size, times, ChunkQueue(10, 10))
+    assert times.peak_bytes == 6
+
+    times = StageTimes()
+    run_pipeline(iter_of([6, 50, 6]), slow_write, lambda size: size, times, ChunkQueue(10, 10))
+    assert times.peak_bytes == 50
+
+
+def test_pipeline_raises_fetch_errors():
+    """Test that an error while fetching is raised in the writing thread."""
+
+    def chunks():
+        yield 1
+        raise ConnectionResetError("connection reset")
+
+    written = []
+    with pytest.raises(ConnectionResetError):
+        run_pipeline(chunks(), written.append, lambda chunk: 1, StageTimes(), ChunkQueue())
+
+    assert written == [1]
+
+
+def test_pipeline_stops_fetching_when_writing_fails():
+    """Test that a write error stops fetching and closes the fetching generator."""
+    fetched = []
+    closed = threading.Event()
+
+    def chunks():
+        try:
+            for i in range(1000):
+                fetched.append(i)
+                yield i
+        finally:
+            closed.set()
+
+    def write(chunk):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        run_pipeline(chunks(), write, lambda chunk: 1, StageTimes(), ChunkQueue(2, 100))
+
+    assert closed.is_set()
+    assert len(fetched) < 10
+
+
+def test_timed_file_records_disk_time(tmp_path):
+    """Test that writes through a timed file add to the disk time."""
+    times = StageTimes()
+    with open_timed(tmp_path / "data.bin", times, buffer_size=4) as f:
+        f.write(b"0123456789")
+
+    assert (tmp_path / "data.bin").read_bytes() == b"0123456789"
+    assert times.disk > 0
+
+
+def test_stage_times_name_the_bottleneck():
+    """Test that the slowest stage is reported as the bottleneck."""
+    times = StageTimes(fetch=1.0, encode=0.5, disk=0.2)
+    times.add(StageTimes(disk=2.0, peak_bytes=3_000_000))
+
+    assert times.bottleneck == "disk"
+    assert "(bottleneck: disk)" in times.summary()
+    assert "at most 3.0 MB queued" in times.summary()
+
+
+def iter_of(values):
+    yield from values
+
+
+def slow_write(chunk):
+    time.sleep(0.01)
@@ -0,0 +1,267 @@
+"""Tests for the read-through result cache."""
+
+from typing import List, Optional, Tuple
+
+import pytest
+from sqlalchemy import event, func
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+from production_control.data import Pagination
+from production_control.data.cache import ResultCache, invalidate, result_cache
+from production_control.data.repository import DremioRepository
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return ResultCache(max_entries=2, default_ttl=10, clock=clock)
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    """Test that an entry is served until its TTL has passed."""
+    cache.put("Lot", "a", 1)
+    clock.now = 9
+    assert cache.get("Lot", "a") == (True, 1)
+    clock.now = 10
+    assert cache.get("Lot", "a") == (False, None)
+
+
+def test_per_model_ttl(cache, clock):
+    """Test that a model can have its own TTL."""
+    cache.set_ttl("Product", 100)
+    cache.put("Product", "a", 1)
+    cache.put("Lot", "a", 2)
+    clock.now = 50
+    assert cache.get("Product", "a") == (True, 1)
+    assert cache.get("Lot", "a") == (False, None)
+
+
+def test_zero_ttl_disables_caching(clock):
+    """Test that a TTL of 0 stores nothing."""
+    cache = ResultCache(default_ttl=0, clock=clock)
+    cache.put("Lot", "a", 1)
+    assert cache.get("Lot", "a") == (False, None)
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    """Test size-bounded LRU eviction."""
+    cache.put("Lot", "a", 1)
+    cache.put("Lot", "b", 2)
+    cache.get("Lot", "a")
+    cache.put("Lot", "c", 3)
+
+    assert cache.get("Lot", "b") == (False, None)
+    assert cache.get("Lot", "a") == (True, 1)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_model_only_drops_its_entries(cache):
+    """Test that invalidation is scoped to a model and notifies listeners."""
+    notified = []
+    cache.add_invalidation_listener(notified.append)
+    cache.put("Lot", "a", 1)
+    cache.put("Product", "a", 2)
+
+    assert cache.invalidate("Lot") == 1
+    assert cache.get("Lot", "a") == (False, None)
+    assert cache.get("Product", "a") == (True, 2)
+    assert notified == ["Lot"]
+
+
+def test_expired_entry_is_available_as_stale_until_max_stale(clock):
+    """Test that an expired entry can still be looked up, with its age, for a while."""
+    cache = ResultCache(default_ttl=10, max_stale=30, clock=clock)
+    cache.put("Lot", "a", 1)
+
+    clock.now = 4
+    found = cache.lookup("Lot", "a", max_stale=30)
+    assert (found.value, found.age, found.fresh) == (1, 4, True)
+
+    clock.now = 25
+    assert cache.get("Lot", "a") == (False, None)
+    found = cache.lookup("Lot", "a", max_stale=30)
+    assert (found.value, found.age, found.fresh) == (1, 25, False)
+    assert cache.lookup("Lot", "a", max_stale=5) is None
+
+    clock.now = 40
+    assert cache.lookup("Lot", "a", max_stale=60) is None
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_get_or_load_counts_hits_and_misses(cache):
+    """Test that the loader only runs on a miss and the counters add up."""
+    calls = []
+
+    def load():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_load("Lot", "a", load) == "value"
+    assert cache.get_or_load("Lot", "a", load) == "value"
+
+    stats = cache.stats()
+    assert len(calls) == 1
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["models"]["Lot"]["hits"] == 1
+
+
+class CachedLot(SQLModel, table=True):
+    """Small stand-in for a Dremio view."""
+
+    __tablename__ = "cached_lots"
+
+    id: int = Field(primary_key=True)
+    naam: str
+
+
+class CachedLotRepository(DremioRepository[CachedLot]):
+    count_in_page_query = True
+
+    def __init__(self, connection):
+        super().__init__(CachedLot, connection)
+
+    def get_paginated(
+        self, pagination: Pagination, filter_text: Optional[str] = None
+    ) -> Tuple[List[CachedLot], int]:
+        page, items_per_page, sort_by, descending = self._validate_pagination(pagination=pagination)
+        with Session(self.engine) as session:
+            return self._execute_paginated_query(
+                session,
+                select(CachedLot),
+                select(func.count(CachedLot.id)),
+                page,
+                items_per_page,
+                filter_text,
+                ["naam"],
+                sort_by,
+                descending,
+                pagination=pagination,
+            )
+
+
+@pytest.fixture
+def repository():
+    engine = create_engine("sqlite://")
+    CachedLot.__table__.create(engine)
+    with Session(engine) as session:
+        for i in range(1, 8):
+            session.add(CachedLot(id=i, naam=f"lot {i}"))
+        session.commit()
+    return CachedLotRepository(engine)
+
+
+def _count_statements(engine):
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    return statements
+
+
+def test_repository_reads_pages_through_cache(repository):
+    """Test that repeating a page request is served without a query."""
+    statements = _count_statements(repository.engine)
+
+    first = repository.get_paginated(Pagination(rows_per_page=3))
+    second = repository.get_paginated(Pagination(rows_per_page=3))
+    repository.get_paginated(Pagination(rows_per_page=3), filter_text="lot 1")
+
+    assert [item.id for item in second[0]] == [item.id for item in first[0]]
+    assert second[1] == 7
+    assert len(statements) == 2
+
+
+def test_invalidate_forces_fresh_read(repository):
+    """Test that the invalidation hook makes the next read go to the database."""
+    statements = _count_statements(repository.engine)
+
+    repository.get_paginated(Pagination(rows_per_page=3))
+    invalidate(CachedLot)
+    repository.get_paginated(Pagination(rows_per_page=3))
+
+    assert len(statements) == 2
+    assert result_cache.stats()["models"]["CachedLot"]["invalidations"] == 1
+
+
+def test_repository_without_cache_always_queries(repository):
+    """Test that caching can be switched off per repository."""
+    repository.cache = None
+    statements = _count_statements(repository.engine)
+
+    repository.get_paginated(Pagination(rows_per_page=3))
+    repository.get_paginated(Pagination(rows_per_page=3))
+
+    assert len(statements) == 2
+
+
+def test_sorting_reuses_cached_count(repository):
+    """Test that a sort change on the same filter only runs the page query."""
+    statements = _count_statements(repository.engine)
+
+    repository.get_paginated(Pagination(rows_per_page=3))
+    items, total = repository.get_paginated(Pagination(rows_per_page=3, sort_by="naam"))
+
+    assert total == 7
+    assert len(statements) == 2
+    assert "count(" not in statements[-1].lower()
+
+
+def test_pagination_total_is_reused_while_filters_match(repository):
+    """Test that the total travels with the pagination until the filter changes."""
+    repository.cache = None
+    statements = _count_statements(repository.engine)
+    pagination = Pagination(rows_per_page=3)
+
+    repository.get_paginated(pagination)
+    assert pagination.total_signature is not None
+    pagination.page = 3
+    items, total = repository.get_paginated(pagination)
+    assert (len(items), total) == (1, 7)
+    assert "count(" not in statements[-1].lower()
+
+    pagination.page = 1
+    items, total = repository.get_paginated(pagination, filter_text="lot 1")
+    assert total == 1
+    assert "count(" in statements[-1].lower()
+
+
+def test_stale_repository_serves_expired_page_without_query(repository, clock):
+    """Test stale-while-revalidate: an expired page is returned at once and flagged."""
+    repository.cache = ResultCache(default_ttl=10, max_stale=60, clock=clock)
+    statements = _count_statements(repository.engine)
+    page = repository.get_paginated(Pagination(rows_per_page=3))
+    assert page.data_age == 0
+    assert not page.served_stale
+
+    clock.now = 25
+    reader = repository.stale()
+    page = reader.get_paginated(Pagination(rows_per_page=3))
+    items, total = page
+    assert ([item.id for item in items], total) == ([1, 2, 3], 7)
+    assert page.served_stale
+    assert page.data_age == 25
+    assert len(statements) == 1
+
+    # Revalidating without accepting stale pages goes to the database
+    page = repository.get_paginated(Pagination(rows_per_page=3))
+    assert not page.served_stale
+    assert len(statements) == 2
+
+    clock.now = 27
+    page = reader.get_paginated(Pagination(rows_per_page=3))
+    assert not page.served_stale
+    assert page.data_age == 2
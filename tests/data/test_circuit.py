@@ -0,0 +1,173 @@
+"""Tests for the Dremio circuit breaker."""
+
+import sqlite3
+import time
+from typing import List, Tuple
+
+import pytest
+from sqlalchemy import event, func
+from sqlalchemy import exc as sa_exc
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+from production_control.data import Pagination
+from production_control.data.cache import ResultCache
+from production_control.data.circuit import CircuitBreaker, CircuitBreakers, is_outage
+from production_control.data.repository import DremioRepository, DremioUnavailableError
+
+
+class Probe:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("connection refused")
+
+
+def test_circuit_opens_after_consecutive_outage_errors():
+    """Test that only consecutive outage errors open the circuit."""
+    breaker = CircuitBreaker("dremio", Probe(), failure_threshold=3, probe_interval=3600)
+    try:
+        breaker.record_failure(TimeoutError())
+        breaker.record_failure(TimeoutError())
+        breaker.record_success()
+        breaker.record_failure(TimeoutError())
+        breaker.record_failure(TimeoutError())
+        assert breaker.allow()
+
+        breaker.record_failure(TimeoutError())
+        assert breaker.is_open
+        assert not breaker.allow()
+        assert breaker.stats()["rejected"] == 1
+    finally:
+        breaker.stop()
+
+
+def test_query_errors_are_not_outages():
+    """Test that errors in a query itself do not count against Dremio."""
+    assert is_outage(TimeoutError())
+    assert is_outage(ConnectionResetError())
+    assert not is_outage(ValueError("unknown column"))
+    assert not is_outage(sa_exc.OperationalError("SELECT", {}, sqlite3.OperationalError("syntax")))
+    assert is_outage(sa_exc.OperationalError("SELECT", {}, ConnectionResetError()))
+
+
+def test_background_probe_closes_the_circuit():
+    """Test that the circuit closes once a probe succeeds, without any query."""
+    probe = Probe(failures=2)
+    breaker = CircuitBreaker("dremio", probe, failure_threshold=1, probe_interval=0.01)
+    breaker.record_failure(TimeoutError())
+    assert breaker.is_open
+
+    deadline = time.monotonic() + 5
+    while breaker.is_open and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not breaker.is_open
+    assert probe.calls == 3
+    assert breaker.stats()["opened"] == 1
+
+
+def test_zero_failures_disables_breakers(monkeypatch):
+    """Test that VINEAPP_DB_CIRCUIT_FAILURES=0 turns the breakers off."""
+    monkeypatch.setenv("VINEAPP_DB_CIRCUIT_FAILURES", "0")
+    assert CircuitBreakers.from_env().for_engine(create_engine("sqlite://")) is None
+
+
+class GuardedLot(SQLModel, table=True):
+    """Small stand-in for a Dremio view."""
+
+    __tablename__ = "guarded_lots"
+
+    id: int = Field(primary_key=True)
+    naam: str
+
+
+class GuardedLotRepository(DremioRepository[GuardedLot]):
+    def __init__(self, connection):
+        super().__init__(GuardedLot, connection)
+
+    def get_paginated(self, pagination: Pagination) -> Tuple[List[GuardedLot], int]:
+        page, items_per_page, sort_by, descending = self._validate_pagination(pagination=pagination)
+        with Session(self.engine) as session:
+            return self._execute_paginated_query(
+                session,
+                select(GuardedLot),
+                select(func.count(GuardedLot.id)),
+                page,
+                items_per_page,
+                sort_by=sort_by,
+                descending=descending,
+            )
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def outage(tmp_path):
+    """Repository over a SQLite table, and a switch making every query time out."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'lots.db'}")
+    GuardedLot.__table__.create(engine)
+    with Session(engine) as session:
+        session.add_all(GuardedLot(id=i, naam=f"lot {i}") for i in range(1, 6))
+        session.commit()
+    state = {"down": False, "queries": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def hang(*args):
+        state["queries"] += 1
+        if state["down"]:
+            raise TimeoutError("deadline exceeded")
+
+    repository = GuardedLotRepository(engine)
+    repository.snapshots = None
+    repository.search_indexes = None
+    repository.single_flight = None
+    repository.cache = ResultCache(clock=Clock())
+    repository.circuits = CircuitBreakers(failure_threshold=1, probe_interval=3600)
+    yield repository, state
+    repository.circuits.stop()
+
+
+def test_open_circuit_serves_last_good_page(outage):
+    """Test that a page loaded before the outage is shown, flagged as stale."""
+    repository, state = outage
+    page = repository.get_paginated(Pagination(rows_per_page=3))
+    assert not page.served_stale
+
+    repository.cache._clock.now += 120
+    state["down"] = True
+    stale = repository.get_paginated(Pagination(rows_per_page=3))
+    assert [item.id for item in stale.items] == [item.id for item in page.items]
+    assert stale.total == page.total == 5
+    assert stale.served_stale
+    assert stale.data_age == 120
+
+    # The circuit is open now: the page comes from the cache without a query
+    queries = state["queries"]
+    assert repository.get_paginated(Pagination(rows_per_page=3)).served_stale
+    assert state["queries"] == queries
+
+
+def test_open_circuit_fails_fast_without_retained_result(outage):
+    """Test that without a retained result, queries fail at once until a probe succeeds."""
+    repository, state = outage
+    state["down"] = True
+    with pytest.raises(DremioUnavailableError):
+        repository.get_by_ids([1])
+    queries = state["queries"]
+    with pytest.raises(DremioUnavailableError):
+        repository.get_paginated(Pagination(rows_per_page=3))
+    assert state["queries"] == queries
+
+    state["down"] = False
+    breaker = repository.circuits.for_engine(repository.engine)
+    assert breaker.probe_now()
+    assert repository.get_by_ids([1])[1].naam == "lot 1"
@@ -0,0 +1,111 @@
+"""Tests for running repository queries off the event loop."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from production_control.data.executor import run_in_pool, shutdown_executor
+from production_control.data.repository import DremioRepository, QueryTimeoutError
+from production_control.products.models import Product
+
+
+class SlowRepository(DremioRepository[Product]):
+    """Repository whose queries record their thread and take `delay` seconds."""
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(Product, "dremio+flight://mock:32010/dremio")
+        self.delay = delay
+        self.threads = []
+        self.calls = []
+
+    def get_by_id(self, id):
+        self.threads.append(threading.current_thread().name)
+        self.calls.append(id)
+        time.sleep(self.delay)
+        return None if id < 0 else Product(id=id, name=f"Product {id}")
+
+    def get_by_ids(self, ids):
+        return {id: record for id in ids if (record := self.get_by_id(id)) is not None}
+
+    def get_paginated(self, page: int = 1, items_per_page: int = 10):
+        self.threads.append(threading.current_thread().name)
+        return [], page * items_per_page
+
+
+@pytest.fixture(autouse=True)
+def fresh_executor(monkeypatch):
+    """Give every test its own two-worker pool."""
+    monkeypatch.setenv("VINEAPP_DB_WORKERS", "2")
+    shutdown_executor()
+    yield
+    shutdown_executor(wait=True)
+
+
+async def test_async_methods_run_on_query_pool():
+    """Test that queries run on the query pool, not the event loop thread."""
+    repository = SlowRepository()
+
+    assert await repository.aget_paginated(page=2, items_per_page=5) == ([], 10)
+    product = await repository.aget_by_id(3)
+
+    assert product.name == "Product 3"
+    assert all(name.startswith("dremio-query") for name in repository.threads)
+
+
+async def test_aget_by_ids_runs_bulk_lookup_on_query_pool():
+    """Test that the bulk lookup is delegated to get_by_ids on a worker thread."""
+    repository = SlowRepository()
+
+    records = await repository.aget_by_ids(iter([1, 2, -1]))
+
+    assert sorted(records) == [1, 2]
+    assert all(name.startswith("dremio-query") for name in repository.threads)
+
+
+async def test_event_loop_stays_responsive_during_query():
+    """Test that other coroutines keep running while a query blocks its worker."""
+    repository = SlowRepository(delay=0.2)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    await repository.aget_by_id(1)
+    ticker.cancel()
+
+    assert ticks > 5
+
+
+async def test_timeout_raises_query_timeout_error():
+    """Test that a slow query raises a repository error after the timeout."""
+    repository = SlowRepository(delay=0.3)
+
+    with pytest.raises(QueryTimeoutError):
+        await repository.aget_by_id(1, timeout=0.05)
+
+
+async def test_cancelling_drops_queued_query():
+    """Test that a cancelled query that has not started never runs."""
+    repository = SlowRepository(delay=0.2)
+    busy = [asyncio.create_task(repository.aget_by_id(i)) for i in (1, 2)]
+    await asyncio.sleep(0.05)
+
+    queued = asyncio.create_task(repository.aget_by_id(3))
+    await asyncio.sleep(0)
+    queued.cancel()
+    await asyncio.gather(*busy)
+    await asyncio.sleep(0.05)
+
+    assert queued.cancelled()
+    assert 3 not in repository.calls
+
+
+async def test_run_in_pool_passes_arguments():
+    """Test the generic helper for blocking calls that are not repository lookups."""
+    assert await run_in_pool(divmod, 7, 2) == (3, 1)
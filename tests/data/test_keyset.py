@@ -0,0 +1,192 @@
+"""Tests for keyset pagination."""
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+import pytest
+from sqlalchemy import Select, event, func
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+from production_control.data import Pagination
+from production_control.data.keyset import Cursor, sql_literal
+from production_control.data.repository import DremioRepository
+from production_control.vloerplan.repositories import Vloerplan19cmRepository
+
+
+class KeysetLot(SQLModel, table=True):
+    """Small stand-in for a Dremio view."""
+
+    __tablename__ = "keyset_lots"
+
+    id: int = Field(primary_key=True)
+    naam: str
+    score: Optional[int] = None
+
+
+class KeysetLotRepository(DremioRepository[KeysetLot]):
+    count_in_page_query = True
+    search_fields = ["naam"]
+
+    def __init__(self, connection):
+        super().__init__(KeysetLot, connection)
+
+    def _apply_default_sorting(self, query: Select) -> Select:
+        return query.order_by(self.model.score.desc(), self.model.naam)
+
+    def get_paginated(
+        self, pagination: Pagination, filter_text: Optional[str] = None
+    ) -> Tuple[List[KeysetLot], int]:
+        page, items_per_page, sort_by, descending = self._validate_pagination(pagination=pagination)
+        with Session(self.engine) as session:
+            return self._execute_paginated_query(
+                session,
+                select(KeysetLot),
+                select(func.count(KeysetLot.id)),
+                page,
+                items_per_page,
+                filter_text,
+                self.search_fields,
+                sort_by,
+                descending,
+                pagination=pagination,
+            )
+
+
+@pytest.fixture
+def repository():
+    """Repository over an in-memory SQLite table with NULLs and duplicate sort values."""
+    engine = create_engine("sqlite://")
+    KeysetLot.__table__.create(engine)
+    with Session(engine) as session:
+        for i in range(1, 24):
+            score = None if i % 5 == 0 else i % 4
+            session.add(KeysetLot(id=i, naam=f"lot {i % 3}", score=score))
+        session.commit()
+    return KeysetLotRepository(engine)
+
+
+def _all_ids(repository, pagination):
+    """Ids in display order, read in one go."""
+    everything = Pagination(rows_per_page=0, sort_by=pagination.sort_by)
+    everything.descending = pagination.descending
+    items, _ = repository.get_paginated(everything)
+    return [item.id for item in items]
+
+
+@pytest.mark.parametrize(
+    "sort_by,descending", [(None, False), ("naam", False), ("score", True), ("score", False)]
+)
+def test_paging_forward_and_back_matches_offset_order(repository, sort_by, descending):
+    """Test that seeking page by page returns exactly the rows OFFSET paging would."""
+    pagination = Pagination(rows_per_page=4, sort_by=sort_by, descending=descending)
+    expected = _all_ids(repository, pagination)
+
+    seen = []
+    for page in range(1, 7):
+        pagination.page = page
+        items, total = repository.get_paginated(pagination)
+        assert total == 23
+        seen.extend(item.id for item in items)
+    assert seen == expected
+
+    for page in range(5, 0, -1):
+        pagination.page = page
+        items, _ = repository.get_paginated(pagination)
+        assert [item.id for item in items] == expected[(page - 1) * 4 : page * 4]
+
+
+def test_next_page_uses_seek_instead_of_offset(repository):
+    """Test that the next page seeks past the cursor instead of skipping rows."""
+    statements = []
+    engine = repository.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    pagination = Pagination(rows_per_page=5)
+    repository.get_paginated(pagination)
+    assert pagination.cursor is not None
+
+    pagination.page = 2
+    repository.get_paginated(pagination)
+    assert "WHERE" in statements[-1]
+    assert "OFFSET 5" not in statements[-1]
+
+    # Jumping ahead has no cursor to seek from and falls back to OFFSET.
+    pagination.page = 4
+    repository.get_paginated(pagination)
+    assert "WHERE" not in statements[-1]
+    assert "OFFSET 15" in statements[-1]
+
+
+def test_page_and_total_come_from_one_query(repository):
+    """Test that a list page is a single round trip, also when seeking."""
+    statements = []
+
+    @event.listens_for(repository.engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    pagination = Pagination(rows_per_page=5)
+    for page in (1, 2, 5):
+        pagination.page = page
+        items, total = repository.get_paginated(pagination)
+        assert total == 23
+    assert len(items) == 3
+    assert len(statements) == 3
+
+
+def test_empty_page_falls_back_to_count_query(repository):
+    """Test that the total is still reported for a page past the end."""
+    items, total = repository.get_paginated(Pagination(page=10, rows_per_page=5))
+    assert items == []
+    assert total == 23
+
+    items, total = repository.get_paginated(Pagination(rows_per_page=5), filter_text="nothing")
+    assert items == []
+    assert total == 0
+
+
+def test_cursor_is_ignored_after_filter_change(repository):
+    """Test that a cursor from another filter is not used to seek."""
+    pagination = Pagination(rows_per_page=3)
+    repository.get_paginated(pagination)
+    pagination.page = 2
+
+    items, total = repository.get_paginated(pagination, filter_text="lot 1")
+
+    assert total == 8
+    assert all(item.naam == "lot 1" for item in items)
+    assert len(items) == 3
+
+
+def test_offset_fallback_for_converted_columns():
+    """Test that sorting on a TIMESTAMP-as-date column cannot be sought on."""
+    repository = Vloerplan19cmRepository(create_engine("dremio+flight://mock:32010/dremio"))
+    assert repository._keyset_sort_key(None, False) is None
+    assert repository._keyset_sort_key("product_naam", False) is not None
+
+
+def test_cursor_round_trip():
+    """Test that cursors survive encoding with typed values."""
+    cursor = Cursor(
+        signature="abc",
+        page=3,
+        first=[date(2025, 1, 2), None, Decimal("1.5"), 2.5, "x"],
+        last=[datetime(2025, 1, 2, 3, 4), True, 7],
+    )
+    assert Cursor.decode(cursor.encode()) == cursor
+    assert Cursor.decode("not a cursor") is None
+
+
+def test_sql_literal():
+    """Test rendering of seek values for Dremio."""
+    assert sql_literal(None) == "NULL"
+    assert sql_literal(12) == "12"
+    assert sql_literal("O'Brien") == "'O''Brien'"
+    assert sql_literal(date(2025, 1, 2)) == "DATE '2025-01-02'"
+    assert sql_literal(datetime(2025, 1, 2, 3, 4, 5)) == "TIMESTAMP '2025-01-02 03:04:05.000'"
+    with pytest.raises(TypeError):
+        sql_literal(object())
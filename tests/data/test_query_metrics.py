@@ -0,0 +1,190 @@
+"""Tests for query timings and the slow-query log."""
+
+import json
+from typing import List, Optional, Tuple
+
+import pytest
+from sqlalchemy import func
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+from production_control.data import Pagination
+from production_control.data.api import query_stats
+from production_control.data.cache import ResultCache
+from production_control.data.executor import QueryCancelledError
+from production_control.data.query_metrics import QueryMetrics, QuerySample
+from production_control.data.repository import DremioRepository
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def group(metrics, kind, cache=None):
+    """The snapshot entry of one query kind (and cache outcome)."""
+    matches = [
+        entry
+        for entry in metrics.snapshot()["groups"]
+        if entry["kind"] == kind and cache in (None, entry["cache"])
+    ]
+    assert len(matches) == 1, matches
+    return matches[0]
+
+
+def test_percentiles_come_from_the_histogram():
+    """Test that percentiles are bucket bounds, capped by the slowest query."""
+    metrics = QueryMetrics(slow_seconds=60)
+    for ms in [2] * 90 + [40] * 9 + [900]:
+        metrics.record(QuerySample("Lot", "page", rows=10), ms / 1000)
+
+    page = group(metrics, "page")
+    assert page["count"] == 100
+    assert page["rows"] == 1000
+    assert page["max_ms"] == 900
+    assert 2 <= page["p50_ms"] <= 2 * 2**0.5
+    assert page["p90_ms"] == page["p50_ms"]
+    assert 40 <= page["p95_ms"] <= 40 * 2**0.5
+    assert page["p99_ms"] == page["p95_ms"]
+    assert page["mean_ms"] == pytest.approx((90 * 2 + 9 * 40 + 900) / 100)
+
+
+def test_failed_queries_are_counted_as_errors():
+    """Test that a query raising is timed and counted as an error."""
+    clock = Clock()
+    metrics = QueryMetrics(clock=clock)
+
+    with pytest.raises(RuntimeError):
+        with metrics.measure("Lot", "by_id"):
+            clock.now += 0.25
+            raise RuntimeError("connection reset")
+
+    by_id = group(metrics, "by_id")
+    assert (by_id["count"], by_id["errors"], by_id["max_ms"]) == (1, 1, 250)
+
+
+def test_cancelled_queries_and_loads_are_counted_apart(tmp_path):
+    """Test that abandoned queries are neither errors nor slow, and superseded loads are counted."""
+    clock = Clock()
+    log = tmp_path / "slow.jsonl"
+    metrics = QueryMetrics(slow_seconds=1.0, slow_log=log, clock=clock)
+
+    with pytest.raises(QueryCancelledError):
+        with metrics.measure("Lot", "page"):
+            clock.now += 5
+            raise QueryCancelledError()
+    metrics.record_cancelled_load("Lot")
+    metrics.record_cancelled_load("Lot")
+
+    page = group(metrics, "page")
+    assert (page["count"], page["errors"], page["cancelled"]) == (0, 0, 1)
+    assert metrics.snapshot()["cancelled_loads"] == {"Lot": 2}
+    assert not log.exists()
+
+
+def test_slow_queries_are_written_to_the_log(tmp_path):
+    """Test that only queries over the threshold end up in the JSON Lines log."""
+    clock = Clock()
+    log = tmp_path / "slow.jsonl"
+    metrics = QueryMetrics(slow_seconds=1.0, slow_log=log, clock=clock)
+
+    with metrics.measure("Lot", "page", cache="miss", sql="SELECT 1") as sample:
+        clock.now += 0.5
+    with metrics.measure("Lot", "page", cache="miss", sql="SELECT 2") as sample:
+        clock.now += 1.5
+        sample.rows = 25
+        sample.bytes = 4096
+
+    entries = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(entries) == 1
+    assert entries[0]["sql"] == "SELECT 2"
+    assert (entries[0]["rows"], entries[0]["bytes"], entries[0]["seconds"]) == (25, 4096, 1.5)
+    assert entries[0]["cache"] == "miss"
+
+
+def test_env_configures_threshold_and_log(monkeypatch, tmp_path):
+    """Test that VINEAPP_SLOW_QUERY_MS and VINEAPP_SLOW_QUERY_LOG are read."""
+    monkeypatch.setenv("VINEAPP_SLOW_QUERY_MS", "250")
+    monkeypatch.setenv("VINEAPP_SLOW_QUERY_LOG", str(tmp_path / "slow.jsonl"))
+    metrics = QueryMetrics.from_env()
+    assert metrics.slow_seconds == 0.25
+    assert metrics.slow_log == tmp_path / "slow.jsonl"
+
+
+class MeteredLot(SQLModel, table=True):
+    """Small stand-in for a Dremio view."""
+
+    __tablename__ = "metered_lots"
+
+    id: int = Field(primary_key=True)
+    naam: str
+
+
+class MeteredLotRepository(DremioRepository[MeteredLot]):
+    def __init__(self, connection):
+        super().__init__(MeteredLot, connection)
+
+    def get_by_id(self, id: int) -> Optional[MeteredLot]:
+        with Session(self.engine) as session, self._measure("by_id") as query:
+            record = session.get(MeteredLot, id)
+            query.rows = int(record is not None)
+            return record
+
+    def get_paginated(self, pagination: Pagination) -> Tuple[List[MeteredLot], int]:
+        page, items_per_page, sort_by, descending = self._validate_pagination(pagination=pagination)
+        with Session(self.engine) as session:
+            return self._execute_paginated_query(
+                session,
+                select(MeteredLot),
+                select(func.count(MeteredLot.id)),
+                page,
+                items_per_page,
+                sort_by=sort_by,
+                descending=descending,
+            )
+
+
+def test_repository_records_queries_and_cache_hits():
+    """Test that a page is recorded as a miss, then as a hit, and lookups with their rows."""
+    engine = create_engine("sqlite://")
+    MeteredLot.__table__.create(engine)
+    with Session(engine) as session:
+        session.add_all(MeteredLot(id=i, naam=f"lot {i}") for i in range(1, 6))
+        session.commit()
+    repository = MeteredLotRepository(engine)
+    repository.snapshots = None
+    repository.search_indexes = None
+    repository.cache = ResultCache()
+    repository.metrics = QueryMetrics()
+
+    for _ in range(2):
+        items, total = repository.get_paginated(Pagination(rows_per_page=3))
+    assert (len(items), total) == (3, 5)
+    repository.get_by_id(2)
+    repository.get_by_id(99)
+
+    metrics = repository.metrics
+    assert group(metrics, "page", "miss")["count"] == 1
+    assert group(metrics, "page", "miss")["rows"] == 3
+    assert group(metrics, "page", "hit")["count"] == 1
+    by_id = group(metrics, "by_id")
+    assert (by_id["model"], by_id["count"], by_id["rows"]) == ("MeteredLot", 2, 1)
+
+
+def test_repository_without_metrics_still_queries():
+    """Test that metrics = None turns recording off."""
+    engine = create_engine("sqlite://")
+    MeteredLot.__table__.create(engine)
+    repository = MeteredLotRepository(engine)
+    repository.metrics = None
+    assert repository.get_by_id(1) is None
+
+
+async def test_endpoint_reports_metrics_and_cache_counters():
+    """Test that the metrics endpoint includes the shared cache counters."""
+    response = await query_stats()
+    assert {"queries", "slow_ms", "groups"} <= set(response)
+    assert {"cache", "single_flight", "sql_templates"} <= set(response)
+    assert "hits" in response["sql_templates"]
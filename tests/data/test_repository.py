@@ -1,8 +1,16 @@
 """Tests for base repository."""
 
 import pytest
+from sqlalchemy import event, func
+from sqlmodel import Field, Session, SQLModel, create_engine, select
 
-from production_control.data.repository import RepositoryError, InvalidParameterError
+from production_control.data import Pagination
+
+from production_control.data.repository import (
+    DremioRepository,
+    InvalidParameterError,
+    RepositoryError,
+)
 
 
 def test_repository_error():
@@ -18,3 +26,167 @@ def test_invalid_parameter_error():
         raise InvalidParameterError("Invalid parameter")
     assert str(exc_info.value) == "Invalid parameter"
     assert isinstance(exc_info.value, RepositoryError)
+
+
+class BulkLot(SQLModel, table=True):
+    """Small stand-in for a Dremio view."""
+
+    __tablename__ = "bulk_lots"
+
+    id: int = Field(primary_key=True)
+    naam: str
+
+
+class BulkLotRepository(DremioRepository[BulkLot]):
+    id_chunk_size = 3
+
+    def __init__(self, connection):
+        super().__init__(BulkLot, connection)
+
+
+@pytest.fixture
+def bulk_repository():
+    """Repository over an in-memory SQLite table with ten lots."""
+    engine = create_engine("sqlite://")
+    BulkLot.__table__.create(engine)
+    with Session(engine) as session:
+        for i in range(1, 11):
+            session.add(BulkLot(id=i, naam=f"lot {i}"))
+        session.commit()
+    return BulkLotRepository(engine)
+
+
+def test_get_by_ids_uses_chunked_in_queries(bulk_repository):
+    """Test that N records are resolved with one IN query per chunk."""
+    statements = []
+
+    @event.listens_for(bulk_repository.engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    records = bulk_repository.get_by_ids([7, 2, 99, 7, 5, 1, "3", None])
+
+    assert list(records) == [7, 2, 5, 1, 3]
+    assert records[5].naam == "lot 5"
+    assert len(statements) == 2
+    assert all(" IN (" in statement for statement in statements)
+
+
+def test_get_by_ids_without_keys_does_not_query(bulk_repository):
+    """Test that an empty lookup returns without a round trip."""
+    assert bulk_repository.get_by_ids([]) == {}
+
+
+class PrefetchLotRepository(BulkLotRepository):
+    def get_by_id(self, id):
+        return self.get_by_ids([id]).get(id)
+
+
+async def test_prefetched_record_is_returned_without_query(tmp_path):
+    """Test that a record loaded ahead of a click is served from the cache."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'lots.db'}")
+    BulkLot.__table__.create(engine)
+    with Session(engine) as session:
+        session.add(BulkLot(id=4, naam="lot 4"))
+        session.commit()
+    repository = PrefetchLotRepository(engine)
+    repository.snapshots = None
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    await repository.aprefetch_by_id(4)
+    await repository.aprefetch_by_id("4")
+    await repository.aprefetch_by_id(99)
+    assert len(statements) == 2
+
+    record = await repository.aget_by_id("4")
+    assert record.naam == "lot 4"
+    assert len(statements) == 2
+
+
+def test_get_by_ids_rejects_malformed_keys(bulk_repository):
+    """Test that keys of the wrong type raise instead of reaching the SQL."""
+    with pytest.raises(InvalidParameterError):
+        bulk_repository.get_by_ids(["1 OR 1=1"])
+
+
+class ProjectedLot(SQLModel, table=True):
+    """Stand-in for a Dremio view with a long column the list does not show."""
+
+    __tablename__ = "projected_lots"
+
+    id: int = Field(primary_key=True)
+    naam: str
+    score: int
+    opmerking: str
+
+
+class ProjectedLotRepository(DremioRepository[ProjectedLot]):
+    def __init__(self, connection):
+        super().__init__(ProjectedLot, connection)
+
+    def _apply_default_sorting(self, query):
+        return query.order_by(self.model.score.desc())
+
+    def get_paginated(self, pagination: Pagination, columns=None):
+        page, items_per_page, sort_by, descending = self._validate_pagination(pagination=pagination)
+        with Session(self.engine) as session:
+            return self._execute_paginated_query(
+                session,
+                select(ProjectedLot),
+                select(func.count(ProjectedLot.id)),
+                page,
+                items_per_page,
+                sort_by=sort_by,
+                descending=descending,
+                pagination=pagination,
+                columns=columns,
+            )
+
+
+@pytest.fixture
+def projected_repository():
+    """Repository over an in-memory SQLite table with twelve lots."""
+    engine = create_engine("sqlite://")
+    ProjectedLot.__table__.create(engine)
+    with Session(engine) as session:
+        for i in range(1, 13):
+            session.add(ProjectedLot(id=i, naam=f"lot {i}", score=i % 4, opmerking="x" * 500))
+        session.commit()
+    return ProjectedLotRepository(engine)
+
+
+def test_projected_page_selects_only_requested_columns(projected_repository):
+    """Test that a list page fetches the shown columns, the key and the sort key only."""
+    statements = []
+
+    @event.listens_for(projected_repository.engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    items, total = projected_repository.get_paginated(Pagination(rows_per_page=5), ["naam"])
+
+    assert total == 12
+    assert items[0] == {"id": 3, "naam": "lot 3", "score": 3}
+    assert "opmerking" not in statements[-1]
+
+
+def test_projected_pages_match_full_pages(projected_repository):
+    """Test that keyset paging over records returns the same rows as over models."""
+    full = Pagination(rows_per_page=5, sort_by="naam")
+    projected = Pagination(rows_per_page=5, sort_by="naam")
+    for page in (1, 2, 3, 2):
+        full.page = projected.page = page
+        items, _ = projected_repository.get_paginated(full)
+        records, total = projected_repository.get_paginated(projected, ["naam"])
+        assert total == 12
+        assert [record["id"] for record in records] == [item.id for item in items]
+
+
+def test_projection_rejects_unknown_columns(projected_repository):
+    """Test that a column that is not on the model raises instead of reaching the SQL."""
+    with pytest.raises(InvalidParameterError):
+        projected_repository.get_paginated(Pagination(), ["naam; DROP TABLE"])
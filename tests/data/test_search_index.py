@@ -0,0 +1,258 @@
+"""Tests for the in-process trigram search index."""
+
+from typing import List, Optional, Tuple
+
+import pytest
+from sqlalchemy import Select, event, func
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+from production_control.data import Pagination
+from production_control.data.cache import ResultCache
+from production_control.data.repository import DremioRepository
+from production_control.data.search_index import SearchIndexes, TrigramIndex
+
+
+class SearchLot(SQLModel, table=True):
+    """Small stand-in for a Dremio view."""
+
+    __tablename__ = "search_lots"
+
+    id: int = Field(primary_key=True)
+    code: str
+    product_naam: Optional[str] = None
+    score: int = 0
+
+
+class SearchLotRepository(DremioRepository[SearchLot]):
+    search_fields = ["code", "product_naam"]
+
+    def __init__(self, connection):
+        super().__init__(SearchLot, connection)
+
+    def _apply_default_sorting(self, query: Select) -> Select:
+        return query.order_by(self.model.score, self.model.code)
+
+    def get_paginated(
+        self,
+        pagination: Pagination,
+        filter_text: Optional[str] = None,
+        min_score: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+    ) -> Tuple[List[SearchLot], int]:
+        page, items_per_page, sort_by, descending = self._validate_pagination(pagination=pagination)
+        query = select(SearchLot)
+        count_stmt = select(func.count(SearchLot.id))
+        if min_score is not None:
+            query = query.where(SearchLot.score >= min_score)
+            count_stmt = count_stmt.where(SearchLot.score >= min_score)
+        with Session(self.engine) as session:
+            return self._execute_paginated_query(
+                session,
+                query,
+                count_stmt,
+                page,
+                items_per_page,
+                filter_text,
+                self.search_fields,
+                sort_by,
+                descending,
+                pagination=pagination,
+                columns=columns,
+            )
+
+
+LOTS = [
+    (1, "P-100", "Lilium Tiny Padhye"),
+    (2, "P-101", "Tulipa Strong Gold"),
+    (3, "P-102", "Lilium Pearl Jennifer"),
+    (4, "P-200", None),
+    (5, "L-300", "Hyacint Lila"),
+]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def statements():
+    return []
+
+
+@pytest.fixture
+def repository(clock, statements):
+    engine = create_engine("sqlite://")
+    SearchLot.__table__.create(engine)
+    with Session(engine) as session:
+        for id, code, naam in LOTS:
+            session.add(SearchLot(id=id, code=code, product_naam=naam, score=6 - id))
+        session.commit()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    repository = SearchLotRepository(engine)
+    repository.cache = None
+    repository.snapshots = None
+    repository.search_indexes = SearchIndexes(ttl=60, clock=clock)
+    return repository
+
+
+def test_search_matches_substrings_case_insensitively():
+    """Test that the index finds the rows a LIKE '%text%' filter would."""
+    index = TrigramIndex((id, (code, naam)) for id, code, naam in LOTS)
+
+    assert sorted(index.search("LILIUM")) == [1, 3]
+    assert sorted(index.search("lil")) == [1, 3, 5]
+    assert sorted(index.search("p-1")) == [1, 2, 3]
+    assert index.search("pearl jen") == [3]
+    assert index.search("lilium gold") == []
+    # Shorter than a trigram: every row is checked
+    assert sorted(index.search("y")) == [1, 5]
+
+
+def test_search_ranks_prefix_and_earlier_fields_first():
+    """Test that rows starting with the text come before rows containing it."""
+    index = TrigramIndex((id, (code, naam)) for id, code, naam in LOTS)
+
+    # L-300 starts with "l"; the Lilium rows only start their second field with it
+    assert index.search("l")[:1] == [5]
+    assert index.search("lil") == [1, 3, 5]
+    assert index.search("100") == [1]
+
+
+def test_text_with_like_wildcards_is_left_to_dremio():
+    """Test that a pattern the index cannot evaluate is not resolved."""
+    index = TrigramIndex((id, (code, naam)) for id, code, naam in LOTS)
+    assert index.search("p_1") is None
+    assert index.search("100%") is None
+
+
+def test_replace_only_reindexes_changed_rows():
+    """Test that a refresh updates, adds and removes rows incrementally."""
+    index = TrigramIndex((id, (code, naam)) for id, code, naam in LOTS)
+
+    rows = [(id, (code, naam)) for id, code, naam in LOTS if id != 4]
+    rows[0] = (1, ("P-100", "Lilium Conca d'Or"))
+    rows.append((6, ("P-600", "Lilium Tiny Padhye")))
+
+    assert index.replace(rows) == (2, 1)
+    assert index.search("padhye") == [6]
+    assert index.search("p-200") == []
+    assert len(index) == 5
+
+
+def test_list_search_fetches_ranked_rows_by_key(repository, statements):
+    """Test that the filter is resolved in process and only the page's rows are queried."""
+    pagination = Pagination(rows_per_page=1)
+    items, total = repository.get_paginated(pagination, filter_text="LIL")
+
+    assert total == 3
+    assert [item.id for item in items] == [1]
+    assert pagination.total_rows == 3
+    assert "LIKE" not in statements[-1]
+    assert "IN (1)" in statements[-1]
+
+    statements.clear()
+    pagination.page = 3
+    items, total = repository.get_paginated(pagination, filter_text="LIL")
+    assert [item.id for item in items] == [5]
+    assert total == 3
+    assert len(statements) == 1
+
+
+def test_list_search_with_columns_returns_records(repository):
+    """Test that ranked pages can be fetched as projected records."""
+    items, total = repository.get_paginated(
+        Pagination(rows_per_page=10), filter_text="lilium", columns=["code"]
+    )
+    assert total == 2
+    assert items == [{"id": 1, "code": "P-100"}, {"id": 3, "code": "P-102"}]
+
+
+def test_sorted_or_filtered_search_uses_key_list(repository, statements):
+    """Test that a user sort order or other filters keep the SQL path with an IN list."""
+    items, total = repository.get_paginated(
+        Pagination(rows_per_page=10, sort_by="code"), filter_text="lil"
+    )
+    assert [item.id for item in items] == [5, 1, 3]
+    assert total == 3
+    assert "IN (1, 3, 5)" in statements[-1]
+    assert "LIKE" not in statements[-1]
+
+    items, total = repository.get_paginated(
+        Pagination(rows_per_page=10), filter_text="lil", min_score=3
+    )
+    assert [item.id for item in items] == [3, 1]
+    assert total == 2
+
+
+def test_non_text_fields_keep_their_like_filter(repository, statements):
+    """Test that only text fields are indexed; Dremio matches numbers and dates with LIKE."""
+    repository.search_fields = ["code", "score"]
+    items, total = repository.get_paginated(Pagination(rows_per_page=10), filter_text="1")
+
+    # Codes P-100, P-101 and P-102 from the index; score 1 of L-300 from LIKE
+    assert sorted(item.id for item in items) == [1, 2, 3, 5]
+    assert total == 4
+    assert "IN (1, 2, 3)" in statements[-1]
+    assert "lower(score) LIKE" in statements[-1]
+    assert "lower(code) LIKE" not in statements[-1]
+
+
+def test_search_without_usable_index_falls_back_to_like(repository, statements):
+    """Test that wildcards, too many keys or too large views are filtered in Dremio."""
+    _, total = repository.get_paginated(Pagination(rows_per_page=10), filter_text="p_1")
+    assert total == 3
+    assert "LIKE" in statements[-1]
+
+    repository.search_indexes.max_keys = 2
+    _, total = repository.get_paginated(
+        Pagination(rows_per_page=10, sort_by="code"), filter_text="lil"
+    )
+    assert total == 3
+    assert "LIKE" in statements[-1]
+
+    repository.search_indexes = SearchIndexes(ttl=60, max_rows=4)
+    _, total = repository.get_paginated(Pagination(rows_per_page=10), filter_text="lil")
+    assert total == 3
+    assert "LIKE" in statements[-1]
+
+
+def test_index_refreshes_after_ttl_and_invalidation(repository, statements, clock):
+    """Test that the index is loaded once and read again when it may be outdated."""
+    repository.get_paginated(Pagination(), filter_text="lil")
+    repository.get_paginated(Pagination(), filter_text="tulip")
+    loads = [
+        statement for statement in statements if "LIMIT" in statement and "IN (" not in statement
+    ]
+    assert len(loads) == 1
+
+    with Session(repository.engine) as session:
+        session.add(SearchLot(id=6, code="P-600", product_naam="Lilium Tiny Padhye"))
+        session.commit()
+    _, total = repository.get_paginated(Pagination(), filter_text="lil")
+    assert total == 3
+
+    cache = ResultCache()
+    cache.add_invalidation_listener(repository.search_indexes.mark_stale)
+    cache.invalidate(SearchLot)
+    _, total = repository.get_paginated(Pagination(), filter_text="lil")
+    assert total == 4
+
+    with Session(repository.engine) as session:
+        session.delete(session.get(SearchLot, 6))
+        session.commit()
+    clock.now += 61
+    _, total = repository.get_paginated(Pagination(), filter_text="lil")
+    assert total == 3
@@ -0,0 +1,175 @@
+"""Tests for coalescing identical concurrent queries."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import pytest
+from sqlalchemy import event, func
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+from production_control.data import Pagination
+from production_control.data.executor import QueryCancelledError
+from production_control.data.repository import DremioRepository
+from production_control.data.singleflight import SingleFlight
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll until `condition()` holds; fails the test after `timeout` seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.001)
+
+
+def test_concurrent_identical_calls_share_one_run():
+    """Test that callers arriving while a call runs get its result without running it."""
+    flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def call():
+        runs.append(1)
+        release.wait(5)
+        return ("page", 3)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, "Lot", "sql", call) for _ in range(4)]
+        wait_for(lambda: flight.stats()["coalesced"] == 3)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == [("page", 3)] * 4
+    assert len(runs) == 1
+    assert flight.stats()["groups"]["Lot"] == {"calls": 1, "coalesced": 3, "errors": 0}
+    assert flight.in_flight() == 0
+
+
+def test_error_is_raised_in_every_waiting_caller():
+    """Test that a failing call fails the callers that joined it as well."""
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def call():
+        release.wait(5)
+        raise RuntimeError("Dremio unavailable")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(flight.do, "Lot", "sql", call) for _ in range(2)]
+        wait_for(lambda: flight.stats()["coalesced"] == 1)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="unavailable"):
+                future.result()
+
+    assert flight.stats()["errors"] == 1
+    # Nothing is remembered: the next call runs again
+    assert flight.do("Lot", "sql", lambda: 42) == 42
+
+
+def test_cancelled_call_is_run_again_for_waiting_callers():
+    """Test that callers that joined a call its own caller abandoned still get a result."""
+    flight = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def call():
+        runs.append(1)
+        if len(runs) == 1:
+            release.wait(5)
+            raise QueryCancelledError("caller left")
+        return ("page", 3)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "Lot", "sql", call)
+        wait_for(lambda: runs)
+        follower = pool.submit(flight.do, "Lot", "sql", call)
+        wait_for(lambda: flight.stats()["coalesced"] == 1)
+        release.set()
+        with pytest.raises(QueryCancelledError):
+            leader.result()
+        assert follower.result() == ("page", 3)
+
+    assert len(runs) == 2
+    assert flight.stats()["errors"] == 0
+
+
+def test_different_keys_and_sequential_calls_are_not_coalesced():
+    """Test that only calls overlapping in time with the same key are shared."""
+    flight = SingleFlight()
+    assert flight.do("Lot", "a", lambda: 1) == 1
+    assert flight.do("Lot", "a", lambda: 2) == 2
+    assert flight.do("Lot", "b", lambda: 3) == 3
+    assert flight.stats()["calls"] == 3
+    assert flight.stats()["coalesced"] == 0
+
+
+class FlightLot(SQLModel, table=True):
+    """Small stand-in for a Dremio view."""
+
+    __tablename__ = "flight_lots"
+
+    id: int = Field(primary_key=True)
+    naam: str
+
+
+class FlightLotRepository(DremioRepository[FlightLot]):
+    count_in_page_query = True
+    search_fields = ["naam"]
+
+    def __init__(self, connection):
+        super().__init__(FlightLot, connection)
+
+    def get_paginated(
+        self, pagination: Pagination, filter_text: Optional[str] = None
+    ) -> Tuple[List[FlightLot], int]:
+        page, items_per_page, sort_by, descending = self._validate_pagination(pagination=pagination)
+        with Session(self.engine) as session:
+            return self._execute_paginated_query(
+                session,
+                select(FlightLot),
+                select(func.count(FlightLot.id)),
+                page,
+                items_per_page,
+                filter_text,
+                self.search_fields,
+                sort_by,
+                descending,
+                pagination=pagination,
+            )
+
+
+def test_repository_coalesces_identical_page_loads(tmp_path):
+    """Test that tablets opening the same page at once cause a single Dremio query."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'lots.db'}")
+    FlightLot.__table__.create(engine)
+    with Session(engine) as session:
+        session.add_all(FlightLot(id=i, naam=f"lot {i}") for i in range(1, 8))
+        session.commit()
+
+    repository = FlightLotRepository(engine)
+    repository.cache = None
+    repository.snapshots = None
+    repository.search_indexes = None
+    repository.single_flight = SingleFlight()
+
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def hold(conn, cursor, statement, *args):
+        # Keep the first query in flight until the other requests have joined it
+        statements.append(statement)
+        wait_for(lambda: repository.single_flight.stats()["coalesced"] == 4)
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [
+            pool.submit(repository.get_paginated, Pagination(rows_per_page=3)) for _ in range(5)
+        ]
+        results = [future.result() for future in futures]
+
+    assert len(statements) == 1
+    for items, total in results:
+        assert total == 7
+        assert [item.id for item in items] == [1, 2, 3]
+    assert repository.single_flight.stats()["groups"]["FlightLot"]["coalesced"] == 4
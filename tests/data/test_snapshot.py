@@ -0,0 +1,256 @@
+"""Tests for the local snapshot store."""
+
+import sqlite3
+import time
+from datetime import date, datetime
+
+import pyarrow as pa
+import pytest
+from sqlalchemy import exc as sa_exc
+
+from production_control.data import Pagination
+from production_control.data import engine as engine_settings
+from production_control.data.cache import ResultCache
+from production_control.data.snapshot import SnapshotInfo, SnapshotStore
+from production_control.potting_lots.models import PottingLot
+from production_control.potting_lots.repositories import PottingLotRepository
+from production_control.products.models import Product
+from production_control.vloerplan.models import Vloerplan19cm
+from production_control.vloerplan.repositories import Vloerplan19cmRepository
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def vloerplan_table(ids) -> pa.Table:
+    """Vloerplan rows typed the way Dremio returns them over Flight."""
+    return pa.table(
+        {
+            "id": pa.array(ids, pa.int64()),
+            "product_naam": [f"Lilium {i}" for i in ids],
+            "productgroep_naam": ["Oriental"] * len(ids),
+            "klant_code": [f"K{i}" for i in ids],
+            "tuin_nr_plan": pa.array([None if i % 2 else float(i) for i in ids], pa.float64()),
+            "tuin_nr_olsthoorn": pa.array([float(i) for i in ids], pa.float64()),
+            "datum_oppot_plan": pa.array(
+                [datetime(2025, 3, i, 14) for i in ids], pa.timestamp("ms")
+            ),
+            "datum_uit_cel_plan_opm": pa.array([None] * len(ids), pa.timestamp("ms")),
+            "opmerking": [None] * len(ids),
+        }
+    )
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    store = SnapshotStore(tmp_path / "snapshots", max_age=600, clock=clock)
+    yield store
+    store.dispose()
+
+
+@pytest.fixture
+def repository(flight_server, flight_engine, store):
+    flight_server.table = vloerplan_table([1, 2, 3, 4])
+    store.refresh(Vloerplan19cm, flight_engine)
+    repository = Vloerplan19cmRepository(flight_engine)
+    repository.snapshots = store
+    repository.cache = None
+    return repository
+
+
+def test_refresh_records_snapshot_info(repository, store, clock):
+    """Test that a refresh stores the rows and when they were taken."""
+    info = store.info(Vloerplan19cm)
+    assert info.row_count == 4
+    assert info.taken_at == clock.now
+    assert store.path(Vloerplan19cm).name == "Productie.Plan.vloerplan_19cm.sqlite"
+
+    clock.now += 30
+    assert repository.snapshot_age() == 30
+
+
+def test_list_and_search_are_served_from_snapshot(repository, flight_server):
+    """Test that list pages, search and details do not query Dremio."""
+    queries = len(flight_server.queries)
+
+    items, total = repository.get_paginated(pagination=Pagination(rows_per_page=2, sort_by="id"))
+    assert total == 4
+    assert [item.id for item in items] == [1, 2]
+    assert items[0].datum_oppot_plan == date(2025, 3, 1)
+    assert items[0].tuin_nr_plan is None
+    assert items[1].tuin_nr_plan == 2
+
+    _, total = repository.get_paginated(pagination=Pagination(), filter_text="lilium 3")
+    assert total == 1
+    assert repository.get_by_id(4).klant_code == "K4"
+
+    assert len(flight_server.queries) == queries
+
+
+def test_old_snapshot_falls_back_to_dremio(repository, flight_server, clock):
+    """Test that reads go live once the snapshot is older than the maximum age."""
+    clock.now += 601
+    queries = len(flight_server.queries)
+
+    repository.get_by_id(1)
+
+    assert repository.snapshot_age() is None
+    assert len(flight_server.queries) == queries + 1
+
+
+def test_call_stays_on_the_engine_it_started_on(repository, store, flight_server, monkeypatch):
+    """Test that a snapshot ageing out during a call does not switch engines halfway."""
+    engine_for = store.engine_for
+    picks = []
+
+    def ages_out(model, max_age=None):
+        picks.append(model)
+        return engine_for(model, max_age) if len(picks) == 1 else None
+
+    monkeypatch.setattr(store, "engine_for", ages_out)
+    queries = len(flight_server.queries)
+
+    items, total = repository.get_paginated(pagination=Pagination(rows_per_page=2, sort_by="id"))
+
+    assert total == 4
+    assert [item.id for item in items] == [1, 2]
+    assert len(flight_server.queries) == queries
+
+
+def test_snapshot_errors_are_not_reported_as_dremio_outages(repository, store):
+    """Test that a query failing on a snapshot raises its own error, not "Dremio unavailable"."""
+    with sqlite3.connect(store.path(Vloerplan19cm)) as connection:
+        connection.execute("DROP TABLE vloerplan_19cm")
+
+    with pytest.raises(sa_exc.OperationalError, match="no such table"):
+        repository.get_paginated(pagination=Pagination())
+
+
+def test_live_repository_always_reads_dremio(repository, flight_server):
+    """Test that reads that must be current can bypass the snapshot."""
+    queries = len(flight_server.queries)
+    repository.live().get_by_id(1)
+    assert len(flight_server.queries) == queries + 1
+    assert repository.snapshot_age() is not None
+
+
+def test_invalidation_marks_snapshot_stale_until_next_refresh(
+    repository, store, flight_engine, clock
+):
+    """Test that a write to the source system is not hidden by the snapshot."""
+    cache = ResultCache()
+    cache.add_invalidation_listener(store.mark_stale)
+
+    clock.now += 5
+    cache.invalidate(Vloerplan19cm)
+    assert repository.snapshot_age() is None
+
+    clock.now += 5
+    store.refresh(Vloerplan19cm, flight_engine)
+    assert repository.snapshot_age() == 0
+
+
+async def test_record_missing_from_snapshot_is_read_live(repository, flight_server):
+    """Test that a record created after the snapshot is still found."""
+    flight_server.table = vloerplan_table([5])
+
+    record = await repository.aget_by_id(5)
+    assert record.id == 5
+
+    records = repository.get_by_ids([1, 5])
+    assert list(records) == [1, 5]
+
+
+def test_refresh_all_continues_after_failure(store, flight_server, flight_engine):
+    """Test that one view failing to copy does not stop the others."""
+    # The products query gets vloerplan columns back, so its required name is missing.
+    flight_server.table = vloerplan_table([1])
+
+    results = store.refresh_all(flight_engine, [Product, Vloerplan19cm])
+
+    assert isinstance(results["Product"], Exception)
+    assert isinstance(results["Vloerplan19cm"], SnapshotInfo)
+    assert store.info(Product) is None
+
+
+def test_snapshot_refreshed_by_other_process_is_picked_up(
+    repository, store, flight_server, flight_engine, clock
+):
+    """Test that a snapshot file replaced by e.g. the CLI is read on the next query."""
+    repository.get_paginated(pagination=Pagination())
+    clock.now += 10
+    flight_server.table = vloerplan_table([1, 2, 3, 4, 5])
+    other = SnapshotStore(store.directory, clock=clock)
+    other.refresh(Vloerplan19cm, flight_engine)
+    other.dispose()
+
+    _, total = repository.get_paginated(pagination=Pagination())
+    assert total == 5
+    assert store.info(Vloerplan19cm).row_count == 5
+
+
+def test_list_page_columns_keep_their_types_on_a_snapshot(repository, flight_server):
+    """Test that dates read from a snapshot through the Arrow path are dates, not text."""
+    queries = len(flight_server.queries)
+
+    items, _ = repository.get_paginated(
+        pagination=Pagination(rows_per_page=2, sort_by="id"),
+        columns=["product_naam", "datum_oppot_plan", "datum_uit_cel_plan_opm"],
+    )
+
+    assert items[0]["datum_oppot_plan"] == date(2025, 3, 1)
+    assert items[0]["datum_uit_cel_plan_opm"] is None
+    assert len(flight_server.queries) == queries
+
+
+def test_pages_past_the_first_seek_on_a_snapshot_date(store, flight_server, flight_engine):
+    """Test that the keyset cursor of a date sort key renders as SQLite understands it."""
+    flight_server.table = pa.table(
+        {
+            "id": pa.array(range(1, 6), pa.int64()),
+            "naam": [f"Lilium {i}" for i in range(1, 6)],
+            "bollen_code": pa.array(range(1, 6), pa.int64()),
+            "oppot_datum": pa.array([date(2025, 3, 6 - i) for i in range(1, 6)], pa.date32()),
+        }
+    )
+    store.refresh(PottingLot, flight_engine)
+    repository = PottingLotRepository(flight_engine)
+    repository.snapshots = store
+    repository.cache = None
+    queries = len(flight_server.queries)
+
+    pagination = Pagination(rows_per_page=2, sort_by="oppot_datum")
+    items, _ = repository.get_paginated(pagination=pagination, columns=["naam", "oppot_datum"])
+    assert [item["id"] for item in items] == [5, 4]
+    pagination.page = 2
+    items, _ = repository.get_paginated(pagination=pagination, columns=["naam", "oppot_datum"])
+    assert [item["id"] for item in items] == [3, 2]
+    assert items[0]["oppot_datum"] == date(2025, 3, 3)
+    assert len(flight_server.queries) == queries
+
+
+def test_refresh_is_not_cut_off_by_the_query_deadline(
+    store, flight_server, flight_engine, monkeypatch
+):
+    """Test that copying a whole view may take longer than the deadline for page loads."""
+    monkeypatch.setattr(engine_settings, "default_query_deadline", lambda: 0.2)
+    flight_server.table = vloerplan_table([1, 2])
+    get_flight_info = flight_server.get_flight_info
+
+    def slow_get_flight_info(context, descriptor):
+        time.sleep(0.5)
+        return get_flight_info(context, descriptor)
+
+    flight_server.get_flight_info = slow_get_flight_info
+
+    assert store.refresh(Vloerplan19cm, flight_engine).row_count == 2
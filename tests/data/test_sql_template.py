@@ -0,0 +1,152 @@
+"""Tests for compiled SQL templates."""
+
+import warnings
+from datetime import date
+from typing import List, Optional, Tuple
+
+import pytest
+from sqlalchemy import Integer, bindparam, create_engine as create_sa_engine, func
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+from production_control.data import Pagination, keyset
+from production_control.data.arrow import compile_sql
+from production_control.data.repository import DremioRepository
+from production_control.data.sql_template import SqlTemplateCache
+
+
+class TemplateLot(SQLModel, table=True):
+    """Small stand-in for a Dremio view."""
+
+    __tablename__ = "template_lots"
+
+    id: int = Field(primary_key=True)
+    naam: str
+    oppot: Optional[date] = None
+
+
+class TemplateLotRepository(DremioRepository[TemplateLot]):
+    search_fields = ["naam"]
+
+    def __init__(self, connection):
+        super().__init__(TemplateLot, connection)
+
+    def get_paginated(
+        self, pagination: Pagination, filter_text: Optional[str] = None
+    ) -> Tuple[List[TemplateLot], int]:
+        page, items_per_page, sort_by, descending = self._validate_pagination(pagination=pagination)
+        with Session(self.engine) as session:
+            return self._execute_paginated_query(
+                session,
+                select(TemplateLot),
+                select(func.count(TemplateLot.id)),
+                page,
+                items_per_page,
+                filter_text,
+                self.search_fields,
+                sort_by,
+                descending,
+                pagination=pagination,
+            )
+
+
+SORT_KEY = [(TemplateLot.naam, False), (TemplateLot.oppot, True), (TemplateLot.id, False)]
+
+
+def page_query(values, keys):
+    query = select(TemplateLot).where(keyset.after(SORT_KEY, values))
+    query = query.where(TemplateLot.id.in_(keyset.literal(keys)))
+    query = query.order_by(*keyset.order_by(SORT_KEY))
+    return query.limit(bindparam("limit", type_=Integer, literal_execute=True))
+
+
+@pytest.fixture(params=["sqlite://", "dremio+flight://localhost:32010/dremio"])
+def engine(request):
+    with warnings.catch_warnings():
+        # The Dremio dialect warns that it doesn't support the statement cache
+        warnings.simplefilter("ignore")
+        return create_sa_engine(request.param)
+
+
+def test_rendered_sql_matches_compiled_sql(engine):
+    """Test that rendering from a template gives the SQL a full compile would."""
+    templates = SqlTemplateCache()
+    for values, keys in [
+        (["O'Brien: lot", date(2025, 1, 2), 7], [1, 2, 3]),
+        (["Lilium", date(2025, 3, 4), 12], [4]),
+    ]:
+        query = page_query(values, keys)
+        rendered = templates.render(engine, query, {"limit": 25})
+        assert rendered == compile_sql(engine, query.params(limit=25))
+
+    assert "'O''Brien: lot'" in templates.render(
+        engine, page_query(["O'Brien: lot", None, 1], [1]), {"limit": 1}
+    )
+    assert templates.stats()["hits"] == 1
+
+
+def test_statement_structure_decides_the_template(engine):
+    """Test that values share a template and a different shape or schema does not."""
+    templates = SqlTemplateCache(max_entries=2)
+    templates.render(engine, page_query(["a", date(2025, 1, 2), 1], [1, 2]), {"limit": 10})
+    templates.render(engine, page_query(["b", date(2025, 1, 3), 2], [3]), {"limit": 50})
+    assert templates.stats()["misses"] == 1
+
+    # A NULL cursor value changes the seek predicate, so the shape differs
+    templates.render(engine, page_query(["b", None, 2], [3]), {"limit": 50})
+    snapshot = engine.execution_options(schema_translate_map={None: "snapshot"})
+    templates.render(snapshot, page_query(["b", None, 2], [3]), {"limit": 50})
+    stats = templates.stats()
+    assert stats["misses"] == 3
+    assert stats["size"] == 2
+
+
+def test_zero_size_compiles_every_statement(engine):
+    """Test that VINEAPP_SQL_TEMPLATE_CACHE_SIZE=0 keeps nothing."""
+    templates = SqlTemplateCache(max_entries=0)
+    query = page_query(["a", None, 1], [1])
+    assert templates.render(engine, query, {"limit": 5}) == compile_sql(
+        engine, query.params(limit=5)
+    )
+    assert templates.stats()["size"] == 0
+
+
+def test_repository_compiles_each_page_shape_once():
+    """Test that paging and searching a list page reuse the templates of earlier requests."""
+    engine = create_engine("sqlite://")
+    TemplateLot.__table__.create(engine)
+    with Session(engine) as session:
+        session.add_all(TemplateLot(id=i, naam=f"lot {i:02}") for i in range(1, 10))
+        session.add(TemplateLot(id=10, naam="O'Brien: lot"))
+        session.commit()
+
+    repository = TemplateLotRepository(engine)
+    repository.cache = None
+    repository.snapshots = None
+    repository.search_indexes = None
+    repository.single_flight = None
+    repository.sql_templates = SqlTemplateCache()
+
+    pagination = Pagination(rows_per_page=3, sort_by="naam")
+    pages = []
+    for page in (1, 2, 3, 4):
+        pagination.page = page
+        items, total = repository.get_paginated(pagination)
+        pages.append([item.id for item in items])
+    assert pages == [[10, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+    assert total == 10
+    pagination = Pagination(rows_per_page=3, sort_by="naam")
+    repository.get_paginated(pagination, filter_text="lot 0")
+    misses = repository.sql_templates.stats()["misses"]
+
+    # Another search text, page size or page of a known shape only renders templates
+    pagination = Pagination(rows_per_page=3, sort_by="naam")
+    items, total = repository.get_paginated(pagination, filter_text="o'brien: l")
+    assert [item.naam for item in items] == ["O'Brien: lot"]
+    assert total == 1
+    pagination = Pagination(rows_per_page=2, sort_by="naam")
+    repository.get_paginated(pagination)
+    pagination.page = 2
+    repository.get_paginated(pagination)
+    stats = repository.sql_templates.stats()
+    assert stats["misses"] == misses
+    assert stats["hits"] > stats["misses"]
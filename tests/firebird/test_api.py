@@ -7,6 +7,7 @@ import pytest
 from fastapi import HTTPException
 
 from production_control.inspectie.commands import UpdateAfwijkingCommand
+from production_control.inspectie.models import InspectieRonde
 from production_control.firebird.api import update_afwijking, health_check
 
 
@@ -153,3 +154,18 @@ async def test_update_afwijking_with_date_string_payload(mock_execute):
         "UPDATE TEELTPL SET AFW_AFLEV = ?, DAT_AFLEV_PLAN = ? WHERE TEELTNR = ?",
         (3, date(2025, 11, 20), "24099"),
     )
+
+
+@pytest.mark.asyncio
+@patch("production_control.firebird.api.invalidate")
+@patch("production_control.firebird.api.execute_firebird_command")
+async def test_update_afwijking_invalidates_cached_inspecties(mock_execute, mock_invalidate):
+    """Test that a successful update drops cached inspectie results."""
+    mock_execute.return_value = {"success": True, "message": "Command executed successfully"}
+
+    command = UpdateAfwijkingCommand(
+        code="24096", new_afwijking=10, new_datum_afleveren=date(2025, 10, 15)
+    )
+    await update_afwijking(command)
+
+    mock_invalidate.assert_called_once_with(InspectieRonde)
@@ -180,6 +180,19 @@ def test_inspectie_repository_next_two_weeks_filter(mock_session_class, mock_eng
     assert isinstance(total, int)
 
 
+def test_inspectie_repository_applies_its_default_filter(mock_engine):
+    """Test that a default filter given to the repository also holds for its copies."""
+    repository = InspectieRepository(mock_engine, default_filter="next_two_weeks").stale()
+
+    with (
+        patch.object(repository, "_apply_date_filter", side_effect=lambda q, *a: q) as date_filter,
+        patch.object(repository, "_execute_paginated_query", return_value=([], 0)),
+    ):
+        repository.get_paginated(page=1, items_per_page=10)
+
+    assert date_filter.call_args.args[-1] == "next_two_weeks"
+
+
 @patch("production_control.inspectie.repositories.Session")
 def test_inspectie_repository_sorting_by_min_baan_first(mock_session_class, mock_engine):
     """Test that sorting prioritizes min_baan field first."""
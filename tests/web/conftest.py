@@ -1,6 +1,6 @@
 """Test configuration and fixtures."""
 
-from typing import Generator
+from typing import Any, Callable, Generator
 import pytest
 from nicegui.testing import User
 
@@ -12,3 +12,26 @@ def user(user: User) -> Generator[User, None, None]:
 
     startup()
     yield user
+
+
+@pytest.fixture
+def async_queries() -> Callable[[Any], Any]:
+    """Route a mocked repository's async query methods to its sync mocks.
+
+    Pages await `aget_paginated`, `aget_by_id` and `aget_by_ids`; tests keep
+    configuring and asserting on `get_paginated`, `get_by_id` and `get_by_ids`.
+    List pages read through `stale()`, which returns the mock itself; the
+    plain tuples it returns are pages of unknown age.
+    """
+
+    def wire(mock_repo: Any) -> Any:
+        for name in ("get_paginated", "get_by_id", "get_by_ids"):
+
+            async def call(*args: Any, _name: str = name, timeout=None, **kwargs: Any) -> Any:
+                return getattr(mock_repo, _name)(*args, **kwargs)
+
+            setattr(mock_repo, f"a{name}", call)
+        mock_repo.stale.return_value = mock_repo
+        return mock_repo
+
+    return wire
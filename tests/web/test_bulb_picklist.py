@@ -9,13 +9,13 @@ from nicegui.testing import User
 from production_control.bulb_picklist.models import BulbPickList
 
 
-async def test_bulb_picklist_page_shows_table(user: User) -> None:
+async def test_bulb_picklist_page_shows_table(user: User, async_queries) -> None:
     """Test that bulb picklist page shows a table with bulb picklist data."""
     with patch(
         "production_control.web.pages.bulb_picklist.BulbPickListRepository"
     ) as mock_repo_class:
         # Given
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         test_date = date(2023, 1, 2)  # Monday of week 1, 2023
         mock_repo.get_paginated.return_value = (
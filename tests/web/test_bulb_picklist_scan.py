@@ -8,12 +8,12 @@ from nicegui.testing import User
 from production_control.bulb_picklist.models import BulbPickList
 
 
-async def test_bulb_picklist_scan_page_exists(user: User) -> None:
+async def test_bulb_picklist_scan_page_exists(user: User, async_queries) -> None:
     """Test that the bulb picklist scan landing page exists."""
     with patch(
         "production_control.web.pages.bulb_picklist.BulbPickListRepository"
     ) as mock_repo_class:
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         test_record = BulbPickList(
             id=1001,
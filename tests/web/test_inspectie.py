@@ -613,3 +613,24 @@ async def test_commit_pending_commands_includes_new_date():
 
     # Storage should be cleared after successful commit
     assert "inspectie_changes" not in mock_storage
+
+
+async def test_compact_view_loads_cards_off_the_event_loop(user, async_queries):
+    """Test that the compact view loads its cards through the async repository API."""
+    from production_control.inspectie.models import InspectieRonde
+
+    with (
+        patch("production_control.web.pages.inspectie.InspectieRepository") as mock_repo_class,
+        patch("production_control.web.pages.inspectie.get_compact_view_state", return_value=True),
+    ):
+        mock_repo = async_queries(Mock())
+        mock_repo_class.return_value = mock_repo
+        mock_repo.aget_paginated = AsyncMock(
+            return_value=([InspectieRonde(code="27014", product_naam="T. Bee 13")], 1)
+        )
+
+        await user.open("/inspectie")
+        await user.should_see("T. Bee 13")
+
+    mock_repo.aget_paginated.assert_awaited_once()
+    mock_repo.get_paginated.assert_not_called()
@@ -9,13 +9,13 @@ from nicegui.testing import User
 from production_control.bulb_picklist.models import BulbPickList
 
 
-async def test_bulb_picklist_has_label_button(user: User) -> None:
+async def test_bulb_picklist_has_label_button(user: User, async_queries) -> None:
     """Test that bulb picklist page has a label button for each row."""
     with patch(
         "production_control.web.pages.bulb_picklist.BulbPickListRepository"
     ) as mock_repo_class:
         # Given
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         test_date = date(2023, 1, 2)  # Monday of week 1, 2023
         mock_repo.get_paginated.return_value = (
@@ -54,13 +54,13 @@ async def test_bulb_picklist_has_label_button(user: User) -> None:
         assert any(col["name"] == "actions" for col in table.columns), "Actions column not found"
 
 
-async def test_label_button_generates_pdf(user: User) -> None:
+async def test_label_button_generates_pdf(user: User, async_queries) -> None:
     """Test that the label button generates a PDF directly."""
     with patch(
         "production_control.web.pages.bulb_picklist.BulbPickListRepository"
     ) as mock_repo_class:
         # Given
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         test_date = date(2023, 1, 2)  # Monday of week 1, 2023
         test_record = BulbPickList(
@@ -84,7 +84,7 @@ async def test_label_button_generates_pdf(user: User) -> None:
         assert table is not None, "Table not found"
 
 
-async def test_label_button_downloads_pdf(user: User) -> None:
+async def test_label_button_downloads_pdf(user: User, async_queries) -> None:
     """Test that the label button downloads a PDF directly."""
     with (
         patch(
@@ -97,7 +97,7 @@ async def test_label_button_downloads_pdf(user: User) -> None:
         patch("production_control.web.pages.bulb_picklist.ui.download"),
     ):
         # Given
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         mock_label_generator = MagicMock()
         mock_label_generator_class.return_value = mock_label_generator
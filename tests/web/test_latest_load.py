@@ -0,0 +1,61 @@
+"""Tests for latest-wins loading of list pages."""
+
+import asyncio
+
+import pytest
+
+from production_control.web.components.latest_load import LatestLoad
+
+
+async def test_newer_load_cancels_the_running_one():
+    """Test that only the newest of overlapping loads finishes and shows its rows."""
+    shown = []
+    cancelled = []
+    loads = LatestLoad(on_cancelled=lambda: cancelled.append(1))
+
+    async def load(rows, delay):
+        await asyncio.sleep(delay)
+        shown.append(rows)
+
+    first = asyncio.create_task(loads.run(lambda: load("a", 0.2)))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(loads.run(lambda: load("b", 0.2)))
+    await asyncio.sleep(0.01)
+    third = asyncio.create_task(loads.run(lambda: load("c", 0.01)))
+
+    assert await asyncio.gather(first, second, third) == [False, False, True]
+    assert shown == ["c"]
+    assert loads.cancelled == len(cancelled) == 2
+    assert not loads.running
+
+
+async def test_synchronous_loads_and_errors():
+    """Test that synchronous loads run and their errors reach the caller."""
+    loads = LatestLoad()
+    shown = []
+    assert await loads.run(lambda: shown.append("rows"))
+    assert shown == ["rows"]
+
+    def failing():
+        raise RuntimeError("Dremio unavailable")
+
+    with pytest.raises(RuntimeError, match="unavailable"):
+        await loads.run(failing)
+    assert loads.cancelled == 0
+
+
+async def test_cancelling_the_caller_cancels_its_load():
+    """Test that a load is not left running when its event handler is cancelled."""
+    loads = LatestLoad()
+    started = asyncio.Event()
+
+    async def load():
+        started.set()
+        await asyncio.sleep(5)
+
+    caller = asyncio.create_task(loads.run(load))
+    await started.wait()
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    assert not loads.running
@@ -5,11 +5,11 @@ from nicegui.testing import User
 from production_control.potting_lots.models import PottingLot
 
 
-async def test_activation_ui_shows_available_lines(user: User) -> None:
+async def test_activation_ui_shows_available_lines(user: User, async_queries) -> None:
     """Test that activation UI shows available lines for activation."""
     with patch("production_control.web.pages.potting_lots.get_repository") as mock_repo_func:
         test_lot = PottingLot(id=1, naam="Test Partij", bollen_code=123, oppot_datum=None)
-        mock_repo = mock_repo_func.return_value
+        mock_repo = async_queries(mock_repo_func.return_value)
         mock_repo.get_by_id.return_value = test_lot
 
         await user.open("/potting-lots/1")
@@ -19,22 +19,22 @@ async def test_activation_ui_shows_available_lines(user: User) -> None:
         await user.should_see("Activeren op Lijn 2")
 
 
-async def test_activation_ui_shows_active_status(user: User) -> None:
+async def test_activation_ui_shows_active_status(user: User, async_queries) -> None:
     """Test that activation UI shows when a lot is active."""
     with patch("production_control.web.pages.potting_lots.get_repository") as mock_repo_func:
         test_lot = PottingLot(id=1, naam="Test Partij", bollen_code=123, oppot_datum=None)
 
-        mock_repo = mock_repo_func.return_value
+        mock_repo = async_queries(mock_repo_func.return_value)
         mock_repo.get_by_id.return_value = test_lot
 
         await user.open("/potting-lots/1")
         await user.should_see("Activeren op Lijn 2")
 
 
-async def test_potting_lots_page_shows_active_header(user: User) -> None:
+async def test_potting_lots_page_shows_active_header(user: User, async_queries) -> None:
     """Test that the potting lots main page shows active lots header."""
     with patch("production_control.web.pages.potting_lots.get_repository") as mock_repo_func:
-        mock_repo = mock_repo_func.return_value
+        mock_repo = async_queries(mock_repo_func.return_value)
         mock_repo.get_paginated.return_value = ([], 0)  # Return empty list for the table
 
         await user.open("/potting-lots")
@@ -44,7 +44,7 @@ async def test_potting_lots_page_shows_active_header(user: User) -> None:
         await user.should_see("2:")
 
 
-async def test_active_lot_details_page_no_active_lot(user: User) -> None:
+async def test_active_lot_details_page_no_active_lot(user: User, async_queries) -> None:
     """Test active lot details page when no lot is active."""
     from production_control.potting_lots.models import PottingLot
     from datetime import date
@@ -55,7 +55,7 @@ async def test_active_lot_details_page_no_active_lot(user: User) -> None:
             PottingLot(id=1, naam="Test Partij 1", bollen_code=123, oppot_datum=date(2024, 3, 15)),
             PottingLot(id=2, naam="Test Partij 2", bollen_code=456, oppot_datum=date(2024, 3, 14)),
         ]
-        mock_repo = mock_repo_func.return_value
+        mock_repo = async_queries(mock_repo_func.return_value)
         mock_repo.get_top_lots.return_value = test_lots
 
         await user.open("/potting-lots/active/1")
@@ -154,7 +154,7 @@ def test_handle_deactivation_function() -> None:
         mock_notify.assert_called_once_with("Geen actieve partij gevonden op deze lijn")
 
 
-async def test_active_lot_header_navigation(user: User) -> None:
+async def test_active_lot_header_navigation(user: User, async_queries) -> None:
     """Test that clicking active lot header navigates to details page."""
     from production_control.potting_lots.models import PottingLot
     from production_control.potting_lots.active_models import ActivePottingLot
@@ -164,7 +164,7 @@ async def test_active_lot_header_navigation(user: User) -> None:
         patch("production_control.web.pages.potting_lots.get_active_service") as mock_service_func,
     ):
 
-        mock_repo = mock_repo_func.return_value
+        mock_repo = async_queries(mock_repo_func.return_value)
         mock_repo.get_paginated.return_value = ([], 0)
 
         # Mock active lot on line 1
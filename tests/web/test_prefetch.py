@@ -0,0 +1,71 @@
+"""Tests for the buffer of list pages loaded ahead of the user."""
+
+from production_control.data.cache import result_cache
+from production_control.web.components.prefetch import PrefetchBuffer, estimate_size
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def rows(count, text="x" * 40):
+    return [{"id": i, "naam": f"{text} {i}"} for i in range(count)]
+
+
+def test_buffer_drops_oldest_pages_to_stay_within_budget():
+    """Test that the byte budget is kept by evicting the pages loaded first."""
+    page_size = estimate_size(rows(10))
+    buffer = PrefetchBuffer(max_bytes=int(page_size * 2.5), clock=Clock())
+
+    assert buffer.put("page 2", rows(10), total=50)
+    assert buffer.put("page 3", rows(10), total=50)
+    assert buffer.put("page 4", rows(10), total=50)
+
+    assert "page 2" not in buffer
+    assert len(buffer) == 2
+    assert buffer.size <= buffer.max_bytes
+    # A page larger than the whole budget is never kept
+    assert not buffer.put("page 5", rows(100), total=500)
+    assert len(buffer) == 2
+
+
+def test_taken_page_restores_pagination_state():
+    """Test that a buffered page is handed out once, with its cursor and total."""
+    clock = Clock()
+    buffer = PrefetchBuffer(clock=clock)
+    buffer.put("page 2", rows(3), total=12, cursor="c2", total_signature="s", data_age=5.0)
+
+    clock.now = 4.0
+    page = buffer.take("page 2")
+    assert page.rows == rows(3)
+    assert (page.total, page.cursor, page.total_signature) == (12, "c2", "s")
+    assert buffer.age(page) == 9.0
+    assert buffer.take("page 2") is None
+    assert buffer.size == 0
+
+
+def test_expired_or_invalidated_pages_are_not_shown():
+    """Test that pages past their max age or older than an invalidation are discarded."""
+    clock = Clock()
+    buffer = PrefetchBuffer(max_age=30, clock=clock)
+
+    buffer.put("page 2", rows(3), total=12)
+    clock.now = 31.0
+    assert buffer.take("page 2") is None
+
+    buffer.put("page 2", rows(3), total=12)
+    result_cache.invalidate()
+    assert buffer.take("page 2") is None
+    assert len(buffer) == 0
+
+
+def test_zero_budget_disables_prefetching(monkeypatch):
+    """Test that VINEAPP_PREFETCH_BUDGET_KB=0 turns the buffer off."""
+    monkeypatch.setenv("VINEAPP_PREFETCH_BUDGET_KB", "0")
+    assert not PrefetchBuffer.from_env().enabled
+    monkeypatch.setenv("VINEAPP_PREFETCH_BUDGET_KB", "64")
+    assert PrefetchBuffer.from_env().max_bytes == 64 * 1024
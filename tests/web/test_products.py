@@ -7,13 +7,16 @@ from nicegui import ui
 
 from production_control.products.models import Product
 from production_control.data import Pagination
+from production_control.data.repository import Page
+from production_control.web.components.model_list_page import describe_data_age
+from production_control.web.components.table_utils import get_list_fields
 
 
-async def test_products_page_shows_table(user: User) -> None:
+async def test_products_page_shows_table(user: User, async_queries) -> None:
     """Test that products page shows a table with product data."""
     with patch("production_control.web.pages.products.ProductRepository") as mock_repo_class:
         # Given
-        mock_repo = Mock()
+        mock_repo = async_queries(Mock())
         mock_repo_class.return_value = mock_repo
         mock_repo.get_paginated.return_value = (
             [
@@ -62,12 +65,12 @@ async def test_products_page_shows_table(user: User) -> None:
         ]
 
 
-async def test_products_page_filtering_calls_repository(user) -> None:
+async def test_products_page_filtering_calls_repository(user, async_queries) -> None:
     """Test that entering a filter value calls the repository with the filter text."""
 
     with patch("production_control.web.pages.products.ProductRepository") as mock_repo_class:
         # Given
-        mock_repo = Mock()
+        mock_repo = async_queries(Mock())
         mock_repo_class.return_value = mock_repo
         mock_repo.get_paginated.return_value = ([], 0)  # Empty initial result
 
@@ -95,15 +98,49 @@ async def test_products_page_filtering_calls_repository(user) -> None:
 
         # Then verify repository was called with filter
         mock_repo.get_paginated.assert_called_with(
-            pagination=mock_repo.get_paginated.call_args.kwargs["pagination"], filter_text="mix"
+            pagination=mock_repo.get_paginated.call_args.kwargs["pagination"],
+            filter_text="mix",
+            columns=get_list_fields(Product),
         )
 
 
-async def test_product_detail_page_shows_product(user: User) -> None:
+async def test_products_page_shows_expired_rows_then_fresh_rows(user: User, async_queries) -> None:
+    """Test that an expired cached page is shown at once and replaced when reloaded."""
+    with patch("production_control.web.pages.products.ProductRepository") as mock_repo_class:
+        # Given a cached page that expired 40 seconds ago
+        old = Product(id=12, name="T. Bee 13", product_group_id=113, product_group_name="oud")
+        new = Product(id=12, name="T. Bee 13", product_group_id=113, product_group_name="nieuw")
+        reader = async_queries(Mock())
+        reader.get_paginated.return_value = Page([old], 1, data_age=40, served_stale=True)
+        mock_repo = async_queries(Mock())
+        mock_repo_class.return_value = mock_repo
+        mock_repo.stale.return_value = reader
+        mock_repo.get_paginated.return_value = Page([new], 1, data_age=0)
+
+        # When
+        await user.open("/products")
+
+        # Then the page is reloaded and the fresh rows replace the old ones
+        await user.should_see("Actueel")
+        table = user.find(ui.table).elements.pop()
+        assert table.rows[0]["product_group_name"] == "nieuw"
+        reader.get_paginated.assert_called_once()
+        mock_repo.get_paginated.assert_called_once()
+
+
+def test_describe_data_age() -> None:
+    """Test the data age indicator text."""
+    assert describe_data_age(None) == ""
+    assert describe_data_age(0.2) == "Actueel"
+    assert describe_data_age(40, refreshing=True) == "Gegevens van 40 s geleden, bijwerken..."
+    assert describe_data_age(150) == "Gegevens van 2 min geleden"
+
+
+async def test_product_detail_page_shows_product(user: User, async_queries) -> None:
     """Test that product detail page shows product information."""
     with patch("production_control.web.pages.products.ProductRepository") as mock_repo_class:
         # Given
-        mock_repo = Mock()
+        mock_repo = async_queries(Mock())
         mock_repo_class.return_value = mock_repo
         test_product = Product(
             id=12,
@@ -123,11 +160,11 @@ async def test_product_detail_page_shows_product(user: User) -> None:
         await user.should_see("← Terug naar Producten")
 
 
-async def test_product_detail_page_handles_invalid_id(user: User) -> None:
+async def test_product_detail_page_handles_invalid_id(user: User, async_queries) -> None:
     """Test that product detail page handles invalid product ID."""
     with patch("production_control.web.pages.products.ProductRepository") as mock_repo_class:
         # Given
-        mock_repo = Mock()
+        mock_repo = async_queries(Mock())
         mock_repo_class.return_value = mock_repo
         mock_repo.get_by_id.return_value = None
 
@@ -0,0 +1,86 @@
+"""Tests for the server-side row store."""
+
+from unittest.mock import AsyncMock, Mock
+
+from production_control.data import Pagination
+from production_control.web.components.row_store import RowStore, row_store
+from production_control.web.components.table_state import ClientStorageTableState
+
+
+def rows(*ids):
+    return [{"id": id, "naam": f"lot {id}"} for id in ids]
+
+
+def test_rows_are_kept_per_table_and_id():
+    """Test that rows come back in the order asked for, separately per table."""
+    store = RowStore()
+    assert store.put("lots", rows(3, 1, 2)) == [3, 1, 2]
+    store.put("picklist", [{"id": 1, "ras": "Tiber"}])
+
+    assert store.rows("lots", [1, 2, 3]) == rows(1, 2, 3)
+    assert store.rows("picklist", [1]) == [{"id": 1, "ras": "Tiber"}]
+    assert store.rows("lots", [4]) == []
+
+
+def test_shared_rows_are_stored_once():
+    """Test that clients showing the same rows share one copy, replaced by the newest."""
+    store = RowStore()
+    store.put("lots", rows(1, 2))
+    store.put("lots", [{"id": 2, "naam": "renamed"}, *rows(3)])
+    assert len(store) == 3
+    assert store.rows("lots", [2]) == [{"id": 2, "naam": "renamed"}]
+
+
+def test_least_recently_shown_rows_are_evicted():
+    """Test that the store stays within its maximum, dropping rows not shown lately."""
+    store = RowStore(max_rows=4)
+    store.put("lots", rows(1, 2, 3))
+    store.rows("lots", [1])
+    store.put("lots", rows(4, 5))
+
+    assert len(store) == 4
+    assert store.rows("lots", [1, 2, 3, 4, 5]) == rows(1, 3, 4, 5)
+    assert store.stats()["evicted"] == 1
+
+
+def test_models_are_kept_with_their_rows():
+    """Test that the typed model is kept with its row, also when the row is shown again."""
+    store = RowStore()
+    lot = object()
+    store.put("lots", rows(1), records=[lot])
+    assert store.record("lots", 1) is lot
+
+    store.put("lots", rows(1))
+    assert store.record("lots", 1) is lot
+    store.put("lots", [{"id": 1, "naam": "renamed"}])
+    assert store.record("lots", 1) is None
+
+
+def test_models_are_kept_for_rows_still_kept():
+    """Test that models loaded later are kept with their rows, but not for dropped rows."""
+    store = RowStore(max_rows=2)
+    store.put("lots", rows(1, 2, 3))
+    store.keep("lots", {2: "lot 2", 1: "lot 1"})
+
+    assert store.record("lots", 2) == "lot 2"
+    assert store.record("lots", 1) is None
+
+
+async def test_label_printing_loads_only_models_not_kept():
+    """Test that rows shown without a model load it once; kept models are reused."""
+    state = ClientStorageTableState(pagination=Pagination(), storage_key="reused_lots")
+    lot = object()
+    state.row_ids = row_store.put(state.storage_key, rows(1, 2, 3), records=[lot, None, None])
+    repository = Mock()
+    repository.aget_by_ids = AsyncMock(return_value={2: "lot 2", 3: "lot 3"})
+    repository.aget_by_id = AsyncMock()
+    try:
+        assert await state.load_records([1, 2, 3], repository) == [lot, "lot 2", "lot 3"]
+        repository.aget_by_ids.assert_awaited_once_with([2, 3])
+
+        assert await state.load_records([1, 2, 3], repository) == [lot, "lot 2", "lot 3"]
+        assert await state.load_record(3, repository) == "lot 3"
+        assert repository.aget_by_ids.await_count == 1
+        repository.aget_by_id.assert_not_awaited()
+    finally:
+        row_store.clear()
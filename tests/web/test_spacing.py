@@ -14,11 +14,11 @@ from production_control.data import Pagination
 from production_control.spacing.models import WijderzetRegistratie
 
 
-async def test_spacing_page_shows_table(user: User) -> None:
+async def test_spacing_page_shows_table(user: User, async_queries) -> None:
     """Test that spacing page shows a table with spacing data."""
     with patch("production_control.web.pages.spacing.SpacingRepository") as mock_repo_class:
         # Given
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         test_date = date(2023, 1, 2)  # Monday of week 1, 2023
         mock_repo.get_paginated.return_value = (
@@ -163,11 +163,11 @@ async def test_spacing_page_shows_table(user: User) -> None:
 
 
 @pytest.mark.skip(reason="Warning filter test is not compatible with the new generic components")
-async def test_spacing_page_warning_filter(user: User) -> None:
+async def test_spacing_page_warning_filter(user: User, async_queries) -> None:
     """Test that warning filter shows only records with warnings."""
     with patch("production_control.web.pages.spacing.SpacingRepository") as mock_repo_class:
         # Given
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         test_date = date(2023, 1, 2)
 
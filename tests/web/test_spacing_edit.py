@@ -7,19 +7,20 @@ from unittest.mock import patch, MagicMock
 from nicegui import ui
 from nicegui.testing import User
 
+from production_control.data.repository import QueryTimeoutError
 from production_control.spacing.models import WijderzetRegistratie
 from production_control.spacing.commands import CorrectSpacingRecord
 from production_control.spacing.optech import OpTechConnectionError
 
 
-async def test_spacing_correction_page_shows_fields(user: User) -> None:
+async def test_spacing_correction_page_shows_fields(user: User, async_queries) -> None:
     """Test that correction page shows correct fields and values."""
     with (
         patch("production_control.web.pages.spacing.SpacingRepository") as mock_repo_class,
         patch("production_control.web.pages.spacing.OpTechClient") as mock_client_class,
     ):
         # Given
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         mock_client = MagicMock()
         mock_client_class.return_value = mock_client
@@ -72,14 +73,14 @@ async def test_spacing_correction_page_shows_fields(user: User) -> None:
         await user.should_see("Annuleren")
 
 
-async def test_spacing_correction_page_saves_changes(user: User) -> None:
+async def test_spacing_correction_page_saves_changes(user: User, async_queries) -> None:
     """Test that correction page saves changes through OpTechClient."""
     with (
         patch("production_control.web.pages.spacing.SpacingRepository") as mock_repo_class,
         patch("production_control.web.pages.spacing.OpTechClient") as mock_client_class,
     ):
         # Given
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         mock_client = MagicMock()
         mock_client_class.return_value = mock_client
@@ -118,14 +119,14 @@ async def test_spacing_correction_page_saves_changes(user: User) -> None:
         assert command.aantal_tafels_na_wdz2 == 20
 
 
-async def test_spacing_correction_page_shows_connection_error(user: User) -> None:
+async def test_spacing_correction_page_shows_connection_error(user: User, async_queries) -> None:
     """Test that correction page shows connection errors."""
     with (
         patch("production_control.web.pages.spacing.SpacingRepository") as mock_repo_class,
         patch("production_control.web.pages.spacing.OpTechClient") as mock_client_class,
     ):
         # Given
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         mock_client = MagicMock()
         mock_client.send_correction.side_effect = OpTechConnectionError(
@@ -161,3 +162,15 @@ async def test_spacing_correction_page_shows_connection_error(user: User) -> Non
         # Then
         await user.should_see("Failed to connect to OpTech API")
         await user.should_see("Request timed out")
+
+
+async def test_spacing_detail_page_reports_slow_database(user: User, async_queries) -> None:
+    """Test that the detail page tells the user when loading the record takes too long."""
+    with patch("production_control.web.pages.spacing.SpacingRepository") as mock_repo_class:
+        mock_repo = async_queries(MagicMock())
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_by_id.side_effect = QueryTimeoutError("slow")
+
+        await user.open("/spacing/TEST123")
+
+        await user.should_see("Het laden van het record duurt te lang, probeer het opnieuw")
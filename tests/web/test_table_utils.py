@@ -7,7 +7,9 @@ from sqlmodel import SQLModel, Field
 from production_control.web.components.table_utils import (
     get_table_columns,
     format_row,
+    format_record,
     format_date,
+    get_list_fields,
 )
 from production_control.products.models import Product
 
@@ -207,6 +209,59 @@ def test_format_row_with_dates():
     assert row["created_at_raw"] == date(2024, 12, 30)
 
 
+def test_format_record_matches_format_row():
+    """Test that a plain record formats like the model instance with the same values."""
+
+    # Given
+    class ModelWithDates(SQLModel):
+        id: int = Field(primary_key=True)
+        name: str = Field()
+        created_at: date = Field()
+        notes: str = Field(default="", sa_column_kwargs={"info": {"ui_hidden": True}})
+
+    values = {"id": 1, "name": "Test", "created_at": date(2024, 12, 30), "notes": "x"}
+
+    # When
+    row = format_record(ModelWithDates, values)
+
+    # Then
+    assert row == format_row(ModelWithDates(**values))
+    assert format_record(ModelWithDates, {"id": 2})["name"] is None
+
+
+def test_format_record_evaluates_warning_emoji():
+    """Test that a warning_emoji property is computed from the record values."""
+
+    # Given
+    class ModelWithWarning(SQLModel):
+        id: int = Field(primary_key=True)
+        fout: str = Field(default="", sa_column_kwargs={"info": {"ui_hidden": True}})
+
+        @property
+        def warning_emoji(self) -> str:
+            return "⚠️" if self.fout else ""
+
+    # When/Then
+    assert format_record(ModelWithWarning, {"id": 1, "fout": "kapot"})["warning_emoji"] == "⚠️"
+    assert format_record(ModelWithWarning, {"id": 2, "fout": ""})["warning_emoji"] == ""
+
+
+def test_get_list_fields_includes_key_and_fetched_fields():
+    """Test that list pages fetch shown fields, the key and ui_fetch fields only."""
+
+    # Given
+    class ModelWithHidden(SQLModel):
+        id: int = Field(primary_key=True, sa_column_kwargs={"info": {"ui_hidden": True}})
+        name: str = Field()
+        group: str = Field()
+        notes: str = Field(sa_column_kwargs={"info": {"ui_hidden": True}})
+        error: str = Field(sa_column_kwargs={"info": {"ui_hidden": True, "ui_fetch": True}})
+
+    # When/Then
+    assert get_list_fields(ModelWithHidden) == ["id", "name", "group", "error"]
+    assert get_list_fields(ModelWithHidden, columns=["group"]) == ["id", "group", "error"]
+
+
 def test_get_table_columns_with_dates():
     """Test that get_table_columns handles date fields correctly."""
 
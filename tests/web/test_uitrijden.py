@@ -6,6 +6,7 @@ from unittest.mock import MagicMock, patch
 from nicegui import ui
 from nicegui.testing import User
 
+from production_control.data.repository import DremioUnavailableError
 from production_control.vloerplan.models import Vloerplan19cm
 from production_control.web.pages.uitrijden import (
     SYNC_RECENT_DAYS,
@@ -39,10 +40,10 @@ def test_default_sync_selection_deselects_recent_pottings():
     assert selected == {3, 4}
 
 
-async def test_uitrijden_page_shows_table(user: User) -> None:
+async def test_uitrijden_page_shows_table(user: User, async_queries) -> None:
     """List page renders the table with rows from the repository."""
     with patch("production_control.web.pages.uitrijden.Vloerplan19cmRepository") as mock_repo_class:
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         mock_repo.count_pending_olsthoorn_sync.return_value = 0
         mock_repo.get_paginated.return_value = (
@@ -72,10 +73,10 @@ async def test_uitrijden_page_shows_table(user: User) -> None:
         assert table.rows[0]["productgroep_naam"] == "19 oriëntal"
 
 
-async def test_uitrijden_detail_page_shows_record(user: User) -> None:
+async def test_uitrijden_detail_page_shows_record(user: User, async_queries) -> None:
     """Detail page renders fields of the fetched record."""
     with patch("production_control.web.pages.uitrijden.Vloerplan19cmRepository") as mock_repo_class:
-        mock_repo = MagicMock()
+        mock_repo = async_queries(MagicMock())
         mock_repo_class.return_value = mock_repo
         mock_repo.get_by_id.return_value = Vloerplan19cm(
             id=27515,
@@ -93,3 +94,17 @@ async def test_uitrijden_detail_page_shows_record(user: User) -> None:
 
         await user.should_see("S. Camino 19")
         await user.should_see("← Terug naar Uitrijden")
+
+
+async def test_uitrijden_detail_page_reports_unavailable_database(
+    user: User, async_queries
+) -> None:
+    """Detail page tells the user when Dremio cannot be reached."""
+    with patch("production_control.web.pages.uitrijden.Vloerplan19cmRepository") as mock_repo_class:
+        mock_repo = async_queries(MagicMock())
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_by_id.side_effect = DremioUnavailableError("down")
+
+        await user.open("/uitrijden/27515")
+
+        await user.should_see("De database is niet bereikbaar, probeer het later opnieuw")
@@ -0,0 +1,123 @@
+"""Tests for loading list rows in windows as the user scrolls."""
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+from production_control.data import Pagination
+from production_control.data.repository import DremioRepository
+from production_control.web.components.virtual_scroll import ScrollWindows
+
+
+def rows(page, size=10):
+    return [{"id": (page - 1) * size + i} for i in range(1, size + 1)]
+
+
+def scroll_to_end(windows):
+    """Request the window after the kept rows, as Quasar reports the last rows shown."""
+    kept = len(windows.rows)
+    return windows.next_request(kept - 5, kept - 1)
+
+
+def test_windows_are_loaded_ahead_and_dropped_behind():
+    """Test that scrolling on keeps at most max_windows windows."""
+    windows = ScrollWindows(window_size=10, max_windows=3)
+    first = windows.first(Pagination(rows_per_page=0, sort_by="naam"))
+    assert (first.page, first.rows_per_page, first.sort_by) == (1, 10, "naam")
+    assert windows.add(first, rows(1), total=100) == 0
+    assert windows.next_request(0, 3) is None
+
+    shifts = []
+    for page in (2, 3, 4, 5):
+        request = scroll_to_end(windows)
+        assert request.page == page
+        shifts.append(windows.add(request, rows(page), total=100))
+
+    assert shifts == [0, 0, 10, 10]
+    assert [row["id"] for row in windows.rows] == list(range(21, 51))
+
+
+def test_scrolling_back_loads_dropped_windows():
+    """Test that the window before the kept rows is loaded again at the start."""
+    windows = ScrollWindows(window_size=10, max_windows=2)
+    windows.add(windows.first(Pagination()), rows(1), total=30)
+    for page in (2, 3):
+        windows.add(scroll_to_end(windows), rows(page), total=30)
+    assert scroll_to_end(windows) is None
+
+    request = windows.next_request(2, 8)
+    assert request.page == 1
+    assert windows.add(request, rows(1), total=30) == -10
+    assert [row["id"] for row in windows.rows] == list(range(1, 21))
+
+
+def test_requests_wait_for_the_window_being_loaded():
+    """Test that scroll events during a load do not request it again."""
+    windows = ScrollWindows(window_size=10)
+    windows.add(windows.first(Pagination()), rows(1), total=100)
+    windows.loading = True
+    assert scroll_to_end(windows) is None
+
+
+class ScrolledLot(SQLModel, table=True):
+    """Small stand-in for a Dremio view."""
+
+    __tablename__ = "scrolled_lots"
+
+    id: int = Field(primary_key=True)
+    naam: str
+
+
+class ScrolledLotRepository(DremioRepository[ScrolledLot]):
+    count_in_page_query = True
+
+    def __init__(self, connection):
+        super().__init__(ScrolledLot, connection)
+
+    def get_paginated(
+        self, pagination: Pagination, filter_text: Optional[str] = None
+    ) -> Tuple[List[ScrolledLot], int]:
+        page, items_per_page, sort_by, descending = self._validate_pagination(pagination=pagination)
+        with Session(self.engine) as session:
+            return self._execute_paginated_query(
+                session,
+                select(ScrolledLot),
+                select(func.count(ScrolledLot.id)),
+                page,
+                items_per_page,
+                sort_by=sort_by,
+                descending=descending,
+                pagination=pagination,
+            )
+
+
+def test_windows_are_fetched_by_keyset():
+    """Test that the windows after the first seek past the previous one instead of OFFSET."""
+    engine = create_engine("sqlite://")
+    ScrolledLot.__table__.create(engine)
+    with Session(engine) as session:
+        session.add_all(ScrolledLot(id=i, naam=f"lot {i:03}") for i in range(1, 101))
+        session.commit()
+    repository = ScrolledLotRepository(engine)
+    repository.cache = None
+    repository.snapshots = None
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    windows = ScrollWindows(window_size=20, max_windows=2)
+    request = windows.first(Pagination(rows_per_page=0, sort_by="naam", descending=True))
+    while request is not None:
+        items, total = repository.get_paginated(request)
+        windows.add(request, [{"id": item.id} for item in items], total)
+        assert len(windows.rows) <= 40
+        request = scroll_to_end(windows)
+
+    assert [row["id"] for row in windows.rows] == list(range(40, 0, -1))
+    assert len(statements) == 5
+    # SQLite renders LIMIT with OFFSET 0; no rows are skipped
+    assert all(statement.endswith("OFFSET 0") for statement in statements)
+    assert all("WHERE scrolled_lots.naam <" in statement for statement in statements[1:])